@@ -1,13 +1,47 @@
 __version__ = "0.2.0"
 
-from .age_reference_plots import *
-from .basic_analysis import *
-from .basic_plots import *
-from .blandaltman_plots import *
-from .cgm_plots import *
-from .config import *
-from .data_loader import DataLoader as PhenoLoader
-from .dates_plots import *
-from .ecg_analysis import *
-from .sleep_plots import *
-from .meta_loader import *
+# The public names of the modules are imported on first access (PEP 562), so that importing the package, e.g. for
+# PhenoLoader, does not import the plotting and analysis dependencies of every module.
+import importlib
+import os
+import re
+from ast import literal_eval
+
+# later modules take precedence for names defined in more than one module
+_MODULES = ['age_reference_plots', 'basic_analysis', 'basic_plots', 'batch_reports', 'blandaltman_plots',
+            'cgm_analysis', 'cgm_plots', 'config', 'dates_plots', 'decimation', 'density_plots', 'drift_monitor',
+            'ecg_analysis', 'image_loader', 'remote_io', 'sleep_analysis', 'sleep_plots', 'meta_loader']
+_ALIASES = {'PhenoLoader': ('data_loader', 'DataLoader')}
+_names = None
+
+
+def _index() -> dict:
+    # the module and attribute of each public name, read from the __all__ of the module files without importing them
+    global _names
+    if _names is None:
+        names = {}
+        for module in _MODULES:
+            with open(os.path.join(os.path.dirname(__file__), f'{module}.py')) as f:
+                match = re.search(r'^__all__ = (\[.*?\])', f.read(), re.M | re.S)
+            if match:
+                names.update({name: (module, name) for name in literal_eval(match.group(1))})
+        names.update(_ALIASES)
+        _names = names
+    return _names
+
+
+def __getattr__(name: str):
+    if name == '__all__':
+        return list(_index())
+    if name in _index():
+        module, attr = _index()[name]
+        value = getattr(importlib.import_module(f'.{module}', __name__), attr)
+        globals()[name] = value
+        return value
+    if not name.startswith('_') and os.path.isfile(os.path.join(os.path.dirname(__file__), f'{name}.py')):
+        return importlib.import_module(f'.{name}', __name__)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_index()))
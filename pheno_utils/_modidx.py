@@ -39,8 +39,57 @@ d = { 'settings': { 'branch': 'main',
                                                                                       'pheno_utils/basic_plots.py'),
                                          'pheno_utils.basic_plots.show_fundus': ( 'basic_plots.html#show_fundus',
                                                                                   'pheno_utils/basic_plots.py')},
-            'pheno_utils.blandaltman_plots': { 'pheno_utils.blandaltman_plots.bland_altman_triple_plot': ( 'blandaltman_plots.html#bland_altman_triple_plot',
+            'pheno_utils.batch_reports': { 'pheno_utils.batch_reports._agg_backend': ( 'batch_reports.html#_agg_backend',
+                                                                                       'pheno_utils/batch_reports.py'),
+                                           'pheno_utils.batch_reports._init_worker': ( 'batch_reports.html#_init_worker',
+                                                                                       'pheno_utils/batch_reports.py'),
+                                           'pheno_utils.batch_reports._save_current_fig': ( 'batch_reports.html#_save_current_fig',
+                                                                                            'pheno_utils/batch_reports.py'),
+                                           'pheno_utils.batch_reports.field_file_name': ( 'batch_reports.html#field_file_name',
+                                                                                          'pheno_utils/batch_reports.py'),
+                                           'pheno_utils.batch_reports.generate_field_reports': ( 'batch_reports.html#generate_field_reports',
+                                                                                                 'pheno_utils/batch_reports.py'),
+                                           'pheno_utils.batch_reports.hash_field_data': ( 'batch_reports.html#hash_field_data',
+                                                                                          'pheno_utils/batch_reports.py'),
+                                           'pheno_utils.batch_reports.render_field_report': ( 'batch_reports.html#render_field_report',
+                                                                                              'pheno_utils/batch_reports.py'),
+                                           'pheno_utils.batch_reports.write_report_index': ( 'batch_reports.html#write_report_index',
+                                                                                             'pheno_utils/batch_reports.py')},
+            'pheno_utils.blandaltman_plots': { 'pheno_utils.blandaltman_plots._agreement_stats': ( 'blandaltman_plots.html#_agreement_stats',
+                                                                                                   'pheno_utils/blandaltman_plots.py'),
+                                               'pheno_utils.blandaltman_plots.bland_altman_plot': ( 'blandaltman_plots.html#bland_altman_plot',
+                                                                                                    'pheno_utils/blandaltman_plots.py'),
+                                               'pheno_utils.blandaltman_plots.bland_altman_stats': ( 'blandaltman_plots.html#bland_altman_stats',
+                                                                                                     'pheno_utils/blandaltman_plots.py'),
+                                               'pheno_utils.blandaltman_plots.bland_altman_triple_plot': ( 'blandaltman_plots.html#bland_altman_triple_plot',
                                                                                                            'pheno_utils/blandaltman_plots.py')},
+            'pheno_utils.cgm_analysis': { 'pheno_utils.cgm_analysis._cgm_metrics': ( 'cgm_analysis.html#_cgm_metrics',
+                                                                                     'pheno_utils/cgm_analysis.py'),
+                                          'pheno_utils.cgm_analysis._mage': ('cgm_analysis.html#_mage', 'pheno_utils/cgm_analysis.py'),
+                                          'pheno_utils.cgm_analysis._segment_reduce': ( 'cgm_analysis.html#_segment_reduce',
+                                                                                        'pheno_utils/cgm_analysis.py'),
+                                          'pheno_utils.cgm_analysis.agp_percentiles': ( 'cgm_analysis.html#agp_percentiles',
+                                                                                        'pheno_utils/cgm_analysis.py'),
+                                          'pheno_utils.cgm_analysis.cgm_metrics': ( 'cgm_analysis.html#cgm_metrics',
+                                                                                    'pheno_utils/cgm_analysis.py'),
+                                          'pheno_utils.cgm_analysis.group_mean': ( 'cgm_analysis.html#group_mean',
+                                                                                   'pheno_utils/cgm_analysis.py'),
+                                          'pheno_utils.cgm_analysis.group_std': ( 'cgm_analysis.html#group_std',
+                                                                                  'pheno_utils/cgm_analysis.py'),
+                                          'pheno_utils.cgm_analysis.grouped_quantiles': ( 'cgm_analysis.html#grouped_quantiles',
+                                                                                          'pheno_utils/cgm_analysis.py'),
+                                          'pheno_utils.cgm_analysis.lagged_index': ( 'cgm_analysis.html#lagged_index',
+                                                                                     'pheno_utils/cgm_analysis.py'),
+                                          'pheno_utils.cgm_analysis.meal_responses': ( 'cgm_analysis.html#meal_responses',
+                                                                                       'pheno_utils/cgm_analysis.py'),
+                                          'pheno_utils.cgm_analysis.prepare_cgm': ( 'cgm_analysis.html#prepare_cgm',
+                                                                                    'pheno_utils/cgm_analysis.py'),
+                                          'pheno_utils.cgm_analysis.resample_cgm': ( 'cgm_analysis.html#resample_cgm',
+                                                                                     'pheno_utils/cgm_analysis.py'),
+                                          'pheno_utils.cgm_analysis.resample_segments': ( 'cgm_analysis.html#resample_segments',
+                                                                                          'pheno_utils/cgm_analysis.py'),
+                                          'pheno_utils.cgm_analysis.turning_points': ( 'cgm_analysis.html#turning_points',
+                                                                                       'pheno_utils/cgm_analysis.py')},
             'pheno_utils.cgm_plots': { 'pheno_utils.cgm_plots.AGP': ('cgm_plots.html#agp', 'pheno_utils/cgm_plots.py'),
                                        'pheno_utils.cgm_plots.AGP.__init__': ('cgm_plots.html#agp.__init__', 'pheno_utils/cgm_plots.py'),
                                        'pheno_utils.cgm_plots.AGP.plot': ('cgm_plots.html#agp.plot', 'pheno_utils/cgm_plots.py'),
@@ -60,7 +109,14 @@ d = { 'settings': { 'branch': 'main',
                                                                                     'pheno_utils/config.py'),
                                     'pheno_utils.config.generate_synthetic_data_like': ( 'config.html#generate_synthetic_data_like',
                                                                                          'pheno_utils/config.py')},
-            'pheno_utils.data_loader': { 'pheno_utils.data_loader.DataLoader': ( 'data_loader.html#dataloader',
+            'pheno_utils.data_loader': { 'pheno_utils.data_loader.BulkCache': ('data_loader.html#bulkcache', 'pheno_utils/data_loader.py'),
+                                         'pheno_utils.data_loader.BulkCache.__call__': ( 'data_loader.html#bulkcache.__call__',
+                                                                                         'pheno_utils/data_loader.py'),
+                                         'pheno_utils.data_loader.BulkCache.__init__': ( 'data_loader.html#bulkcache.__init__',
+                                                                                         'pheno_utils/data_loader.py'),
+                                         'pheno_utils.data_loader.BulkCache.cache_path': ( 'data_loader.html#bulkcache.cache_path',
+                                                                                           'pheno_utils/data_loader.py'),
+                                         'pheno_utils.data_loader.DataLoader': ( 'data_loader.html#dataloader',
                                                                                  'pheno_utils/data_loader.py'),
                                          'pheno_utils.data_loader.DataLoader.__concat__': ( 'data_loader.html#dataloader.__concat__',
                                                                                             'pheno_utils/data_loader.py'),
@@ -89,12 +145,109 @@ d = { 'settings': { 'branch': 'main',
                                          'pheno_utils.data_loader.DataLoader.get': ( 'data_loader.html#dataloader.get',
                                                                                      'pheno_utils/data_loader.py'),
                                          'pheno_utils.data_loader.DataLoader.load_sample_data': ( 'data_loader.html#dataloader.load_sample_data',
-                                                                                                  'pheno_utils/data_loader.py')},
+                                                                                                  'pheno_utils/data_loader.py'),
+                                         'pheno_utils.data_loader._import_pyarrow': ( 'data_loader.html#_import_pyarrow',
+                                                                                      'pheno_utils/data_loader.py'),
+                                         'pheno_utils.data_loader._sample_paths': ( 'data_loader.html#_sample_paths',
+                                                                                    'pheno_utils/data_loader.py'),
+                                         'pheno_utils.data_loader.read_arrow_ipc': ( 'data_loader.html#read_arrow_ipc',
+                                                                                     'pheno_utils/data_loader.py'),
+                                         'pheno_utils.data_loader.write_arrow_ipc': ( 'data_loader.html#write_arrow_ipc',
+                                                                                      'pheno_utils/data_loader.py')},
             'pheno_utils.dates_plots': { 'pheno_utils.dates_plots.dates_dist_plot': ( 'date_plots.html#dates_dist_plot',
-                                                                                      'pheno_utils/dates_plots.py')},
-            'pheno_utils.ecg_analysis': { 'pheno_utils.ecg_analysis.get_hrv_df': ( 'ecg_analysis.html#get_hrv_df',
+                                                                                      'pheno_utils/dates_plots.py'),
+                                         'pheno_utils.dates_plots.dates_stats': ( 'date_plots.html#dates_stats',
+                                                                                  'pheno_utils/dates_plots.py')},
+            'pheno_utils.decimation': { 'pheno_utils.decimation._bin_codes': ('decimation.html#_bin_codes', 'pheno_utils/decimation.py'),
+                                        'pheno_utils.decimation._take': ('decimation.html#_take', 'pheno_utils/decimation.py'),
+                                        'pheno_utils.decimation.as_numeric': ('decimation.html#as_numeric', 'pheno_utils/decimation.py'),
+                                        'pheno_utils.decimation.axes_width_px': ( 'decimation.html#axes_width_px',
+                                                                                  'pheno_utils/decimation.py'),
+                                        'pheno_utils.decimation.decimate_envelope': ( 'decimation.html#decimate_envelope',
+                                                                                      'pheno_utils/decimation.py'),
+                                        'pheno_utils.decimation.decimate_trace': ( 'decimation.html#decimate_trace',
+                                                                                   'pheno_utils/decimation.py'),
+                                        'pheno_utils.decimation.distinct_indices': ( 'decimation.html#distinct_indices',
+                                                                                     'pheno_utils/decimation.py'),
+                                        'pheno_utils.decimation.lttb_indices': ( 'decimation.html#lttb_indices',
+                                                                                 'pheno_utils/decimation.py'),
+                                        'pheno_utils.decimation.minmax_indices': ( 'decimation.html#minmax_indices',
+                                                                                   'pheno_utils/decimation.py')},
+            'pheno_utils.density_plots': { 'pheno_utils.density_plots.downsample_points': ( 'density_plots.html#downsample_points',
+                                                                                            'pheno_utils/density_plots.py'),
+                                           'pheno_utils.density_plots.get_density_mode': ( 'density_plots.html#get_density_mode',
+                                                                                           'pheno_utils/density_plots.py'),
+                                           'pheno_utils.density_plots.scatter_density': ( 'density_plots.html#scatter_density',
+                                                                                          'pheno_utils/density_plots.py')},
+            'pheno_utils.drift_monitor': { 'pheno_utils.drift_monitor.DriftMonitor': ( 'drift_monitor.html#driftmonitor',
+                                                                                       'pheno_utils/drift_monitor.py'),
+                                           'pheno_utils.drift_monitor.DriftMonitor.__baseline_edges__': ( 'drift_monitor.html#driftmonitor.__baseline_edges__',
+                                                                                                          'pheno_utils/drift_monitor.py'),
+                                           'pheno_utils.drift_monitor.DriftMonitor.__config__': ( 'drift_monitor.html#driftmonitor.__config__',
+                                                                                                  'pheno_utils/drift_monitor.py'),
+                                           'pheno_utils.drift_monitor.DriftMonitor.__get_periods__': ( 'drift_monitor.html#driftmonitor.__get_periods__',
+                                                                                                       'pheno_utils/drift_monitor.py'),
+                                           'pheno_utils.drift_monitor.DriftMonitor.__histogram__': ( 'drift_monitor.html#driftmonitor.__histogram__',
+                                                                                                     'pheno_utils/drift_monitor.py'),
+                                           'pheno_utils.drift_monitor.DriftMonitor.__init__': ( 'drift_monitor.html#driftmonitor.__init__',
+                                                                                                'pheno_utils/drift_monitor.py'),
+                                           'pheno_utils.drift_monitor.DriftMonitor.__load_state__': ( 'drift_monitor.html#driftmonitor.__load_state__',
+                                                                                                      'pheno_utils/drift_monitor.py'),
+                                           'pheno_utils.drift_monitor.DriftMonitor.__save_state__': ( 'drift_monitor.html#driftmonitor.__save_state__',
+                                                                                                      'pheno_utils/drift_monitor.py'),
+                                           'pheno_utils.drift_monitor.DriftMonitor.drift': ( 'drift_monitor.html#driftmonitor.drift',
+                                                                                             'pheno_utils/drift_monitor.py'),
+                                           'pheno_utils.drift_monitor.DriftMonitor.flagged': ( 'drift_monitor.html#driftmonitor.flagged',
+                                                                                               'pheno_utils/drift_monitor.py'),
+                                           'pheno_utils.drift_monitor.DriftMonitor.update': ( 'drift_monitor.html#driftmonitor.update',
+                                                                                              'pheno_utils/drift_monitor.py')},
+            'pheno_utils.ecg_analysis': { 'pheno_utils.ecg_analysis._lead_hrv': ( 'ecg_analysis.html#_lead_hrv',
+                                                                                  'pheno_utils/ecg_analysis.py'),
+                                          'pheno_utils.ecg_analysis._participant_ecg_features': ( 'ecg_analysis.html#_participant_ecg_features',
+                                                                                                  'pheno_utils/ecg_analysis.py'),
+                                          'pheno_utils.ecg_analysis._qrs_energy': ( 'ecg_analysis.html#_qrs_energy',
+                                                                                    'pheno_utils/ecg_analysis.py'),
+                                          'pheno_utils.ecg_analysis._select_peaks': ( 'ecg_analysis.html#_select_peaks',
+                                                                                      'pheno_utils/ecg_analysis.py'),
+                                          'pheno_utils.ecg_analysis.beat_templates': ( 'ecg_analysis.html#beat_templates',
+                                                                                       'pheno_utils/ecg_analysis.py'),
+                                          'pheno_utils.ecg_analysis.consensus_beats': ( 'ecg_analysis.html#consensus_beats',
+                                                                                        'pheno_utils/ecg_analysis.py'),
+                                          'pheno_utils.ecg_analysis.detect_rpeaks': ( 'ecg_analysis.html#detect_rpeaks',
+                                                                                      'pheno_utils/ecg_analysis.py'),
+                                          'pheno_utils.ecg_analysis.ecg_checkpoint_path': ( 'ecg_analysis.html#ecg_checkpoint_path',
+                                                                                            'pheno_utils/ecg_analysis.py'),
+                                          'pheno_utils.ecg_analysis.ecg_features_pipeline': ( 'ecg_analysis.html#ecg_features_pipeline',
+                                                                                              'pheno_utils/ecg_analysis.py'),
+                                          'pheno_utils.ecg_analysis.get_hrv_df': ( 'ecg_analysis.html#get_hrv_df',
                                                                                    'pheno_utils/ecg_analysis.py'),
+                                          'pheno_utils.ecg_analysis.hrv_table': ( 'ecg_analysis.html#hrv_table',
+                                                                                  'pheno_utils/ecg_analysis.py'),
+                                          'pheno_utils.ecg_analysis.read_ecg_features': ( 'ecg_analysis.html#read_ecg_features',
+                                                                                          'pheno_utils/ecg_analysis.py'),
+                                          'pheno_utils.ecg_analysis.save_ecg_plots': ( 'ecg_analysis.html#save_ecg_plots',
+                                                                                       'pheno_utils/ecg_analysis.py'),
                                           'pheno_utils.ecg_analysis.vis_ecg': ('ecg_analysis.html#vis_ecg', 'pheno_utils/ecg_analysis.py')},
+            'pheno_utils.image_loader': { 'pheno_utils.image_loader.ThumbnailCache': ( 'image_loader.html#thumbnailcache',
+                                                                                       'pheno_utils/image_loader.py'),
+                                          'pheno_utils.image_loader.ThumbnailCache.__call__': ( 'image_loader.html#thumbnailcache.__call__',
+                                                                                                'pheno_utils/image_loader.py'),
+                                          'pheno_utils.image_loader.ThumbnailCache.__init__': ( 'image_loader.html#thumbnailcache.__init__',
+                                                                                                'pheno_utils/image_loader.py'),
+                                          'pheno_utils.image_loader.ThumbnailCache.cache_path': ( 'image_loader.html#thumbnailcache.cache_path',
+                                                                                                  'pheno_utils/image_loader.py'),
+                                          'pheno_utils.image_loader._load_array': ( 'image_loader.html#_load_array',
+                                                                                    'pheno_utils/image_loader.py'),
+                                          'pheno_utils.image_loader._load_or_error': ( 'image_loader.html#_load_or_error',
+                                                                                       'pheno_utils/image_loader.py'),
+                                          'pheno_utils.image_loader.iter_image_batches': ( 'image_loader.html#iter_image_batches',
+                                                                                           'pheno_utils/image_loader.py'),
+                                          'pheno_utils.image_loader.load_image': ( 'image_loader.html#load_image',
+                                                                                   'pheno_utils/image_loader.py'),
+                                          'pheno_utils.image_loader.load_images': ( 'image_loader.html#load_images',
+                                                                                    'pheno_utils/image_loader.py'),
+                                          'pheno_utils.image_loader.show_images': ( 'image_loader.html#show_images',
+                                                                                    'pheno_utils/image_loader.py')},
             'pheno_utils.meta_loader': { 'pheno_utils.meta_loader.MetaLoader': ( 'meta_loader.html#metaloader',
                                                                                  'pheno_utils/meta_loader.py'),
                                          'pheno_utils.meta_loader.MetaLoader.__concat__': ( 'meta_loader.html#metaloader.__concat__',
@@ -115,6 +268,113 @@ d = { 'settings': { 'branch': 'main',
                                                                                      'pheno_utils/meta_loader.py'),
                                          'pheno_utils.meta_loader.MetaLoader.load': ( 'meta_loader.html#metaloader.load',
                                                                                       'pheno_utils/meta_loader.py')},
+            'pheno_utils.remote_io': { 'pheno_utils.remote_io.FileCache': ('remote_io.html#filecache', 'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.FileCache.__init__': ( 'remote_io.html#filecache.__init__',
+                                                                                     'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.FileCache.__repr__': ( 'remote_io.html#filecache.__repr__',
+                                                                                     'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.FileCache.clear': ( 'remote_io.html#filecache.clear',
+                                                                                  'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.FileCache.evict': ( 'remote_io.html#filecache.evict',
+                                                                                  'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.FileCache.get': ('remote_io.html#filecache.get', 'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.FileCache.is_cached': ( 'remote_io.html#filecache.is_cached',
+                                                                                      'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.FileCache.size': ( 'remote_io.html#filecache.size',
+                                                                                 'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.RemoteFile': ('remote_io.html#remotefile', 'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.RemoteFile.__init__': ( 'remote_io.html#remotefile.__init__',
+                                                                                      'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.RemoteFile.readable': ( 'remote_io.html#remotefile.readable',
+                                                                                      'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.RemoteFile.readinto': ( 'remote_io.html#remotefile.readinto',
+                                                                                      'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.RemoteFile.seek': ( 'remote_io.html#remotefile.seek',
+                                                                                  'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.RemoteFile.seekable': ( 'remote_io.html#remotefile.seekable',
+                                                                                      'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.RemoteFile.tell': ( 'remote_io.html#remotefile.tell',
+                                                                                  'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.RemoteIO': ('remote_io.html#remoteio', 'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.RemoteIO.__init__': ( 'remote_io.html#remoteio.__init__',
+                                                                                    'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.RemoteIO.__repr__': ( 'remote_io.html#remoteio.__repr__',
+                                                                                    'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.RemoteIO._block_path': ( 'remote_io.html#remoteio._block_path',
+                                                                                       'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.RemoteIO._count': ( 'remote_io.html#remoteio._count',
+                                                                                  'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.RemoteIO.exists': ( 'remote_io.html#remoteio.exists',
+                                                                                  'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.RemoteIO.filesystem': ( 'remote_io.html#remoteio.filesystem',
+                                                                                      'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.RemoteIO.glob': ('remote_io.html#remoteio.glob', 'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.RemoteIO.info': ('remote_io.html#remoteio.info', 'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.RemoteIO.local_path': ( 'remote_io.html#remoteio.local_path',
+                                                                                      'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.RemoteIO.map': ('remote_io.html#remoteio.map', 'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.RemoteIO.open': ('remote_io.html#remoteio.open', 'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.RemoteIO.read_block': ( 'remote_io.html#remoteio.read_block',
+                                                                                      'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.RemoteIO.read_blocks': ( 'remote_io.html#remoteio.read_blocks',
+                                                                                       'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.RemoteIO.read_csv': ( 'remote_io.html#remoteio.read_csv',
+                                                                                    'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.RemoteIO.read_parquet': ( 'remote_io.html#remoteio.read_parquet',
+                                                                                        'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.RemoteIO.refresh': ( 'remote_io.html#remoteio.refresh',
+                                                                                   'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.RemoteIO.retry': ( 'remote_io.html#remoteio.retry',
+                                                                                 'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io._evict_lru': ('remote_io.html#_evict_lru', 'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.get_io': ('remote_io.html#get_io', 'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.is_remote': ('remote_io.html#is_remote', 'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.network_mounts': ( 'remote_io.html#network_mounts',
+                                                                                 'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.read_parquet': ('remote_io.html#read_parquet', 'pheno_utils/remote_io.py'),
+                                       'pheno_utils.remote_io.set_io': ('remote_io.html#set_io', 'pheno_utils/remote_io.py')},
+            'pheno_utils.sleep_analysis': { 'pheno_utils.sleep_analysis.ChannelStore': ( 'sleep_analysis.html#channelstore',
+                                                                                         'pheno_utils/sleep_analysis.py'),
+                                            'pheno_utils.sleep_analysis.ChannelStore.__init__': ( 'sleep_analysis.html#channelstore.__init__',
+                                                                                                  'pheno_utils/sleep_analysis.py'),
+                                            'pheno_utils.sleep_analysis.ChannelStore.__repr__': ( 'sleep_analysis.html#channelstore.__repr__',
+                                                                                                  'pheno_utils/sleep_analysis.py'),
+                                            'pheno_utils.sleep_analysis.ChannelStore._index': ( 'sleep_analysis.html#channelstore._index',
+                                                                                                'pheno_utils/sleep_analysis.py'),
+                                            'pheno_utils.sleep_analysis.ChannelStore._times': ( 'sleep_analysis.html#channelstore._times',
+                                                                                                'pheno_utils/sleep_analysis.py'),
+                                            'pheno_utils.sleep_analysis.ChannelStore._timestamp': ( 'sleep_analysis.html#channelstore._timestamp',
+                                                                                                    'pheno_utils/sleep_analysis.py'),
+                                            'pheno_utils.sleep_analysis.ChannelStore._window': ( 'sleep_analysis.html#channelstore._window',
+                                                                                                 'pheno_utils/sleep_analysis.py'),
+                                            'pheno_utils.sleep_analysis.ChannelStore.array': ( 'sleep_analysis.html#channelstore.array',
+                                                                                               'pheno_utils/sleep_analysis.py'),
+                                            'pheno_utils.sleep_analysis.ChannelStore.read': ( 'sleep_analysis.html#channelstore.read',
+                                                                                              'pheno_utils/sleep_analysis.py'),
+                                            'pheno_utils.sleep_analysis.ChannelStore.resample': ( 'sleep_analysis.html#channelstore.resample',
+                                                                                                  'pheno_utils/sleep_analysis.py'),
+                                            'pheno_utils.sleep_analysis.ChannelStore.to_frame': ( 'sleep_analysis.html#channelstore.to_frame',
+                                                                                                  'pheno_utils/sleep_analysis.py'),
+                                            'pheno_utils.sleep_analysis._flatten': ( 'sleep_analysis.html#_flatten',
+                                                                                     'pheno_utils/sleep_analysis.py'),
+                                            'pheno_utils.sleep_analysis._group_reduce': ( 'sleep_analysis.html#_group_reduce',
+                                                                                          'pheno_utils/sleep_analysis.py'),
+                                            'pheno_utils.sleep_analysis._sleep_metrics': ( 'sleep_analysis.html#_sleep_metrics',
+                                                                                           'pheno_utils/sleep_analysis.py'),
+                                            'pheno_utils.sleep_analysis._sorted': ( 'sleep_analysis.html#_sorted',
+                                                                                    'pheno_utils/sleep_analysis.py'),
+                                            'pheno_utils.sleep_analysis.in_intervals': ( 'sleep_analysis.html#in_intervals',
+                                                                                         'pheno_utils/sleep_analysis.py'),
+                                            'pheno_utils.sleep_analysis.merge_intervals': ( 'sleep_analysis.html#merge_intervals',
+                                                                                            'pheno_utils/sleep_analysis.py'),
+                                            'pheno_utils.sleep_analysis.resample_channels': ( 'sleep_analysis.html#resample_channels',
+                                                                                              'pheno_utils/sleep_analysis.py'),
+                                            'pheno_utils.sleep_analysis.sleep_metrics': ( 'sleep_analysis.html#sleep_metrics',
+                                                                                          'pheno_utils/sleep_analysis.py'),
+                                            'pheno_utils.sleep_analysis.stack_channels': ( 'sleep_analysis.html#stack_channels',
+                                                                                           'pheno_utils/sleep_analysis.py'),
+                                            'pheno_utils.sleep_analysis.write_channels': ( 'sleep_analysis.html#write_channels',
+                                                                                           'pheno_utils/sleep_analysis.py')},
             'pheno_utils.sleep_plots': { 'pheno_utils.sleep_plots.format_xticks': ( 'sleep_plots.html#format_xticks',
                                                                                     'pheno_utils/sleep_plots.py'),
                                          'pheno_utils.sleep_plots.get_legend_colors': ( 'sleep_plots.html#get_legend_colors',
@@ -5,6 +5,7 @@ __all__ = ['AgeRefPlot', 'GenderAgeRefPlot']
 
 # %% ../nbs/03_age_reference_plots.ipynb 3
 from .config import *
+from .density_plots import scatter_density, DENSITY_THRESHOLD
 
 from typing import Dict, List, Callable, Optional, Union
 import numpy as np
@@ -45,7 +46,9 @@ class AgeRefPlot:
         robust: bool = True,
         scale: float = 1.,
         transform: Optional[Callable] = None,
-        make_fig: bool = True
+        make_fig: bool = True,
+        density: str = 'auto',
+        density_threshold: int = DENSITY_THRESHOLD,
     ) -> None:
         """
         Initializes the AgeRefPlot class.
@@ -71,6 +74,9 @@ class AgeRefPlot:
             scale (float, optional): The scaling factor for the value column. Defaults to 1.
             transform (Optional[Callable], optional): The transformation function to apply to the value column. Defaults
             make_fig (bool, optional): Whether to create a new figure if axes are not provided. Defaults to True.
+            density (str, optional): The scatter rendering mode, one of 'auto', 'scatter', 'hexbin', 'hist2d', 'downsample'.
+                'auto' switches to hexbin shading above density_threshold points. Defaults to 'auto'.
+            density_threshold (int, optional): The number of points above which 'auto' uses density shading. Defaults to DENSITY_THRESHOLD.
         """
         self.data = data.dropna(subset=[age_col, val_col]).copy()
         self.data = self.data.sort_values(by=age_col)
@@ -95,6 +101,8 @@ class AgeRefPlot:
         assert percentiles_type in ['summary', '1-percent intervals', '5-percent intervals', '10-percent intervals']
         self.percentiles_type = percentiles_type
         self.robust = robust
+        self.density = density
+        self.density_threshold = density_threshold
         self.slope = np.nan
         self.intercept = np.nan
 
@@ -161,9 +169,12 @@ class AgeRefPlot:
         )
 
     def plot_scatter(self):
-        self.ax_main.scatter(
+        scatter_density(
             self.disp_data[self.age_col],
             self.disp_data[self.val_col],
+            ax=self.ax_main,
+            mode=self.density,
+            threshold=self.density_threshold,
             s=40,
             alpha=0.4,
             marker="o",
@@ -331,6 +342,8 @@ class GenderAgeRefPlot(AgeRefPlot):
         robust: bool = True,
         scale: float = 1.,
         transform: Optional[Callable] = None,
+        density: str = 'auto',
+        density_threshold: int = DENSITY_THRESHOLD,
     ) -> None:
         """Initializes the GenderAgeRefPlot class.
 
@@ -349,6 +362,8 @@ class GenderAgeRefPlot(AgeRefPlot):
             robust (bool, optional): Whether to use a robust linear regression. Defaults to True.
             scale (float, optional): The scaling factor for the data. Defaults to 1.
             transform (Callable, optional): An optional function to apply to the data. Defaults to None.
+            density (str, optional): The scatter rendering mode passed to AgeRefPlot. Defaults to 'auto'.
+            density_threshold (int, optional): The number of points above which 'auto' uses density shading. Defaults to DENSITY_THRESHOLD.
         """
         super().__init__(
             data=data,
@@ -365,7 +380,9 @@ class GenderAgeRefPlot(AgeRefPlot):
             robust=robust,
             scale=scale,
             transform=transform,
-            make_fig=False
+            make_fig=False,
+            density=density,
+            density_threshold=density_threshold,
         )
 
     def plot(self) -> None:
@@ -398,6 +415,8 @@ class GenderAgeRefPlot(AgeRefPlot):
             bottom_disp_perc=self.bottom_disp_perc*100,
             percentiles_type=self.percentiles_type,
             robust=self.robust,
+            density=self.density,
+            density_threshold=self.density_threshold,
         )
         self.female_refplot.plot()
 
@@ -417,5 +436,7 @@ class GenderAgeRefPlot(AgeRefPlot):
             bottom_disp_perc=self.bottom_disp_perc*100,
             percentiles_type=self.percentiles_type,
             robust=self.robust,
+            density=self.density,
+            density_threshold=self.density_threshold,
         )
         self.male_refplot.plot()
@@ -6,8 +6,6 @@ __all__ = ['custom_describe', 'assign_nearest_research_stage']
 # %% ../nbs/07_basic_analysis.ipynb 3
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 from typing import List, Any, Dict, Union, Optional
 
 
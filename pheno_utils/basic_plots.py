@@ -10,10 +10,10 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from typing import Optional
 from PIL import Image
-from smart_open import open
 
 # %% ../nbs/01_basic_plots.ipynb 4
 from .config import *
+from .image_loader import load_image
 
 # %% ../nbs/01_basic_plots.ipynb 5
 def hist_ecdf_plots(data: pd.DataFrame, col: str, feature_str: Optional[str] = None,
@@ -71,14 +71,15 @@ def hist_ecdf_plots(data: pd.DataFrame, col: str, feature_str: Optional[str] = N
     plt.show()
 
 # %% ../nbs/01_basic_plots.ipynb 7
-def show_fundus(fname: str) -> None:
+def show_fundus(fname: str, size: Optional[int] = None) -> None:
     """
     Display a fundus image from an input file path.
     Args:
         fname (str): The file path to the fundus image.
+        size (int, optional): The maximal width and height to decode the image at. Defaults to None, the full resolution.
     """
     fig, ax = plt.subplots(1, 1, figsize=(6, 6))
-    img = Image.open(open(fname, 'rb'))
+    img = load_image(fname, size)
     ax.imshow(img, cmap="gray")
     ax.set_xticks([])
     ax.set_yticks([])
@@ -0,0 +1,302 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/13_batch_reports.ipynb.
+
+# %% auto 0
+__all__ = ['REPORT_MANIFEST', 'REPORT_PLOTS', 'hash_field_data', 'field_file_name', 'render_field_report', 'write_report_index',
+           'generate_field_reports']
+
+# %% ../nbs/13_batch_reports.ipynb 3
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+import hashlib
+import html
+import json
+import os
+import re
+import time
+from typing import List, Optional
+import warnings
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+# %% ../nbs/13_batch_reports.ipynb 4
+from .config import *
+from .basic_analysis import custom_describe
+from .basic_plots import hist_ecdf_plots
+from .age_reference_plots import GenderAgeRefPlot
+from .dates_plots import dates_dist_plot
+
+# %% ../nbs/13_batch_reports.ipynb 6
+REPORT_MANIFEST = 'manifest.json'
+REPORT_PLOTS = ['hist_ecdf', 'age_ref', 'dates_dist']
+
+
+def hash_field_data(data: pd.DataFrame, *extra) -> str:
+    """
+    Compute a content hash of a field's data and any additional report inputs.
+
+    Args:
+        data (pd.DataFrame): The data of the field (including its index).
+        *extra: Additional objects (e.g., dictionary entries, options) whose string representation is hashed.
+
+    Returns:
+        str: A hex digest of the content.
+    """
+    try:
+        row_hashes = pd.util.hash_pandas_object(data, index=True).values
+    except TypeError:
+        # unhashable cell values (e.g., lists)
+        row_hashes = pd.util.hash_pandas_object(data.astype(str), index=True).values
+    h = hashlib.sha1(row_hashes.tobytes())
+    h.update(str(list(data.columns)).encode())
+    for e in extra:
+        h.update(str(e).encode())
+    return h.hexdigest()
+
+
+def field_file_name(field: str) -> str:
+    """
+    Convert a field name to a safe file name.
+    """
+    return re.sub(r'[^\w\-.]', '_', field)
+
+
+def _init_worker() -> None:
+    plt.switch_backend('Agg')
+
+
+@contextmanager
+def _agg_backend():
+    # render with the non-interactive Agg backend, where plt.show neither closes figures (inline) nor blocks (GUI),
+    # and restore the caller's backend afterwards
+    backend = plt.get_backend()
+    plt.switch_backend('Agg')
+    try:
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', message='.*non-GUI backend.*')
+            yield
+    finally:
+        plt.switch_backend(backend)
+
+
+def _save_current_fig(path: str, dpi: int) -> bool:
+    if not plt.get_fignums():
+        return False
+    plt.gcf().savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close('all')
+    return True
+
+
+def render_field_report(data: pd.DataFrame, field: str, summary: pd.DataFrame, out_dir: str,
+                        date_col: str = 'collection_date', dpi: int = 80, plots: List[str] = REPORT_PLOTS) -> dict:
+    """
+    Render the report of a single field to PNG files and an HTML page.
+
+    Args:
+        data (pd.DataFrame): The data of the field, optionally with 'age', 'sex' and date_col columns.
+        field (str): The name of the field.
+        summary (pd.DataFrame): The dictionary entry and summary statistics of the field.
+        out_dir (str): The output directory of the report.
+        date_col (str, optional): The name of the date column. Defaults to 'collection_date'.
+        dpi (int, optional): The resolution of the PNG files. Defaults to 80.
+        plots (List[str], optional): The plots to render, out of REPORT_PLOTS. Defaults to REPORT_PLOTS.
+
+    Returns:
+        dict: The rendered plots and any errors encountered.
+    """
+    fname = field_file_name(field)
+    os.makedirs(os.path.join(out_dir, fname), exist_ok=True)
+    plt.close('all')
+
+    rendered, errors = [], []
+    if pd.api.types.is_numeric_dtype(data[field]) and not pd.api.types.is_bool_dtype(data[field]):
+        renderers = {
+            'hist_ecdf': lambda: hist_ecdf_plots(data, field),
+            'age_ref': lambda: GenderAgeRefPlot(data, field, age_col='age').plot(),
+            'dates_dist': lambda: dates_dist_plot(
+                data.dropna(subset=[date_col]).assign(**{date_col: lambda x: pd.to_datetime(x[date_col])}),
+                field, date_col=date_col),
+        }
+        if ('age' not in data.columns) or ('sex' not in data.columns):
+            renderers.pop('age_ref')
+        if date_col not in data.columns:
+            renderers.pop('dates_dist')
+        renderers = {name: render for name, render in renderers.items() if name in plots}
+        for name, render in renderers.items():
+            try:
+                render()
+                if _save_current_fig(os.path.join(out_dir, fname, f'{name}.png'), dpi):
+                    rendered.append(name)
+            except Exception as err:
+                errors.append(f'{name}: {err}')
+            finally:
+                plt.close('all')
+
+    images = '\n'.join([f'<img src="{fname}/{p}.png" alt="{p}">' for p in rendered])
+    page = f"""<html><head><meta charset="utf-8"><title>{html.escape(field)}</title></head>
+<body>
+<p><a href="index.html">Index</a></p>
+<h1>{html.escape(field)}</h1>
+{summary.to_html()}
+{images}
+</body></html>
+"""
+    with open(os.path.join(out_dir, f'{fname}.html'), 'w') as f:
+        f.write(page)
+
+    return {'plots': rendered, 'errors': errors}
+
+
+def write_report_index(status: pd.DataFrame, out_dir: str, title: str = '') -> str:
+    """
+    Write an index page linking the reports of all fields.
+
+    Args:
+        status (pd.DataFrame): The report status table, indexed by field, as returned by generate_field_reports.
+        out_dir (str): The output directory of the report.
+        title (str, optional): The title of the index page. Defaults to ''.
+
+    Returns:
+        str: The path to the index page.
+    """
+    rows = []
+    for field, r in status.iterrows():
+        rows.append(
+            f'<tr><td><a href="{field_file_name(field)}.html">{html.escape(field)}</a></td>'
+            f'<td>{html.escape(str(r.get("description", "")))}</td>'
+            f'<td>{r["status"]}</td><td>{html.escape(str(r["errors"]))}</td></tr>')
+    page = f"""<html><head><meta charset="utf-8"><title>{html.escape(title)}</title></head>
+<body>
+<h1>{html.escape(title)}</h1>
+<table border="1">
+<tr><th>field</th><th>description</th><th>status</th><th>errors</th></tr>
+{''.join(rows)}
+</table>
+</body></html>
+"""
+    path = os.path.join(out_dir, 'index.html')
+    with open(path, 'w') as f:
+        f.write(page)
+    return path
+
+
+def generate_field_reports(
+    dl,
+    out_dir: str,
+    fields: Optional[List[str]] = None,
+    date_col: str = 'collection_date',
+    n_jobs: Optional[int] = None,
+    force: bool = False,
+    dpi: int = 80,
+    plots: List[str] = REPORT_PLOTS,
+    errors: Optional[str] = None,
+    verbose: bool = False,
+) -> pd.DataFrame:
+    """
+    Generate a report (PNG plots and an HTML page) for every field of a dataset.
+
+    Args:
+        dl (DataLoader): The data loader of the dataset.
+        out_dir (str): The output directory of the report.
+        fields (List[str], optional): The fields to report. Defaults to None, which reports all fields of the dataset
+            excluding age, sex and date_col.
+        date_col (str, optional): The name of the date column used for dates_dist_plot. Defaults to 'collection_date'.
+        n_jobs (int, optional): The number of worker processes. 1 renders in the current process. Defaults to None (all CPUs).
+        force (bool, optional): Whether to regenerate fields whose inputs haven't changed. Defaults to False.
+        dpi (int, optional): The resolution of the PNG files. Defaults to 80.
+        plots (List[str], optional): The plots to render, out of REPORT_PLOTS. Defaults to REPORT_PLOTS.
+        errors (str, optional): Whether to 'raise', 'warn' or 'ignore' errors. Defaults to None, which uses dl.errors.
+            Fields whose plots fail are reported as 'failed', and are rendered again on the next run.
+        verbose (bool, optional): Whether to print the number of reports generated and the time taken.
+            Defaults to False.
+
+    Returns:
+        pd.DataFrame: The status of each field ('generated', 'skipped' or 'failed'), its content hash and errors.
+    """
+    if errors is None:
+        errors = dl.errors
+    if fields is None:
+        fields = [f for f in dl.fields if f not in ['age', 'sex', date_col]]
+    os.makedirs(out_dir, exist_ok=True)
+
+    manifest_path = os.path.join(out_dir, REPORT_MANIFEST)
+    manifest = {}
+    if os.path.isfile(manifest_path):
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+
+    aux_cols = [c for c in ['age', 'sex', date_col] if c in dl.fields]
+    status = {}
+    tasks = {}
+    for field in fields:
+        try:
+            data = dl.get([field] + aux_cols)
+            data = data[[field] + data.columns.intersection(aux_cols).drop(field, errors='ignore').tolist()]
+            dict_entry = dl.dict.reindex([field])
+            summary = pd.concat([dict_entry.T, custom_describe(data[[field]])])
+        except Exception as err:
+            if errors == 'raise':
+                raise err
+            elif errors == 'warn':
+                warnings.warn(f'Error loading {field}: {err}')
+            status[field] = {'status': 'failed', 'hash': None, 'errors': str(err)}
+            continue
+
+        content_hash = hash_field_data(data, dict_entry.to_dict(), date_col, dpi, list(plots))
+        page = os.path.join(out_dir, f'{field_file_name(field)}.html')
+        if not force and manifest.get(field) == content_hash and os.path.isfile(page):
+            status[field] = {'status': 'skipped', 'hash': content_hash, 'errors': ''}
+            continue
+        tasks[field] = (data, field, summary, out_dir, date_col, dpi, list(plots)), content_hash
+
+    def collect(field, result):
+        content_hash = tasks[field][1]
+        if result['errors']:
+            # the field is left out of the manifest, so that its plots are rendered again on the next run
+            if errors == 'warn':
+                warnings.warn(f'Error rendering {field}: {"; ".join(result["errors"])}')
+            status[field] = {'status': 'failed', 'hash': None, 'errors': '; '.join(result['errors'])}
+            manifest.pop(field, None)
+            return
+        status[field] = {'status': 'generated', 'hash': content_hash, 'errors': ''}
+        manifest[field] = content_hash
+
+    def fail(field, err):
+        if errors == 'raise':
+            raise err
+        elif errors == 'warn':
+            warnings.warn(f'Error rendering {field}: {err}')
+        status[field] = {'status': 'failed', 'hash': None, 'errors': str(err)}
+        manifest.pop(field, None)
+
+    start = time.time()
+    if n_jobs == 1:
+        with _agg_backend():
+            for field, (args, _) in tasks.items():
+                try:
+                    collect(field, render_field_report(*args))
+                except Exception as err:
+                    fail(field, err)
+    elif len(tasks):
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker) as pool:
+            futures = {pool.submit(render_field_report, *args): field for field, (args, _) in tasks.items()}
+            for future in as_completed(futures):
+                try:
+                    collect(futures[future], future.result())
+                except Exception as err:
+                    fail(futures[future], err)
+
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=1)
+
+    status = pd.DataFrame.from_dict(status, orient='index').reindex(fields)
+    status.index.name = 'field'
+    if 'description_string' in dl.dict.columns:
+        status['description'] = dl.dict['description_string'].reindex(status.index).fillna('')
+    write_report_index(status, out_dir, title=f'{dl.dataset} report')
+    if verbose:
+        print(f'Generated {(status["status"] == "generated").sum()} reports '
+              f'({(status["status"] == "skipped").sum()} unchanged) in {time.time() - start:.1f}s')
+
+    return status
@@ -1,30 +1,165 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/02_blandaltman_plots.ipynb.
 
 # %% auto 0
-__all__ = ['bland_altman_triple_plot']
+__all__ = ['BA_STATS', 'bland_altman_stats', 'bland_altman_plot', 'bland_altman_triple_plot']
 
 # %% ../nbs/02_blandaltman_plots.ipynb 3
 from .config import *
+from .density_plots import scatter_density, DENSITY_THRESHOLD
 
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+import matplotlib.transforms as transforms
 import seaborn as sns
-from scipy.stats import pearsonr
-from typing import Tuple
-import importlib
+from scipy import stats
+from typing import List, Optional, Tuple
 
 # %% ../nbs/02_blandaltman_plots.ipynb 4
-try:
-    importlib.import_module("pyCompare")
-except ImportError:
-    raise ImportError("The 'pyCompare' library is not installed. Please install it using 'pip install pyCompare' before running this script.")
+BA_STATS = ['bias', 'sd', 'lower_loa', 'upper_loa', 'bias_ci_low', 'bias_ci_high',
+            'lower_loa_ci_low', 'lower_loa_ci_high', 'upper_loa_ci_low', 'upper_loa_ci_high']
 
-from pyCompare import blandAltman
+
+def _agreement_stats(diff: np.ndarray, valid: np.ndarray, limit_of_agreement: float,
+                     confidence_interval: float) -> dict:
+    """
+    Bias, limits of agreement and their approximate confidence intervals (Bland & Altman, 1999)
+    for each column of a (samples x pairs) array of differences.
+    """
+    n = valid.sum(axis=0)
+    diff = np.where(valid, diff, 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        md = diff.sum(axis=0) / n
+        # population SD, as in pyCompare
+        sd = np.sqrt(np.where(valid, (diff - md)**2, 0).sum(axis=0) / n)
+        t = stats.t.ppf(0.5 + confidence_interval / 200, n - 1)
+        bias_range = t * sd / np.sqrt(n)
+        loa_range = t * np.sqrt((1 / n + limit_of_agreement**2 / (2 * (n - 1))) * sd**2)
+    lower_loa = md - limit_of_agreement * sd
+    upper_loa = md + limit_of_agreement * sd
+
+    return dict(zip(BA_STATS, [
+        md, sd, lower_loa, upper_loa, md - bias_range, md + bias_range,
+        lower_loa - loa_range, lower_loa + loa_range, upper_loa - loa_range, upper_loa + loa_range]))
+
+
+def bland_altman_stats(
+    data: pd.DataFrame,
+    pairs: List[Tuple[str, str]],
+    limit_of_agreement: float = 1.96,
+    confidence_interval: float = 95,
+) -> pd.DataFrame:
+    """
+    Computes agreement statistics for many pairs of measurement columns in one vectorized pass.
+
+    For each (m1, m2) pair, only rows where both measurements are available are used. The statistics are computed
+    both for the difference m1 - m2 and for the percentage difference 100 * (m1 - m2) / mean(m1, m2) (prefixed by 'pct_').
+
+    Args:
+        data (pd.DataFrame): A pandas DataFrame containing the data.
+        pairs (List[Tuple[str, str]]): A list of (m1_col, m2_col) column pairs.
+        limit_of_agreement (float, optional): The multiple of SD used for the limits of agreement. Defaults to 1.96.
+        confidence_interval (float, optional): The confidence interval (in percent) of the bias and limits of agreement. Defaults to 95.
+
+    Returns:
+        pd.DataFrame: A DataFrame indexed by (m1, m2) with the number of paired samples (n), Pearson correlation (r, r_pvalue),
+            bias, sd, limits of agreement (lower_loa, upper_loa), their confidence intervals (*_ci_low, *_ci_high),
+            and the same statistics for the percentage difference (pct_*).
+    """
+    if not (1 < confidence_interval < 99.9):
+        raise ValueError(f'confidence_interval must be in the range 1 to 99.9, got {confidence_interval}')
+    m1 = data[[p[0] for p in pairs]].to_numpy(dtype=float)
+    m2 = data[[p[1] for p in pairs]].to_numpy(dtype=float)
+    valid = ~(np.isnan(m1) | np.isnan(m2))
+    n = valid.sum(axis=0)
+
+    mean = (m1 + m2) / 2
+    diff = m1 - m2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pct_diff = 100 * diff / mean
+    pct_valid = valid & np.isfinite(pct_diff)
+
+    res = {'n': n}
+
+    # Pearson correlation on the paired samples
+    with np.errstate(invalid='ignore', divide='ignore'):
+        c1 = np.where(valid, m1 - np.where(valid, m1, 0).sum(axis=0) / n, 0)
+        c2 = np.where(valid, m2 - np.where(valid, m2, 0).sum(axis=0) / n, 0)
+        r = (c1 * c2).sum(axis=0) / np.sqrt((c1**2).sum(axis=0) * (c2**2).sum(axis=0))
+        r = np.clip(r, -1, 1)
+        t_r = r * np.sqrt((n - 2) / (1 - r**2))
+    res['r'] = r
+    res['r_pvalue'] = 2 * stats.t.sf(np.abs(t_r), n - 2)
+
+    res.update(_agreement_stats(diff, valid, limit_of_agreement, confidence_interval))
+    pct = _agreement_stats(pct_diff, pct_valid, limit_of_agreement, confidence_interval)
+    res.update({f'pct_{k}': v for k, v in pct.items()})
+    res['limit_of_agreement'] = limit_of_agreement
+
+    return pd.DataFrame(res, index=pd.MultiIndex.from_tuples(pairs, names=['m1', 'm2']))
 
 # %% ../nbs/02_blandaltman_plots.ipynb 5
+def bland_altman_plot(
+    m1: pd.Series, m2: pd.Series, ba_stats: pd.Series, ax: Optional[plt.Axes] = None, percentage: bool = False,
+    density: str = 'auto', density_threshold: int = DENSITY_THRESHOLD,
+    mean_color: str = "#6495ED", loa_color: str = "coral", point_color: str = "#6495ED",
+) -> plt.Axes:
+    """
+    Draws a Bland-Altman plot from precomputed agreement statistics.
+
+    Args:
+        m1 (pd.Series): The first measurement (paired samples only).
+        m2 (pd.Series): The second measurement (paired samples only).
+        ba_stats (pd.Series): A row of the DataFrame returned by bland_altman_stats for this pair.
+        ax (Optional[plt.Axes], optional): The axes to plot on. Defaults to None.
+        percentage (bool, optional): Whether to plot the percentage difference. Defaults to False.
+        density (str, optional): The rendering mode of the points, see scatter_density. Defaults to 'auto'.
+        density_threshold (int, optional): The number of points above which 'auto' uses density shading. Defaults to DENSITY_THRESHOLD.
+        mean_color (str, optional): The color of the bias line. Defaults to "#6495ED".
+        loa_color (str, optional): The color of the limits of agreement. Defaults to "coral".
+        point_color (str, optional): The color of the points. Defaults to "#6495ED".
+
+    Returns:
+        plt.Axes: The axes of the plot.
+    """
+    if ax is None:
+        fig, ax = plt.subplots(1, 1, figsize=(6, 5))
+    prefix = 'pct_' if percentage else ''
+    s = {k: ba_stats[prefix + k] for k in BA_STATS}
+    loa = ba_stats['limit_of_agreement']
+
+    mean = (m1 + m2) / 2
+    diff = m1 - m2
+    if percentage:
+        diff = 100 * diff / mean
+
+    ax.axhspan(s['bias_ci_low'], s['bias_ci_high'], facecolor=mean_color, alpha=0.2)
+    ax.axhspan(s['upper_loa_ci_low'], s['upper_loa_ci_high'], facecolor=loa_color, alpha=0.2)
+    ax.axhspan(s['lower_loa_ci_low'], s['lower_loa_ci_high'], facecolor=loa_color, alpha=0.2)
+    ax.axhline(s['bias'], color=mean_color, linestyle="--")
+    ax.axhline(s['upper_loa'], color=loa_color, linestyle="--")
+    ax.axhline(s['lower_loa'], color=loa_color, linestyle="--")
+    scatter_density(mean, diff, ax=ax, mode=density, threshold=density_threshold, color=point_color, alpha=0.5)
+
+    trans = transforms.blended_transform_factory(ax.transAxes, ax.transData)
+    offset = (s['upper_loa'] - s['lower_loa']) / 100 * 1.5
+    ax.text(0.98, s['bias'] + offset, "Mean", ha="right", va="bottom", transform=trans)
+    ax.text(0.98, s['bias'] - offset, f"{s['bias']:.2f}", ha="right", va="top", transform=trans)
+    ax.text(0.98, s['upper_loa'] + offset, f"+{loa:.2f} SD", ha="right", va="bottom", transform=trans)
+    ax.text(0.98, s['upper_loa'] - offset, f"{s['upper_loa']:.2f}", ha="right", va="top", transform=trans)
+    ax.text(0.98, s['lower_loa'] - offset, f"-{loa:.2f} SD", ha="right", va="top", transform=trans)
+    ax.text(0.98, s['lower_loa'] + offset, f"{s['lower_loa']:.2f}", ha="right", va="bottom", transform=trans)
+
+    ax.spines["right"].set_visible(False)
+    ax.spines["top"].set_visible(False)
+
+    return ax
+
+
 def bland_altman_triple_plot(
-    data: pd.DataFrame, m1_col: str, m2_col: str, feature_str: str = ""
+    data: pd.DataFrame, m1_col: str, m2_col: str, feature_str: str = "",
+    density: str = 'auto', density_threshold: int = DENSITY_THRESHOLD,
+    ba_stats: Optional[pd.DataFrame] = None,
 ) -> None:
     """
     Generates a triple plot consisting of a scatter correlation plot, Bland-Altman plot, and a percentage Bland-Altman plot.
@@ -34,13 +169,22 @@ def bland_altman_triple_plot(
         m1_col (str): The name of the first measurement column in the DataFrame.
         m2_col (str): The name of the second measurement column in the DataFrame.
         feature_str (str, optional): A string to include in the title of the plots. Defaults to "".
+        density (str, optional): The rendering mode of the scatters, one of 'auto', 'scatter', 'hexbin',
+            'hist2d', 'downsample'. 'auto' switches to hexbin shading above density_threshold points. Defaults to 'auto'.
+        density_threshold (int, optional): The number of points above which 'auto' uses density shading. Defaults to DENSITY_THRESHOLD.
+        ba_stats (Optional[pd.DataFrame], optional): Precomputed statistics from bland_altman_stats that include the
+            (m1_col, m2_col) pair. Defaults to None, which computes them.
 
     Returns:
         None
     """
+    if ba_stats is None:
+        ba_stats = bland_altman_stats(data, [(m1_col, m2_col)])
+    s = ba_stats.loc[(m1_col, m2_col)]
 
-    m1 = data.dropna(subset=[m1_col, m2_col])[m1_col] 
-    m2 = data.dropna(subset=[m1_col, m2_col])[m2_col]
+    paired = data[[m1_col, m2_col]].dropna()
+    m1 = paired[m1_col]
+    m2 = paired[m2_col]
     min_val = np.min([np.min(m1), np.min(m2)])
     max_val = np.min([np.max(m1), np.max(m2)])
 
@@ -48,7 +192,13 @@ def bland_altman_triple_plot(
     fig.suptitle(f"{feature_str} - Bland-Altman plots", fontsize=16)
 
     ax = axes[0]
-    sns.regplot(x=m1, y=m2, ax=ax, scatter_kws=dict(alpha=0.3))
+    scatter_density(m1, m2, ax=ax, mode=density, threshold=density_threshold, color="C0", alpha=0.3)
+    # a least-squares fit, rather than a regression plot that bootstraps its confidence band over every point
+    slope, intercept = np.polyfit(m1, m2, 1)
+    fit_x = np.array([m1.min(), m1.max()])
+    ax.plot(fit_x, slope * fit_x + intercept, color="C0")
+    ax.set_xlabel(m1.name)
+    ax.set_ylabel(m2.name)
     ax.plot(
         [min_val * 0.99, max_val * 1.01],
         [min_val * 0.99, max_val * 1.01],
@@ -59,15 +209,14 @@ def bland_altman_triple_plot(
     ax.set_ylim(min_val * 0.99, max_val * 1.01)
     ax.spines["right"].set_visible(False)
     ax.spines["top"].set_visible(False)
-    r = np.round(pearsonr(data.dropna(subset=[m1_col,m2_col])[m1_col], data.dropna(subset=[m1_col,m2_col])[m2_col])[0], 3)
-    ax.set_title(f"r={r}")
+    ax.set_title(f"r={np.round(s['r'], 3)}")
 
     ax = axes[1]
-    blandAltman(m1, m2, ax=ax)
+    bland_altman_plot(m1, m2, s, ax=ax, density=density, density_threshold=density_threshold)
     ax.set_xlabel(f"Mean of {m1.name} and {m2.name}")
     ax.set_ylabel(f"{m1.name} - {m2.name}")
 
     ax = axes[2]
-    blandAltman(m1, m2, ax=ax, percentage=True)
+    bland_altman_plot(m1, m2, s, ax=ax, percentage=True, density=density, density_threshold=density_threshold)
     ax.set_xlabel(f"Mean of {m1.name} and {m2.name}")
     ax.set_ylabel(f"Percentage ({m1.name} - {m2.name})")
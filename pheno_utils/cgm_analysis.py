@@ -0,0 +1,603 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/15_cgm_analysis.ipynb.
+
+# %% auto 0
+__all__ = ['CGM_GROUPS', 'GLUCOSE_RANGES', 'AGP_QUANTILES', 'prepare_cgm', 'group_mean', 'group_std', 'lagged_index',
+           'turning_points', 'cgm_metrics', 'resample_segments', 'grouped_quantiles', 'agp_percentiles', 'resample_cgm',
+           'meal_responses']
+
+# %% ../nbs/15_cgm_analysis.ipynb 3
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# %% ../nbs/15_cgm_analysis.ipynb 4
+from .config import *
+
+# %% ../nbs/15_cgm_analysis.ipynb 6
+CGM_GROUPS = ['participant_id', 'research_stage']
+GLUCOSE_RANGES = {'very_low': 54, 'low': 70, 'high': 180, 'very_high': 250}  # mg/dL
+AGP_QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+
+def prepare_cgm(
+    cgm_df: pd.DataFrame,
+    gluc_col: str = "glucose",
+    date_col: str = "collection_timestamp",
+    by: Optional[List[str]] = None,
+) -> Tuple[pd.DataFrame, pd.Index]:
+    """
+    Flatten a CGM table, drop missing readings and sort it by group and time.
+
+    Args:
+        cgm_df (pd.DataFrame): The CGM readings, with the group, date and glucose columns either as columns or index levels.
+        gluc_col (str, optional): The name of the glucose column. Defaults to "glucose".
+        date_col (str, optional): The name of the timestamp column. Defaults to "collection_timestamp".
+        by (List[str], optional): The columns that define a recording. Defaults to None, which uses the available
+            columns of CGM_GROUPS.
+
+    Returns:
+        Tuple[pd.DataFrame, pd.Index]: A sorted DataFrame with the columns 'group' (integer code), 't' (seconds since epoch),
+            'offset' (seconds from UTC to local time), date_col and gluc_col, and the index of the groups.
+    """
+    df = cgm_df.reset_index()
+    if by is None:
+        by = [c for c in CGM_GROUPS if c in df.columns]
+    df = df.dropna(subset=[date_col, gluc_col])
+
+    if len(by):
+        grouper = df.groupby(by, sort=True, observed=True)
+        codes = grouper.ngroup().to_numpy()
+        groups = grouper.size().index
+    else:
+        codes = np.zeros(len(df), dtype=int)
+        groups = pd.RangeIndex(1, name='group')
+
+    dates = pd.DatetimeIndex(df[date_col])
+    t = dates.asi8 // 10**9
+    # local time minus UTC in seconds, for time of day computations
+    offset = (dates.tz_localize(None).asi8 // 10**9 - t) if dates.tz is not None else np.zeros(len(t), dtype=np.int64)
+    order = np.lexsort((t, codes))
+    prepared = pd.DataFrame({
+        'group': codes[order],
+        't': t[order],
+        'offset': offset[order],
+        date_col: dates.take(order),
+        gluc_col: df[gluc_col].to_numpy(dtype=float)[order],
+    })
+
+    return prepared, groups
+
+
+def group_mean(x: np.ndarray, codes: np.ndarray, n_groups: int, mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Mean of x per group code, ignoring entries where mask is False. Empty groups are NaN.
+    """
+    if mask is None:
+        mask = np.isfinite(x)
+    n = np.bincount(codes[mask], minlength=n_groups)
+    s = np.bincount(codes[mask], weights=x[mask], minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return s / n
+
+
+def group_std(x: np.ndarray, codes: np.ndarray, n_groups: int, mask: Optional[np.ndarray] = None,
+              ddof: int = 1) -> np.ndarray:
+    """
+    Standard deviation of x per group code, ignoring entries where mask is False.
+    """
+    if mask is None:
+        mask = np.isfinite(x)
+    n = np.bincount(codes[mask], minlength=n_groups)
+    mean = group_mean(x, codes, n_groups, mask)
+    ss = np.bincount(codes[mask], weights=(x[mask] - mean[codes[mask]])**2, minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.sqrt(ss / (n - ddof))
+
+
+def lagged_index(t: np.ndarray, codes: np.ndarray, lag: float, tolerance: float) -> np.ndarray:
+    """
+    For each reading, find the reading of the same group closest to `lag` seconds earlier.
+
+    Args:
+        t (np.ndarray): Times in seconds, sorted within each group (groups sorted by code).
+        codes (np.ndarray): Group codes (sorted).
+        lag (float): The lag in seconds.
+        tolerance (float): The maximal distance in seconds from the lagged time.
+
+    Returns:
+        np.ndarray: The index of the lagged reading, or -1 if there is none within tolerance.
+    """
+    if not len(t):
+        return np.zeros(0, dtype=int)
+    # times relative to the start of each group, offset so that groups never overlap
+    starts = np.zeros(codes.max() + 1, dtype=np.int64)
+    first = np.r_[True, codes[1:] != codes[:-1]]
+    starts[codes[first]] = t[first]
+    rel = t - starts[codes]
+    span = rel.max() + int(lag) + int(tolerance) + 1
+    key = codes.astype(np.int64) * span + rel
+    target = key - lag
+
+    right = np.clip(np.searchsorted(key, target), 0, len(key) - 1)
+    left = np.clip(right - 1, 0, len(key) - 1)
+    nearest = np.where(np.abs(key[left] - target) < np.abs(key[right] - target), left, right)
+    valid = (np.abs(key[nearest] - target) <= tolerance) & (codes[nearest] == codes) & (nearest != np.arange(len(key)))
+
+    return np.where(valid, nearest, -1)
+
+
+def turning_points(x: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """
+    Indices of local extrema (including the first and last reading) of each group, ignoring plateaus.
+    """
+    n = len(x)
+    same = codes[1:] == codes[:-1]
+    k = np.flatnonzero(same & (np.diff(x) != 0))  # non-flat steps k -> k+1 within a group
+    s = np.sign(x[k + 1] - x[k])
+    change = np.r_[False, (s[1:] != s[:-1]) & (codes[k[1:]] == codes[k[:-1]])]
+    first = np.flatnonzero(np.r_[True, ~same])
+    last = np.flatnonzero(np.r_[~same, True])
+    return np.unique(np.concatenate([first, last, k[change]])) if n else np.zeros(0, dtype=int)
+
+# %% ../nbs/15_cgm_analysis.ipynb 8
+def _mage(x: np.ndarray, sd: float) -> float:
+    # the mean amplitude of the peak-to-nadir excursions larger than sd, from the turning points of a recording.
+    # Smaller excursions are merged into the surrounding ones, smallest first, and the partial excursions at the start
+    # and end of the recording are left out.
+    while True:
+        d = np.diff(x)
+        x = x[np.r_[True, d[1:] * d[:-1] < 0, True]] if len(x) > 2 else x  # keep only alternating extrema
+        amp = np.abs(np.diff(x))
+        if len(amp) < 2 or amp.min() >= sd:
+            break
+        i = amp.argmin()
+        if i == 0:
+            x = np.delete(x, 1)
+        elif i == len(amp) - 1:
+            x = np.delete(x, -2)
+        else:
+            x = np.delete(x, [i, i + 1])
+    return amp[1:-1].mean() if len(amp) > 2 else np.nan
+
+
+def _cgm_metrics(prepared: pd.DataFrame, n_groups: int, gluc_col: str, conga_hours: float,
+                 tolerance: Optional[float]) -> pd.DataFrame:
+    codes = prepared['group'].to_numpy()
+    t = prepared['t'].to_numpy()
+    g = prepared[gluc_col].to_numpy()
+
+    n = np.bincount(codes, minlength=n_groups)
+    res = {'n_readings': n}
+    t_start = np.full(n_groups, np.nan)
+    t_end = np.full(n_groups, np.nan)
+    first = np.r_[True, codes[1:] != codes[:-1]] if len(codes) else np.zeros(0, dtype=bool)
+    last = np.r_[codes[1:] != codes[:-1], True] if len(codes) else np.zeros(0, dtype=bool)
+    t_start[codes[first]] = t[first]
+    t_end[codes[last]] = t[last]
+    res['days'] = (t_end - t_start) / 86400
+
+    mean = group_mean(g, codes, n_groups)
+    sd = group_std(g, codes, n_groups)
+    res['mean'] = mean
+    res['sd'] = sd
+    with np.errstate(invalid='ignore', divide='ignore'):
+        res['cv'] = 100 * sd / mean
+    res['gmi'] = 3.31 + 0.02392 * mean
+
+    # time in ranges
+    r = GLUCOSE_RANGES
+    bands = {
+        'tbr_very_low': g < r['very_low'],
+        'tbr_low': (r['very_low'] <= g) & (g < r['low']),
+        'tir': (r['low'] <= g) & (g <= r['high']),
+        'tar_high': (r['high'] < g) & (g <= r['very_high']),
+        'tar_very_high': r['very_high'] < g,
+    }
+    for band, mask in bands.items():
+        res[band] = 100 * group_mean(mask.astype(float), codes, n_groups, np.ones(len(g), dtype=bool))
+
+    # glycemic risk indices
+    with np.errstate(invalid='ignore', divide='ignore'):
+        f = 1.509 * (np.log(g)**1.084 - 5.381)
+    risk = 10 * f**2
+    res['lbgi'] = group_mean(np.where(f < 0, risk, 0), codes, n_groups)
+    res['hbgi'] = group_mean(np.where(f > 0, risk, 0), codes, n_groups)
+
+    # MAGE
+    tp = turning_points(g, codes)
+    bounds = np.searchsorted(codes[tp], np.arange(n_groups + 1))
+    res['mage'] = np.array([_mage(g[tp[bounds[i]:bounds[i + 1]]], sd[i]) for i in range(n_groups)])
+
+    # lagged differences
+    if tolerance is None:
+        steps = np.diff(t)[codes[1:] == codes[:-1]]
+        tolerance = np.median(steps[steps > 0]) / 2 if (steps > 0).any() else 0
+    for name, lag in [('modd', 86400), ('conga', 3600 * conga_hours)]:
+        ind = lagged_index(t, codes, lag, tolerance)
+        valid = ind >= 0
+        delta = g[valid] - g[ind[valid]]
+        if name == 'modd':
+            res[name] = group_mean(np.abs(delta), codes[valid], n_groups)
+        else:
+            res[name] = group_std(delta, codes[valid], n_groups)
+
+    return pd.DataFrame(res)
+
+
+def cgm_metrics(
+    cgm_df: pd.DataFrame,
+    gluc_col: str = "glucose",
+    date_col: str = "collection_timestamp",
+    by: Optional[List[str]] = None,
+    conga_hours: float = 1,
+    tolerance: Optional[float] = None,
+    n_jobs: int = 1,
+) -> pd.DataFrame:
+    """
+    Compute glycemic metrics for every recording (e.g., participant and research stage) in a CGM table.
+
+    Args:
+        cgm_df (pd.DataFrame): The CGM readings of any number of participants, e.g., from `DataLoader.load_sample_data`.
+        gluc_col (str, optional): The name of the glucose column (mg/dL). Defaults to "glucose".
+        date_col (str, optional): The name of the timestamp column. Defaults to "collection_timestamp".
+        by (List[str], optional): The columns that define a recording. Defaults to None, which uses the available
+            columns of CGM_GROUPS.
+        conga_hours (float, optional): The lag of CONGA in hours. Defaults to 1.
+        tolerance (float, optional): The maximal distance in seconds of a lagged reading for MODD and CONGA.
+            Defaults to None, which uses half the median sampling interval.
+        n_jobs (int, optional): The number of worker processes. Recordings are split between workers. Defaults to 1.
+
+    Returns:
+        pd.DataFrame: The metrics of each recording, indexed by the `by` columns.
+    """
+    prepared, groups = prepare_cgm(cgm_df, gluc_col, date_col, by)
+
+    if n_jobs == 1 or len(groups) < 2 * n_jobs:
+        res = _cgm_metrics(prepared, len(groups), gluc_col, conga_hours, tolerance)
+    else:
+        chunks = np.array_split(np.arange(len(groups)), n_jobs * 4)
+        bounds = np.searchsorted(prepared['group'].to_numpy(), [c[0] for c in chunks] + [len(groups)])
+        parts = [prepared.iloc[bounds[i]:bounds[i + 1]].assign(group=lambda x, s=c[0]: x['group'] - s)
+                 for i, c in enumerate(chunks)]
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            results = pool.map(_cgm_metrics, parts, [len(c) for c in chunks], [gluc_col] * len(parts),
+                               [conga_hours] * len(parts), [tolerance] * len(parts))
+            res = pd.concat(list(results), ignore_index=True)
+
+    res.index = groups
+    return res
+
+
+# %% ../nbs/15_cgm_analysis.ipynb 14
+def resample_segments(t: np.ndarray, x: np.ndarray, codes: np.ndarray, step: float, max_gap: float,
+                      method: str = 'linear') -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Interpolate sorted readings onto a regular time grid, only within gaps of up to max_gap seconds.
+
+    Readings closer than max_gap form contiguous segments that are interpolated independently. The cubic method uses
+    a Hermite spline with finite difference slopes, which is local to each interval and never crosses a gap.
+
+    Args:
+        t (np.ndarray): Times in seconds, sorted within each group (groups sorted by code).
+        x (np.ndarray): The values of the readings.
+        codes (np.ndarray): Group codes (sorted).
+        step (float): The grid step in seconds. Grid points are multiples of step since the epoch.
+        max_gap (float): The maximal gap in seconds between readings to interpolate over.
+        method (str, optional): The interpolation method, 'linear' or 'cubic'. Defaults to 'linear'.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: The times and values of the resampled points, and the index of the
+            reading that starts the interval of each point. Readings that are not followed by a close enough reading
+            are kept as is.
+    """
+    if method not in ['linear', 'cubic']:
+        raise ValueError(f"method must be 'linear' or 'cubic', got {method}")
+    n = len(t)
+    same = np.r_[codes[1:] == codes[:-1], False]
+    dt = np.r_[np.diff(t), 0].astype(float)
+    bridge = same & (dt > 0) & (dt <= max_gap)
+
+    grid = -(-t // step)  # first grid point at or after each reading
+    counts = np.where(bridge, np.r_[grid[1:], 0] - grid, 1)
+    src = np.repeat(np.arange(n), counts)
+    offs = np.arange(len(src)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    bridged = bridge[src]
+    h = np.where(bridge, dt, 1)
+    t_new = np.where(bridged, (grid[src] + offs) * step, t[src])
+    frac = np.where(bridged, (t_new - t[src]) / h[src], 0)
+    x_next = np.r_[x[1:], np.nan]
+    if method == 'linear':
+        x_new = np.where(bridged, x[src] + frac * (x_next[src] - x[src]), x[src])
+        return t_new, x_new, src
+
+    # slopes: central differences inside segments, one-sided at segment ends
+    after = np.where(bridge, (x_next - x) / h, np.nan)
+    before = np.r_[np.nan, after[:-1]]
+    inside = np.isfinite(after) & np.isfinite(before)
+    span = np.r_[t[1:], 0] - np.r_[0, t[:-1]]
+    central = (x_next - np.r_[np.nan, x[:-1]]) / np.where(inside, span, 1)
+    slope = np.where(inside, central, np.where(np.isfinite(after), after, np.where(np.isfinite(before), before, 0)))
+
+    s, i = frac, src
+    m0 = slope[i] * h[i]
+    m1 = np.r_[slope[1:], 0][i] * h[i]
+    x_new = (2 * s**3 - 3 * s**2 + 1) * x[i] + (s**3 - 2 * s**2 + s) * m0 + \
+        (-2 * s**3 + 3 * s**2) * x_next[i] + (s**3 - s**2) * m1
+    x_new = np.where(bridged, x_new, x[i])
+
+    return t_new, x_new, src
+
+
+def grouped_quantiles(x: np.ndarray, keys: np.ndarray, n_keys: int, quantiles: List[float]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantiles of x per key, extracted from a single sort (linear interpolation, as in pandas).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: An array of shape (n_keys, len(quantiles)) and the number of values per key.
+    """
+    order = np.lexsort((x, keys))
+    xs = x[order]
+    n = np.bincount(keys, minlength=n_keys)
+    start = np.cumsum(n) - n
+    valid = n > 0
+
+    res = np.full((n_keys, len(quantiles)), np.nan)
+    for j, q in enumerate(quantiles):
+        pos = q * (n[valid] - 1)
+        lo = np.floor(pos).astype(int)
+        hi = np.ceil(pos).astype(int)
+        x_lo = xs[start[valid] + lo]
+        res[valid, j] = x_lo + (xs[start[valid] + hi] - x_lo) * (pos - lo)
+
+    return res, n
+
+
+def agp_percentiles(
+    cgm_df: pd.DataFrame,
+    gluc_col: str = "glucose",
+    date_col: str = "collection_timestamp",
+    by: Optional[List[str]] = None,
+    bin_minutes: int = 15,
+    quantiles: List[float] = AGP_QUANTILES,
+    step_minutes: Optional[float] = None,
+    max_gap_minutes: float = 60,
+    pooled: bool = False,
+    method: str = 'linear',
+) -> pd.DataFrame:
+    """
+    Compute ambulatory glucose profile (AGP) percentiles by time of day for every recording, or pooled over all of them.
+
+    Args:
+        cgm_df (pd.DataFrame): The CGM readings of any number of participants.
+        gluc_col (str, optional): The name of the glucose column. Defaults to "glucose".
+        date_col (str, optional): The name of the timestamp column. Defaults to "collection_timestamp".
+        by (List[str], optional): The columns that define a recording. Defaults to None, which uses the available
+            columns of CGM_GROUPS.
+        bin_minutes (int, optional): The width of the time of day bins in minutes. Defaults to 15.
+        quantiles (List[float], optional): The quantiles to compute. Defaults to AGP_QUANTILES.
+        step_minutes (float, optional): The interpolation grid step in minutes. Defaults to None, which uses bin_minutes.
+        max_gap_minutes (float, optional): The longest gap between readings to interpolate over. Use 0 to disable
+            interpolation. Defaults to 60.
+        pooled (bool, optional): Whether to pool all recordings into a single profile. Each recording is interpolated
+            separately. Defaults to False.
+        method (str, optional): The interpolation method, 'linear' or 'cubic'. Defaults to 'linear'.
+
+    Returns:
+        pd.DataFrame: The quantiles (columns) and number of points ('count') per recording and time of day bin
+            (minutes since midnight, local time).
+    """
+    prepared, groups = prepare_cgm(cgm_df, gluc_col, date_col, by)
+    codes = prepared['group'].to_numpy()
+    step = 60 * (bin_minutes if step_minutes is None else step_minutes)
+    t, x, src = resample_segments(prepared['t'].to_numpy(), prepared[gluc_col].to_numpy(), codes,
+                                  step, 60 * max_gap_minutes, method)
+
+    n_bins = -(-1440 // bin_minutes)
+    bins = (t + prepared['offset'].to_numpy()[src]) % 86400 // (60 * bin_minutes)
+    n_groups = 1 if pooled else len(groups)
+    keys = bins if pooled else codes[src] * n_bins + bins
+    values, counts = grouped_quantiles(x, keys, n_groups * n_bins, quantiles)
+
+    found = np.flatnonzero(counts)
+    res = pd.DataFrame(values[found], columns=quantiles)
+    res['count'] = counts[found]
+    minute_in_day = pd.Index(found % n_bins * bin_minutes, name='minute_in_day')
+    if pooled:
+        res.index = minute_in_day
+        return res
+
+    group_index = groups[found // n_bins]
+    if isinstance(group_index, pd.MultiIndex):
+        arrays = [group_index.get_level_values(i) for i in range(group_index.nlevels)]
+    else:
+        arrays = [group_index]
+    res.index = pd.MultiIndex.from_arrays(arrays + [minute_in_day], names=list(groups.names) + ['minute_in_day'])
+    return res
+
+# %% ../nbs/15_cgm_analysis.ipynb 21
+def resample_cgm(
+    cgm_df: pd.DataFrame,
+    gluc_col: str = "glucose",
+    date_col: str = "collection_timestamp",
+    by: Optional[List[str]] = None,
+    freq_minutes: float = 1,
+    max_gap_minutes: float = 60,
+    method: str = 'cubic',
+    batch_size: Optional[int] = 1000,
+) -> pd.DataFrame:
+    """
+    Resample CGM recordings onto a regular time grid, interpolating each contiguous segment independently.
+
+    Args:
+        cgm_df (pd.DataFrame): The CGM readings of any number of participants.
+        gluc_col (str, optional): The name of the glucose column. Defaults to "glucose".
+        date_col (str, optional): The name of the timestamp column. Defaults to "collection_timestamp".
+        by (List[str], optional): The columns that define a recording. Defaults to None, which uses the available
+            columns of CGM_GROUPS.
+        freq_minutes (float, optional): The grid step in minutes. Defaults to 1.
+        max_gap_minutes (float, optional): The longest gap between readings to interpolate over. Defaults to 60.
+        method (str, optional): The interpolation method, 'linear' or 'cubic'. Defaults to 'cubic'.
+        batch_size (int, optional): The number of recordings to interpolate at a time. Defaults to 1000.
+            None processes all recordings at once.
+
+    Returns:
+        pd.DataFrame: The resampled glucose with the `by` columns, a 'segment' number (per recording), date_col and gluc_col.
+    """
+    prepared, groups = prepare_cgm(cgm_df, gluc_col, date_col, by)
+    codes = prepared['group'].to_numpy()
+    t = prepared['t'].to_numpy()
+    x = prepared[gluc_col].to_numpy()
+    max_gap = 60 * max_gap_minutes
+
+    # segments start at the first reading of a recording or after a long gap
+    new_group = np.r_[True, codes[1:] != codes[:-1]]
+    segment = np.cumsum(new_group | np.r_[False, np.diff(t) > max_gap]) - 1
+    first_segment = np.zeros(len(groups), dtype=int)
+    first_segment[codes[new_group]] = segment[new_group]
+
+    if batch_size is None:
+        batch_size = max(len(groups), 1)
+    bounds = np.searchsorted(codes, np.arange(0, len(groups) + batch_size, batch_size))
+    parts = []
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        if lo == hi:
+            continue
+        t_new, x_new, src = resample_segments(t[lo:hi], x[lo:hi], codes[lo:hi], 60 * freq_minutes, max_gap, method)
+        src += lo
+        parts.append(pd.DataFrame({'group': codes[src], 'segment': segment[src] - first_segment[codes[src]],
+                                   't': t_new, gluc_col: x_new}))
+    res = pd.concat(parts, ignore_index=True) if parts else \
+        pd.DataFrame({'group': [], 'segment': [], 't': [], gluc_col: []}, dtype=int)
+
+    dates = pd.to_datetime(res.pop('t'), unit='s', utc=True)
+    tz = prepared[date_col].dt.tz
+    res.insert(2, date_col, dates.dt.tz_convert(tz) if tz is not None else dates.dt.tz_localize(None))
+
+    group_codes = res.pop('group').to_numpy()
+    if by is None or len(by):
+        group_index = groups[group_codes]
+        if isinstance(group_index, pd.MultiIndex):
+            for i, name in enumerate(group_index.names):
+                res.insert(i, name, group_index.get_level_values(i))
+        else:
+            res.insert(0, group_index.name, group_index)
+
+    return res
+
+# %% ../nbs/15_cgm_analysis.ipynb 25
+def _segment_reduce(ufunc: np.ufunc, x: np.ndarray, counts: np.ndarray, fill: float = np.nan) -> np.ndarray:
+    # reduce consecutive runs of x of the given lengths, where runs may be empty
+    res = np.full(len(counts), fill, dtype=float)
+    nonempty = counts > 0
+    if nonempty.any():
+        starts = (np.cumsum(counts) - counts)[nonempty]
+        res[nonempty] = ufunc.reduceat(x, starts)
+    return res
+
+
+def meal_responses(
+    cgm_df: pd.DataFrame,
+    diet_df: pd.DataFrame,
+    gluc_col: str = "glucose",
+    cgm_date_col: str = "collection_timestamp",
+    diet_date_col: str = "collection_timestamp",
+    by: Optional[List[str]] = None,
+    window_minutes: float = 120,
+    baseline_minutes: float = 30,
+) -> pd.DataFrame:
+    """
+    Compute the postprandial glucose response of every logged meal.
+
+    Args:
+        cgm_df (pd.DataFrame): The CGM readings of any number of participants.
+        diet_df (pd.DataFrame): The diet logging of the same participants, one row per food item.
+        gluc_col (str, optional): The name of the glucose column. Defaults to "glucose".
+        cgm_date_col (str, optional): The name of the timestamp column in cgm_df. Defaults to "collection_timestamp".
+        diet_date_col (str, optional): The name of the timestamp column in diet_df. Defaults to "collection_timestamp".
+        by (List[str], optional): The columns that link meals to recordings. Defaults to None, which uses the columns
+            of CGM_GROUPS available in both tables.
+        window_minutes (float, optional): The length of the response window after the meal. Defaults to 120.
+        baseline_minutes (float, optional): The length of the baseline window before the meal. Defaults to 30.
+
+    Returns:
+        pd.DataFrame: One row per meal with the `by` columns, the meal timestamp, the number of items ('n_items') and
+            readings ('n_readings') and the response features. Meals without CGM readings have missing features.
+    """
+    diet_df = diet_df.reset_index()
+    if by is None:
+        cgm_cols = set(cgm_df.columns) | set(cgm_df.index.names)
+        by = [c for c in CGM_GROUPS if c in cgm_cols and c in diet_df.columns]
+    prepared, groups = prepare_cgm(cgm_df, gluc_col, cgm_date_col, by)
+    codes = prepared['group'].to_numpy()
+    t = prepared['t'].to_numpy()
+    g = prepared[gluc_col].to_numpy()
+
+    meals = diet_df.dropna(subset=[diet_date_col]).groupby(by + [diet_date_col]).size().rename('n_items').reset_index()
+    if len(by):
+        meal_keys = pd.MultiIndex.from_frame(meals[by]) if len(by) > 1 else pd.Index(meals[by[0]])
+        meal_codes = groups.get_indexer(meal_keys)
+    else:
+        # a single recording
+        meal_codes = np.zeros(len(meals), dtype=int)
+    meal_t = pd.DatetimeIndex(meals[diet_date_col]).asi8 // 10**9
+    window, baseline = 60 * window_minutes, 60 * baseline_minutes
+
+    # sortable keys: times relative to the start of each recording, padded so that recordings never overlap
+    pad = int(window + baseline) + 1
+    start = np.zeros(len(groups), dtype=np.int64)
+    first = np.r_[True, codes[1:] != codes[:-1]] if len(codes) else np.zeros(0, dtype=bool)
+    start[codes[first]] = t[first]
+    rel = t - start[codes]
+    max_rel = rel.max() if len(rel) else 0
+    span = max_rel + 2 * pad + 1
+    key = codes.astype(np.int64) * span + rel + pad
+    found = meal_codes >= 0
+    # meals far outside a recording are moved just outside of it, where their windows stay empty
+    meal_rel = np.clip(meal_t - start[np.where(found, meal_codes, 0)], -pad, max_rel + int(baseline) + 1)
+    meal_key = np.where(found, np.maximum(meal_codes, 0).astype(np.int64) * span + meal_rel + pad, -span)
+
+    def expand(lo, hi):
+        # the meal and reading index of every reading in the windows [lo, hi)
+        counts = np.where(found, hi - lo, 0)
+        meal = np.repeat(np.arange(len(meals)), counts)
+        return counts, meal, lo[meal] + np.arange(len(meal)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    n_b, _, idx_b = expand(np.searchsorted(key, meal_key - baseline, 'left'), np.searchsorted(key, meal_key, 'right'))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        base = _segment_reduce(np.add, g[idx_b], n_b) / n_b
+
+    counts, meal, idx = expand(np.searchsorted(key, meal_key, 'left'), np.searchsorted(key, meal_key + window, 'right'))
+    gm = g[idx]
+    tm = (t[idx] - meal_t[meal]) / 60
+
+    peak = _segment_reduce(np.maximum, gm, counts)
+    time_to_peak = _segment_reduce(np.minimum, np.where(gm == peak[meal], tm, np.inf), counts)
+    returned = (tm > time_to_peak[meal]) & (gm <= base[meal])
+    return_to_baseline = _segment_reduce(np.minimum, np.where(returned, tm, np.inf), counts)
+    return_to_baseline[~np.isfinite(return_to_baseline)] = np.nan
+
+    # incremental AUC above baseline, with exact crossings of the baseline
+    d = gm - base[meal]
+    same = meal[1:] == meal[:-1]
+    d0, d1, dt = d[:-1][same], d[1:][same], np.diff(tm)[same]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        area = np.where((d0 >= 0) & (d1 >= 0), (d0 + d1) / 2 * dt,
+                        np.where((d0 <= 0) & (d1 <= 0), 0,
+                                 np.maximum(d0, d1)**2 / (2 * np.abs(d1 - d0)) * dt))
+    iauc = np.bincount(meal[1:][same], weights=area, minlength=len(meals))
+    iauc[(counts < 2) | np.isnan(base)] = np.nan
+
+    res = meals.assign(
+        n_readings=counts,
+        baseline=base,
+        peak=peak,
+        peak_rise=peak - base,
+        time_to_peak=time_to_peak,
+        iauc=iauc,
+        return_to_baseline=return_to_baseline,
+    )
+    res.loc[counts == 0, 'time_to_peak'] = np.nan
+    return res
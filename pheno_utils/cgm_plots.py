@@ -13,6 +13,9 @@ import seaborn as sns
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 
+from .cgm_analysis import agp_percentiles, resample_cgm, AGP_QUANTILES
+from .decimation import decimate_trace
+
 # %% ../nbs/08_cgm_plots.ipynb 4
 GLUC_COLOR = "C0"
 DIET_COLOR = "brown"
@@ -32,6 +35,8 @@ class CGMPlot:
         ax: Optional[plt.Axes] = None,
         smooth: bool = False,
         sleep_tuples: Optional[List[Tuple[pd.Timestamp, pd.Timestamp]]] = None,
+        resampled: Optional[pd.DataFrame] = None,
+        decimate: bool = True,
     ) -> None:
         """
         Initialize a CGMPlot object.
@@ -46,6 +51,10 @@ class CGMPlot:
             ax (Optional[plt.Axes], optional): Matplotlib Axes object to plot on. Defaults to None.
             smooth (bool, optional): Apply smoothing to the glucose curve. Defaults to False.
             sleep_tuples (Optional[List[Tuple[pd.Timestamp, pd.Timestamp]]], optional): List of sleep start and end times. Defaults to None.
+            resampled (Optional[pd.DataFrame], optional): The output of `resample_cgm` to use as the smoothed curve.
+                Defaults to None, which resamples cgm_df when smooth is True.
+            decimate (bool, optional): Reduce long traces to about the pixel width of the axes, keeping peaks.
+                Defaults to True.
         """
         self.cgm_df = cgm_df
         self.diet_df = diet_df
@@ -59,6 +68,8 @@ class CGMPlot:
         self.diet_color = DIET_COLOR
         self.datetime_start = self.cgm_df[self.cgm_date_col].iloc[0]
         self.sleep_tuples = sleep_tuples
+        self.resampled = resampled
+        self.decimate = decimate
 
         if ax is None:
             fig, ax = plt.subplots(1, 1, figsize=(18, 5))
@@ -78,21 +89,25 @@ class CGMPlot:
         ax = self.ax
         y = self.cgm_df[self.gluc_col]
         x = self.cgm_df[self.cgm_date_col]
+        if self.decimate:
+            x, y = decimate_trace(x, y, ax=ax)
         if self.smooth:
-            # smoothing
-            smoothed = (
-                self.cgm_df.set_index(self.cgm_date_col)
-                .asfreq(freq="60S")
-                .interpolate(method="cubicspline")
-            )
-            ax.plot(
-                smoothed.index,
-                smoothed[self.gluc_col],
-                ls="-",
-                lw=4,
-                color=self.gluc_color,
-                alpha=0.8,
-                )
+            # smoothing, interpolated separately within each contiguous segment
+            if self.resampled is None:
+                self.resampled = resample_cgm(
+                    self.cgm_df, gluc_col=self.gluc_col, date_col=self.cgm_date_col, by=[])
+            for _, segment in self.resampled.groupby("segment"):
+                x_s, y_s = segment[self.cgm_date_col], segment[self.gluc_col]
+                if self.decimate:
+                    x_s, y_s = decimate_trace(x_s, y_s, ax=ax)
+                ax.plot(
+                    x_s,
+                    y_s,
+                    ls="-",
+                    lw=4,
+                    color=self.gluc_color,
+                    alpha=0.8,
+                    )
         else:
             ax.plot(x, y, ls="-", lw=4, color=self.gluc_color, alpha=0.9)
         ax.scatter(x, y, s=60, color=self.gluc_color, alpha=0.6, label="Glucose")
@@ -167,19 +182,30 @@ class CGMPlot:
 class AGP:
     def __init__(
         self,
-        cgm_df: pd.DataFrame,
+        cgm_df: Optional[pd.DataFrame] = None,
         cgm_date_col: str = "collection_timestamp",
         gluc_col: str = "glucose",
         ax: Optional[plt.Axes] = None,
+        max_gap_minutes: float = 60,
+        agp_stats: Optional[pd.DataFrame] = None,
+        method: str = "cubic",
+        resampled: Optional[pd.DataFrame] = None,
     ) -> None:
         """
         Initialize an AGP object.
 
         Args:
-            cgm_df (pd.DataFrame): DataFrame containing the glucose measurements.
+            cgm_df (pd.DataFrame, optional): DataFrame containing the glucose measurements. All rows are pooled into a
+                single profile. Defaults to None.
             cgm_date_col (str, optional): Name of the date column in cgm_df. Defaults to "collection_timestamp".
             gluc_col (str, optional): Name of the glucose column in cgm_df. Defaults to "glucose".
             ax (Optional[plt.Axes], optional): Matplotlib Axes object to plot on. Defaults to None.
+            max_gap_minutes (float, optional): The longest gap between readings to interpolate over. Defaults to 60.
+            agp_stats (pd.DataFrame, optional): Precomputed percentiles indexed by minute_in_day, e.g., a pooled cohort
+                profile from `agp_percentiles`. Defaults to None, which computes them from cgm_df.
+            method (str, optional): The interpolation method, 'linear' or 'cubic'. Defaults to "cubic".
+            resampled (Optional[pd.DataFrame], optional): The output of `resample_cgm` (e.g., shared with CGMPlot) to
+                compute the profile from instead of cgm_df. Defaults to None.
         """
         self.cgm_df = cgm_df
         self.cgm_date_col = cgm_date_col
@@ -190,26 +216,27 @@ class AGP:
             fig, ax = plt.subplots(1, 1, figsize=(18, 5))
         self.ax = ax
 
-        agp_df = (
-            cgm_df.set_index(cgm_date_col)
-            .asfreq(freq="60S")
-            .interpolate(method="cubicspline")
-            .reset_index()
-        )
-        agp_df["minute_in_day"] = 60 * agp_df[self.cgm_date_col].dt.hour + agp_df[self.cgm_date_col].dt.minute
-        self.agp_df = agp_df
+        if agp_stats is None and resampled is not None:
+            agp_stats = agp_percentiles(
+                resampled, gluc_col=gluc_col, date_col=cgm_date_col, by=[], bin_minutes=1,
+                quantiles=AGP_QUANTILES, max_gap_minutes=0, pooled=True)
+        elif agp_stats is None:
+            agp_stats = agp_percentiles(
+                cgm_df, gluc_col=gluc_col, date_col=cgm_date_col, by=[], bin_minutes=1,
+                quantiles=AGP_QUANTILES, max_gap_minutes=max_gap_minutes, pooled=True, method=method)
+        self.agp_stats = agp_stats
 
     def plot(self) -> None:
         """
         Plot the AGP object.
         """
         ax = self.ax
-        agp_df = self.agp_df
-        median = agp_df.groupby("minute_in_day")["glucose"].median()
-        lo_5 = agp_df.groupby("minute_in_day")["glucose"].quantile(0.05)
-        hi_95 = agp_df.groupby("minute_in_day")["glucose"].quantile(0.95)
-        lo_25 = agp_df.groupby("minute_in_day")["glucose"].quantile(0.25)
-        hi_75 = agp_df.groupby("minute_in_day")["glucose"].quantile(0.75)
+        agp_stats = self.agp_stats
+        median = agp_stats[0.5]
+        lo_5 = agp_stats[0.05]
+        hi_95 = agp_stats[0.95]
+        lo_25 = agp_stats[0.25]
+        hi_75 = agp_stats[0.75]
 
         ax.plot(median, color="k", lw=3)
         ax.fill_between(median.index.values, lo_25, hi_75, color="navy", alpha=0.3)
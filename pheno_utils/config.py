@@ -2,8 +2,8 @@
 
 # %% auto 0
 __all__ = ['REF_COLOR', 'FEMALE_COLOR', 'MALE_COLOR', 'ALL_COLOR', 'GLUC_COLOR', 'FOOD_COLOR', 'DATASETS_PATH', 'COHORT',
-           'POPULATION_DATASET', 'ERROR_ACTION', 'CONFIG_FILES', 'generate_synthetic_data',
-           'generate_synthetic_data_like']
+           'POPULATION_DATASET', 'ERROR_ACTION', 'CACHE_PATH', 'LOCAL_CACHE_SIZE', 'LOCAL_CACHE_PATHS', 'CONFIG_FILES',
+           'generate_synthetic_data', 'generate_synthetic_data_like']
 
 # %% ../nbs/00_config.ipynb 3
 import os
@@ -24,6 +24,9 @@ DATASETS_PATH = '/home/ec2-user/studies/hpp/'
 COHORT = '10k'
 POPULATION_DATASET = 'population'
 ERROR_ACTION = 'raise'
+CACHE_PATH = '~/.pheno/cache'
+LOCAL_CACHE_SIZE = 20  # GB
+LOCAL_CACHE_PATHS = None
 CONFIG_FILES = ['.pheno/config', '~/.pheno/config', '/efs/.pheno/config']
 
 for cf in CONFIG_FILES:
@@ -42,6 +45,12 @@ for cf in CONFIG_FILES:
                     COHORT = None
             elif line.startswith('ERROR_ACTION'):
                 ERROR_ACTION = line.split('=')[1].strip()
+            elif line.startswith('CACHE_PATH'):
+                CACHE_PATH = line.split('=')[1].strip()
+            elif line.startswith('LOCAL_CACHE_SIZE'):
+                LOCAL_CACHE_SIZE = float(line.split('=')[1].strip())
+            elif line.startswith('LOCAL_CACHE_PATHS'):
+                LOCAL_CACHE_PATHS = [p.strip() for p in line.split('=')[1].split(',') if len(p.strip())]
     break
 
 
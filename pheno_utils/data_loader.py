@@ -1,13 +1,14 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/05_data_loader.ipynb.
 
 # %% auto 0
-__all__ = ['DataLoader']
+__all__ = ['DataLoader', 'write_arrow_ipc', 'read_arrow_ipc', 'BulkCache']
 
 # %% ../nbs/05_data_loader.ipynb 3
-from glob import glob
+import hashlib
+import json
 import os
 import re
-from typing import List, Any, Dict, Union
+from typing import List, Any, Dict, Tuple, Union
 import warnings
 
 import numpy as np
@@ -15,8 +16,8 @@ import pandas as pd
 
 # %% ../nbs/05_data_loader.ipynb 4
 from .config import *
-from .basic_analysis import *
-from .basic_plots import *
+from .basic_analysis import custom_describe
+from .remote_io import get_io, is_remote, read_parquet
 
 # %% ../nbs/05_data_loader.ipynb 5
 class DataLoader:
@@ -95,9 +96,11 @@ class DataLoader:
         participant_id: Union[int, List[int]],
         research_stage: Union[None, str, List[str]] = None,
         array_index: Union[None, int, List[int]] = None,
-        load_func: callable = pd.read_parquet,
+        load_func: callable = read_parquet,
         concat: bool = True,
-        pivot=None, **kwargs
+        pivot=None,
+        n_jobs: int = 1,
+        **kwargs
     ) -> Union[pd.DataFrame, None]:
         """
         Load time series or bulk data for sample(s).
@@ -107,9 +110,13 @@ class DataLoader:
             participant_id (str or list): The participant ID or IDs to load data for.
             research_stage (str or list, optional): The research stage or stages to load data for.
             array_index (int or list, optional): The array index or indices to load data for.
-            load_func (callable, optional): The function to use to load the data. Defaults to pd.read
+            load_func (callable, optional): The function to use to load the data. Defaults to read_parquet, which reads
+                remote files through the shared RemoteIO instance. Use a BulkCache to load repeatedly accessed files
+                from a memory-mapped cache.
             concat (bool, optional): Whether to concatenate the data into a single DataFrame. Automatically ignored if data is not a DataFrame. Defaults to True.
             pivot (str, optional): The name of the field to pivot the data on (if DataFrame). Defaults to None.
+            n_jobs (int, optional): The number of files loaded concurrently, with the threads of the shared RemoteIO
+                instance. Use 1 for load functions that are not thread-safe, such as plots. Defaults to 1.
         """
         query_str = 'participant_id in @participant_id'
         if not isinstance(participant_id, list):
@@ -138,17 +145,26 @@ class DataLoader:
                 return None
 
         # Load data
-        data = []
-        for p in sample.unique():
+        def load(p):
             try:
-                data.append(load_func(p, **kwargs))
-                if isinstance(data[-1], pd.DataFrame):
-                    data[-1].sort_index(inplace=True)
+                return load_func(p, **kwargs), None
             except Exception as e:
                 if self.errors == 'raise':
-                    raise e
-                elif self.errors == 'warn':
+                    # fail fast: the files that were not loaded yet are cancelled
+                    raise
+                return None, e
+
+        data = []
+        paths = sample.unique()
+        for p, (d, e) in zip(paths, get_io().map(load, paths, n_jobs=n_jobs)):
+            if e is not None:
+                if self.errors == 'warn':
                     warnings.warn(f'Error loading {p}: {e}')
+                continue
+            # sorting is costly even for sorted data, so check first
+            if isinstance(d, pd.DataFrame) and not d.index.is_monotonic_increasing:
+                d.sort_index(inplace=True)
+            data.append(d)
 
         # Format the final result
         if concat and isinstance(data[0], pd.DataFrame):
@@ -255,7 +271,7 @@ class DataLoader:
 
         if ('research_stage' in align_df.columns) or ('research_stage' in align_df.index.names):
             try:
-                age_df = pd.read_parquet(age_path)
+                age_df = get_io().read_parquet(age_path)
                 self.dfs['age_sex'] = align_df.join(
                     age_df[['age_at_research_stage', 'sex']].droplevel('array_index'))\
                     .rename(columns={'age_at_research_stage': 'age'})[['age', 'sex']]
@@ -298,7 +314,7 @@ class DataLoader:
         if not ind.any():
             return
 
-        age_df = pd.read_parquet(age_path.replace('events', 'population'))
+        age_df = get_io().read_parquet(age_path.replace('events', 'population'))
 
         # trying a workaround for a pandas deprecation warning
         age_sex = self.dfs['age_sex']
@@ -352,7 +368,7 @@ class DataLoader:
         """
         df_path = os.path.join(self.dataset_path, relative_location)
         try:
-            data =  pd.read_parquet(df_path)
+            data = get_io().read_parquet(df_path)
         except Exception as err:
             if self.errors == 'raise':
                 raise err
@@ -383,7 +399,7 @@ class DataLoader:
         """
         Load dataset dictionary.
         """
-        self.dict = pd.read_csv(self.__get_file_path__(self.dataset, 'csv'))\
+        self.dict = get_io().read_csv(self.__get_file_path__(self.dataset, 'csv'))\
             .set_index('tabular_field_name')
         self.fields = self.dict.index.tolist()
 
@@ -399,9 +415,7 @@ class DataLoader:
             str: the path to the file
         """
         path = os.path.join(self.dataset_path, '*.' + extension)
-        if path.startswith('s3://'):
-           return path
-        return glob(path)[0]
+        return get_io().glob(path)[0]
 
     def __get_dataset_path__(self, dataset):
         """
@@ -436,3 +450,133 @@ class DataLoader:
         display(summary_df)
         if return_summary:
             return summary_df
+
+
+def _sample_paths(
+    dl,
+    field_name: str,
+    participant_id: Union[None, int, List[int]],
+    research_stage: Union[None, str, List[str]],
+    array_index: Union[None, int, List[int]],
+) -> Tuple[pd.Index, List[str]]:
+    # the index and absolute paths of the samples of a bulk field
+    samples = dl[[field_name, 'participant_id']]
+    col = samples.columns[0]  # can be different from field_name if a parent_dataframe is implied
+    samples = samples.dropna(subset=[col])
+    for name, values in [('participant_id', participant_id), ('research_stage', research_stage),
+                         ('array_index', array_index)]:
+        if values is None:
+            continue
+        keys = samples[name] if name in samples.columns else samples.index.get_level_values(name)
+        samples = samples.loc[np.isin(np.asarray(keys), np.atleast_1d(values))]
+    return samples.index, (dl.dataset_path + '/' + samples[col].astype(str)).tolist()
+
+# %% ../nbs/05_data_loader.ipynb 27
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+    except ImportError:
+        raise ImportError("The 'pyarrow' library is not installed. Please install it using 'pip install pyarrow' to use BulkCache.")
+    return pyarrow
+
+
+def write_arrow_ipc(df: pd.DataFrame, path: str) -> None:
+    """
+    Write a DataFrame to an uncompressed Arrow IPC file, storing each index level as a dictionary of its codes.
+
+    Args:
+        df (pd.DataFrame): The data to write. Column names must be JSON-serializable.
+        path (str): The local path of the file. It is replaced atomically.
+    """
+    if is_remote(path):
+        raise ValueError(f'Arrow IPC files can only be written to local paths, got {path}')
+    pa = _import_pyarrow()
+    index = df.index if isinstance(df.index, pd.MultiIndex) else pd.MultiIndex.from_arrays([df.index])
+    arrays, names = [], []
+    for i, (level, codes) in enumerate(zip(index.levels, index.codes)):
+        codes = np.asarray(codes, dtype=np.int32)
+        arrays.append(pa.DictionaryArray.from_arrays(pa.array(codes, mask=codes < 0), pa.array(level)))
+        names.append(f'__index_level_{i}__')
+    for j in range(df.shape[1]):
+        arrays.append(pa.Array.from_pandas(df.iloc[:, j]))
+        names.append(f'__column_{j}__')
+    meta = {'index_names': list(df.index.names), 'columns': list(df.columns),
+            'multi_index': isinstance(df.index, pd.MultiIndex)}
+    table = pa.table(arrays, names=names).replace_schema_metadata({'pheno_utils': json.dumps(meta, default=str)})
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def read_arrow_ipc(path: str) -> pd.DataFrame:
+    """
+    Memory-map a file written by `write_arrow_ipc`. The columns are read-only views of the file.
+    """
+    pa = _import_pyarrow()
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    meta = json.loads(table.schema.metadata[b'pheno_utils'])
+    n_levels = len(meta['index_names'])
+
+    levels, codes = [], []
+    for i in range(n_levels):
+        col = table.column(i).combine_chunks()
+        levels.append(pd.Index(col.dictionary.to_pandas()))
+        codes.append(col.indices.fill_null(-1).to_numpy())
+    index = pd.MultiIndex(levels=levels, codes=codes, names=meta['index_names'], verify_integrity=False)
+    if not meta['multi_index']:
+        index = index.get_level_values(0)
+
+    data = table.select(list(range(n_levels, table.num_columns))).to_pandas(split_blocks=True)
+    data.columns = pd.Index(meta['columns'])
+    data.index = index
+    return data
+
+
+class BulkCache:
+    """
+    A `load_func` for `DataLoader.load_sample_data` that keeps a memory-mapped Arrow IPC copy of every bulk file it reads.
+
+    Args:
+        cache_dir (str, optional): The cache directory. Defaults to None, which uses the 'bulk' directory in CACHE_PATH.
+        read_func (callable, optional): The function that reads the original files. Defaults to read_parquet, which
+            reads remote files through the shared RemoteIO instance.
+
+    Local copies are refreshed when the original file is newer. Remote files are keyed by their version (ETag or
+    modification time), which is requested on every read.
+    """
+    def __init__(self, cache_dir: str = None, read_func: callable = read_parquet):
+        self.cache_dir = os.path.expanduser(cache_dir if cache_dir is not None else os.path.join(CACHE_PATH, 'bulk'))
+        self.read_func = read_func
+
+    def cache_path(self, path: str, **kwargs) -> str:
+        """
+        The path of the cached copy of a file, read with the given keyword arguments.
+        """
+        if is_remote(path):
+            remote_io = get_io()
+            remote_io.refresh(path)
+            info = remote_io.info(path)
+            key = json.dumps([path, info['version'], info['size'], sorted(kwargs.items())], default=str)
+        else:
+            key = json.dumps([os.path.abspath(path), sorted(kwargs.items())], default=str)
+        digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f'{os.path.splitext(os.path.basename(path))[0]}_{digest}.arrow')
+
+    def __call__(self, path: str, **kwargs) -> Any:
+        cached = self.cache_path(path, **kwargs)
+        if os.path.isfile(cached) and \
+                (is_remote(path) or not os.path.exists(path) or os.path.getmtime(path) <= os.path.getmtime(cached)):
+            return read_arrow_ipc(cached)
+
+        data = self.read_func(path, **kwargs)
+        if not isinstance(data, pd.DataFrame):
+            return data
+        if not data.index.is_monotonic_increasing:
+            data = data.sort_index()
+        write_arrow_ipc(data, cached)
+        return read_arrow_ipc(cached)
@@ -1,22 +1,65 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/04_date_plots.ipynb.
 
 # %% auto 0
-__all__ = ['dates_dist_plot']
+__all__ = ['dates_stats', 'dates_dist_plot']
 
 # %% ../nbs/04_date_plots.ipynb 3
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Union
 from pandas._typing import Axes
 
 # %% ../nbs/04_date_plots.ipynb 4
 from .config import *
+from .density_plots import scatter_density, DENSITY_THRESHOLD
 
 # %% ../nbs/04_date_plots.ipynb 5
+def dates_stats(df: pd.DataFrame, cols: Union[str, List[str]], sampling_period: str = "W-MON",
+                date_col: str = 'collection_date', quantiles: Optional[List[float]] = None) -> pd.DataFrame:
+    """
+    Computes quantiles of multiple columns per time bucket in a single grouped pass.
+
+    Args:
+        df (pd.DataFrame): The input DataFrame containing the data. The date column may be a column or an index level.
+        cols (Union[str, List[str]]): The column name(s) to aggregate.
+        sampling_period (str, optional): The frequency of the time buckets (as in `resample`). Defaults to 'W-MON'.
+        date_col (str, optional): The name of the date column in the DataFrame. Defaults to 'collection_date'.
+        quantiles (Optional[List[float]], optional): The quantiles to compute. The median (0.5) is always included.
+            Defaults to [0.1, 0.9].
+
+    Returns:
+        pd.DataFrame: A tidy DataFrame with columns [date_col, 'field', 'quantile', 'value', 'count'], where count is the
+            number of non-missing values of the field in the bucket.
+    """
+    if isinstance(cols, str):
+        cols = [cols]
+    if quantiles is None:
+        quantiles = [0.1, 0.9]
+    quantiles = sorted(set(quantiles) | {0.5})
+
+    if date_col in df.index.names:
+        df = df.reset_index(date_col)
+    df = df[[date_col] + cols]
+    if not pd.api.types.is_datetime64_any_dtype(df[date_col]):
+        df = df.assign(**{date_col: pd.to_datetime(df[date_col])})
+
+    grouped = df.groupby(pd.Grouper(key=date_col, freq=sampling_period))[cols]
+    values = grouped.quantile(quantiles)
+    values.index.names = [date_col, 'quantile']
+    counts = grouped.count()
+
+    values = values.rename_axis(columns='field').stack(dropna=False).rename('value').reset_index()
+    counts = counts.rename_axis(columns='field').stack(dropna=False).rename('count').reset_index()
+
+    return values.merge(counts, on=[date_col, 'field'], how='left')
+
+# %% ../nbs/04_date_plots.ipynb 6
 def dates_dist_plot(df: pd.DataFrame, col: str, sampling_period: str = "W-MON", ax: Optional[Axes] = None,
                     date_col: str = 'collection_date', ylim: Optional[Tuple[float, float]] = None,
-                    quantiles: Optional[List[Tuple[float, str]]] = None) -> None:
+                    quantiles: Optional[List[Tuple[float, str]]] = None,
+                    density: str = 'auto', density_threshold: int = DENSITY_THRESHOLD,
+                    stats: Optional[pd.DataFrame] = None) -> None:
     """
     Creates a scatter plot of data points and their statistics based on a specified sampling period.
 
@@ -29,28 +72,37 @@ def dates_dist_plot(df: pd.DataFrame, col: str, sampling_period: str = "W-MON",
         ylim (Optional[Tuple[float, float]], optional): A tuple defining the y-axis limits. Defaults to None.
         quantiles (Optional[List[Tuple[float, str]]], optional): A list of tuples containing quantiles and their
             labels. Defaults to [(0.1, "10%"), (0.9, "90%")].
+        density (str, optional): The rendering mode of the data points, one of 'auto', 'scatter', 'hexbin', 'hist2d',
+            'downsample'. 'auto' switches to hexbin shading above density_threshold points. Defaults to 'auto'.
+        density_threshold (int, optional): The number of points above which 'auto' uses density shading. Defaults to DENSITY_THRESHOLD.
+        stats (Optional[pd.DataFrame], optional): Precomputed statistics from dates_stats that include col and the
+            requested quantiles. Defaults to None, which computes them.
     """
     if quantiles is None:
         quantiles = [(0.1, "10%"), (0.9, "90%")]
 
     df = df.reset_index().set_index(date_col)
+    if stats is None:
+        stats = dates_stats(df, col, sampling_period=sampling_period, date_col=date_col,
+                            quantiles=[q for q, _ in quantiles])
+    stat_lines = stats.loc[stats['field'] == col].pivot(index=date_col, columns='quantile', values='value')
 
     if ax is None:
         fig, ax = plt.subplots(1, 1, figsize=(14, 8))
 
     # All data scatterplot
-    ax.scatter(df.index.get_level_values(date_col), df[col].values, s=40, alpha=0.2,
-               marker="o", facecolors="none", linewidths=1, color="k")
+    scatter_density(df.index.get_level_values(date_col), df[col].values, ax=ax,
+                    mode=density, threshold=density_threshold, s=40, alpha=0.2,
+                    marker="o", facecolors="none", linewidths=1, color="k")
 
     # Define statistics and their styles
-    stats = [
-        ('quantile', q, f"{label} quantile", "-", 3, 0.4) for q, label in quantiles
-    ] + [('median', None, f"Median", "-", 5, 0.5)]
+    line_styles = [
+        (q, f"{label} quantile", "-", 3, 0.4) for q, label in quantiles
+    ] + [(0.5, f"Median", "-", 5, 0.5)]
 
     # Plot sampling period statistics
-    for stat, param, label, ls, lw, alpha in stats:
-        stat_line = df[col].resample(sampling_period)
-        stat_line = stat_line.quantile(param) if stat == 'quantile' else stat_line.median()
+    for q, label, ls, lw, alpha in line_styles:
+        stat_line = stat_lines[q]
         ax.plot(stat_line.index, stat_line.values, label=label, ls=ls, lw=lw, alpha=alpha, color="b")
 
     # Plot all sample stats
@@ -0,0 +1,193 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/16_decimation.ipynb.
+
+# %% auto 0
+__all__ = ['DECIMATE_METHODS', 'DECIMATE_POINTS', 'as_numeric', 'minmax_indices', 'distinct_indices', 'lttb_indices',
+           'axes_width_px', 'decimate_trace', 'decimate_envelope']
+
+# %% ../nbs/16_decimation.ipynb 3
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+# %% ../nbs/16_decimation.ipynb 4
+from .config import *
+
+# %% ../nbs/16_decimation.ipynb 6
+DECIMATE_METHODS = ['minmax', 'lttb', 'distinct']
+DECIMATE_POINTS = 2000
+
+
+def as_numeric(x) -> np.ndarray:
+    """
+    Convert x values (numbers or dates, possibly timezone-aware) to a float array.
+    """
+    if pd.api.types.is_datetime64_any_dtype(x):
+        return pd.DatetimeIndex(x).asi8.astype(float)
+    return np.asarray(x, dtype=float)
+
+
+def _bin_codes(x: np.ndarray, n_bins: int) -> np.ndarray:
+    # equal-width bins over the range of x
+    lo, hi = x.min(), x.max()
+    if hi == lo:
+        return np.zeros(len(x), dtype=int)
+    return np.clip(((x - lo) / (hi - lo) * n_bins).astype(int), 0, n_bins - 1)
+
+
+def minmax_indices(x: np.ndarray, y: np.ndarray, n_bins: int) -> np.ndarray:
+    """
+    Indices of the minimum and maximum of y in each of n_bins equal-width bins of x, plus the first and last point.
+
+    Args:
+        x (np.ndarray): The x values (numeric).
+        y (np.ndarray): The y values. Missing values are ignored.
+        n_bins (int): The number of bins.
+
+    Returns:
+        np.ndarray: The sorted indices of the selected points.
+    """
+    pos = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    if len(pos) <= 2 * n_bins + 2:
+        return pos
+    yv = y[pos]
+    b = _bin_codes(x[pos], n_bins)
+
+    order = np.lexsort((yv, b))
+    sb = b[order]
+    starts = np.flatnonzero(np.r_[True, sb[1:] != sb[:-1]])
+    ends = np.r_[starts[1:] - 1, len(sb) - 1]
+    keep = np.r_[order[starts], order[ends], 0, len(pos) - 1]
+
+    return pos[np.unique(keep)]
+
+
+def distinct_indices(x: np.ndarray, y: np.ndarray, n_bins: int) -> np.ndarray:
+    """
+    Indices of the first occurrence of every distinct y value in each of n_bins equal-width bins of x.
+    Suited for discrete traces (e.g., sleep stages), where the levels between the min and max matter.
+    """
+    pos = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    if len(pos) <= n_bins:
+        return pos
+    yv = y[pos]
+    b = _bin_codes(x[pos], n_bins)
+    order = np.lexsort((yv, b))
+    new = np.r_[True, (b[order][1:] != b[order][:-1]) | (yv[order][1:] != yv[order][:-1])]
+    return np.sort(pos[order[new]])
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Indices of the points selected by the Largest-Triangle-Three-Buckets algorithm.
+
+    Args:
+        x (np.ndarray): The x values (numeric, sorted).
+        y (np.ndarray): The y values. Missing values are ignored.
+        n_out (int): The number of points to select.
+
+    Returns:
+        np.ndarray: The sorted indices of the selected points.
+    """
+    pos = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    n = len(pos)
+    if n_out >= n or n_out < 3:
+        return pos
+    xv, yv = x[pos] - x[pos[0]], y[pos]
+
+    # buckets of the points between the first and the last
+    edges = (np.floor(np.arange(n_out - 1) * (n - 2) / (n_out - 2)) + 1).astype(int)
+    edges[-1] = n - 1
+    # the average of the next bucket (the last point for the last bucket), from prefix sums
+    cx, cy = np.r_[0, np.cumsum(xv)], np.r_[0, np.cumsum(yv)]
+    nxt_start = np.r_[edges[1:-1], n - 1]
+    nxt_end = np.r_[edges[2:], n, n][:len(nxt_start)]
+    avg_x = (cx[nxt_end] - cx[nxt_start]) / (nxt_end - nxt_start)
+    avg_y = (cy[nxt_end] - cy[nxt_start]) / (nxt_end - nxt_start)
+
+    selected = np.zeros(n_out, dtype=int)
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        s, e = edges[i], edges[i + 1]
+        area = np.abs((xv[a] - avg_x[i]) * (yv[s:e] - yv[a]) - (xv[a] - xv[s:e]) * (avg_y[i] - yv[a]))
+        a = s + np.argmax(area)
+        selected[i + 1] = a
+
+    return pos[selected]
+
+
+def _take(a, idx: np.ndarray):
+    if isinstance(a, pd.Series):
+        return a.iloc[idx]
+    if isinstance(a, pd.Index):
+        return a[idx]
+    return np.asarray(a)[idx]
+
+
+def axes_width_px(ax: plt.Axes) -> int:
+    """
+    The width of the axes in display pixels.
+    """
+    return max(int(ax.get_window_extent().width), 1)
+
+
+def decimate_trace(x, y, n_points: Optional[int] = None, ax: Optional[plt.Axes] = None,
+                   method: str = 'minmax') -> Tuple:
+    """
+    Reduce a trace to about the pixel width of the axes, keeping its peaks.
+
+    Args:
+        x (array-like): The x values (numbers or dates), sorted.
+        y (array-like): The y values.
+        n_points (int, optional): The number of bins ('minmax', which keeps up to 2 points per bin) or points ('lttb').
+            Defaults to None, which uses the pixel width of ax, or DECIMATE_POINTS if ax is None.
+        ax (plt.Axes, optional): The axes the trace will be drawn on. Defaults to None.
+        method (str, optional): The decimation method, one of DECIMATE_METHODS ('distinct' keeps every distinct
+            value per bin, for discrete traces). Defaults to 'minmax'.
+
+    Returns:
+        Tuple: The selected x and y values, of the same types as the inputs. Missing values are dropped.
+    """
+    if method not in DECIMATE_METHODS:
+        raise ValueError(f'method must be one of {DECIMATE_METHODS}, got {method}')
+    if n_points is None:
+        n_points = DECIMATE_POINTS if ax is None else axes_width_px(ax)
+
+    xn, yn = as_numeric(x), np.asarray(y, dtype=float)
+    if method == 'minmax':
+        idx = minmax_indices(xn, yn, n_points)
+    elif method == 'distinct':
+        idx = distinct_indices(xn, yn, n_points)
+    else:
+        idx = lttb_indices(xn, yn, n_points)
+
+    return _take(x, idx), _take(y, idx)
+
+
+def decimate_envelope(x, y, n_points: Optional[int] = None, ax: Optional[plt.Axes] = None) -> Tuple:
+    """
+    The minimum and maximum of a trace in each pixel-wide bin, e.g., to draw a dense scatter as vertical bars.
+
+    Args:
+        x (array-like): The x values (numbers or dates), sorted.
+        y (array-like): The y values.
+        n_points (int, optional): The number of bins. Defaults to None, which uses the pixel width of ax, or
+            DECIMATE_POINTS if ax is None.
+        ax (plt.Axes, optional): The axes the trace will be drawn on. Defaults to None.
+
+    Returns:
+        Tuple: The x value of the first point of each bin (of the same type as x), and arrays of the minimum and
+            maximum y of each bin.
+    """
+    if n_points is None:
+        n_points = DECIMATE_POINTS if ax is None else axes_width_px(ax)
+    xn, yn = as_numeric(x), np.asarray(y, dtype=float)
+    pos = np.flatnonzero(np.isfinite(xn) & np.isfinite(yn))
+    if not len(pos):
+        return _take(x, pos), np.zeros(0), np.zeros(0)
+    b = _bin_codes(xn[pos], n_points)
+    starts = np.flatnonzero(np.r_[True, b[1:] != b[:-1]])
+
+    return _take(x, pos[starts]), np.minimum.reduceat(yn[pos], starts), np.maximum.reduceat(yn[pos], starts)
@@ -0,0 +1,171 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/12_density_plots.ipynb.
+
+# %% auto 0
+__all__ = ['DENSITY_THRESHOLD', 'DENSITY_MODES', 'downsample_points', 'get_density_mode', 'scatter_density']
+
+# %% ../nbs/12_density_plots.ipynb 3
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+from matplotlib.colors import LinearSegmentedColormap, to_rgba
+
+# %% ../nbs/12_density_plots.ipynb 4
+from .config import *
+
+# %% ../nbs/12_density_plots.ipynb 6
+DENSITY_THRESHOLD = 5000
+DENSITY_MODES = ['auto', 'scatter', 'hexbin', 'hist2d', 'downsample']
+
+
+def downsample_points(
+    x: np.ndarray,
+    y: np.ndarray,
+    max_points: int = DENSITY_THRESHOLD,
+    tail_perc: float = 1,
+    bins: int = 30,
+    random_state: Optional[int] = 0,
+) -> np.ndarray:
+    """
+    Select a stratified subsample of 2D points that keeps the outliers.
+
+    Points outside the [tail_perc, 100-tail_perc] percentiles of either axis are always kept.
+    The remaining points are binned on a bins x bins grid, and each cell keeps the same fraction
+    of its points (at least one), so sparse regions are preserved while dense regions are thinned.
+
+    Args:
+        x (np.ndarray): The x coordinates (numeric).
+        y (np.ndarray): The y coordinates (numeric).
+        max_points (int, optional): The approximate number of points to keep. Defaults to DENSITY_THRESHOLD.
+        tail_perc (float, optional): The percentile of each tail (per axis) that is always kept. Defaults to 1.
+        bins (int, optional): The number of bins per axis used for stratification. Defaults to 30.
+        random_state (Optional[int], optional): Seed for the random selection. Defaults to 0.
+
+    Returns:
+        np.ndarray: The sorted indices of the selected points.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n <= max_points:
+        return np.arange(n)
+
+    valid = np.isfinite(x) & np.isfinite(y)
+    x_lims = np.nanpercentile(x[valid], [tail_perc, 100 - tail_perc])
+    y_lims = np.nanpercentile(y[valid], [tail_perc, 100 - tail_perc])
+    tails = valid & ((x < x_lims[0]) | (x > x_lims[1]) | (y < y_lims[0]) | (y > y_lims[1]))
+    core = np.flatnonzero(valid & ~tails)
+    n_core = max(max_points - tails.sum(), 0)
+    if n_core >= len(core):
+        return np.sort(np.concatenate([np.flatnonzero(tails), core]))
+
+    # assign each core point to a grid cell
+    x_edges = np.linspace(x_lims[0], x_lims[1], bins + 1)[1:-1]
+    y_edges = np.linspace(y_lims[0], y_lims[1], bins + 1)[1:-1]
+    cell = np.searchsorted(x_edges, x[core]) * bins + np.searchsorted(y_edges, y[core])
+
+    # rank the points randomly within each cell and keep the top quota of every cell
+    rng = np.random.default_rng(random_state)
+    order = np.lexsort((rng.random(len(core)), cell))
+    cell = cell[order]
+    counts = np.bincount(cell, minlength=bins * bins)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.arange(len(core)) - starts[cell]
+    quota = np.ceil(counts * (n_core / len(core))).astype(int)
+    keep = core[order[rank < quota[cell]]]
+
+    return np.sort(np.concatenate([np.flatnonzero(tails), keep]))
+
+
+def get_density_mode(n_points: int, mode: str = 'auto', threshold: int = DENSITY_THRESHOLD,
+                     dense_mode: str = 'hexbin') -> str:
+    """
+    Resolve the rendering mode for a given number of points.
+
+    Args:
+        n_points (int): The number of points to plot.
+        mode (str, optional): One of DENSITY_MODES. 'auto' selects `dense_mode` above the threshold
+            and 'scatter' otherwise. Defaults to 'auto'.
+        threshold (int, optional): The point count above which 'auto' switches to `dense_mode`. Defaults to DENSITY_THRESHOLD.
+        dense_mode (str, optional): The mode to use above the threshold. Defaults to 'hexbin'.
+
+    Returns:
+        str: The resolved mode.
+    """
+    assert mode in DENSITY_MODES, f"mode must be one of {DENSITY_MODES}"
+    assert dense_mode in DENSITY_MODES[2:], f"dense_mode must be one of {DENSITY_MODES[2:]}"
+    if mode != 'auto':
+        return mode
+    if n_points > threshold:
+        return dense_mode
+    return 'scatter'
+
+
+def scatter_density(
+    x: Union[np.ndarray, pd.Series],
+    y: Union[np.ndarray, pd.Series],
+    ax: Optional[plt.Axes] = None,
+    mode: str = 'auto',
+    threshold: int = DENSITY_THRESHOLD,
+    dense_mode: str = 'hexbin',
+    color: str = 'k',
+    gridsize: int = 60,
+    max_points: int = DENSITY_THRESHOLD,
+    random_state: Optional[int] = 0,
+    **scatter_kws,
+):
+    """
+    Scatter plot that switches to density shading or downsampling for large numbers of points.
+
+    Args:
+        x (Union[np.ndarray, pd.Series]): The x values (numeric or datetime).
+        y (Union[np.ndarray, pd.Series]): The y values.
+        ax (Optional[plt.Axes], optional): The axes to plot on. Defaults to None (current axes).
+        mode (str, optional): One of DENSITY_MODES. Defaults to 'auto'.
+        threshold (int, optional): The point count above which 'auto' switches to `dense_mode`. Defaults to DENSITY_THRESHOLD.
+        dense_mode (str, optional): The mode used by 'auto' above the threshold. Defaults to 'hexbin'.
+        color (str, optional): The color of the points, or the top color of the density colormap. Defaults to 'k'.
+        gridsize (int, optional): The number of hexagons / bins along the x axis in density modes. Defaults to 60.
+        max_points (int, optional): The approximate number of points drawn in 'downsample' mode. Defaults to DENSITY_THRESHOLD.
+        random_state (Optional[int], optional): Seed for 'downsample' mode. Defaults to 0.
+        **scatter_kws: Additional keyword arguments passed to `ax.scatter` in 'scatter' and 'downsample' modes.
+
+    Returns:
+        The matplotlib artist that was added to the axes.
+    """
+    if ax is None:
+        ax = plt.gca()
+    x = pd.Series(x).reset_index(drop=True)
+    y = pd.Series(y).reset_index(drop=True)
+    mode = get_density_mode(len(x), mode, threshold, dense_mode)
+
+    is_date = pd.api.types.is_datetime64_any_dtype(x)
+    if is_date:
+        # matplotlib places tz-aware dates in UTC
+        x_utc = x.dt.tz_convert('UTC').dt.tz_localize(None) if x.dt.tz is not None else x
+        x_num = pd.Series(mdates.date2num(x_utc), index=x.index)
+    else:
+        x_num = x.astype(float)
+
+    if mode == 'downsample':
+        ind = downsample_points(x_num.values, y.values.astype(float), max_points=max_points,
+                                random_state=random_state)
+        x, y = x.iloc[ind], y.iloc[ind]
+        mode = 'scatter'
+
+    if mode == 'scatter':
+        return ax.scatter(x.values, y.values, color=color, **scatter_kws)
+
+    cmap = LinearSegmentedColormap.from_list('density', [to_rgba(color, 0.05), to_rgba(color, 1)])
+    valid = np.isfinite(x_num.values) & np.isfinite(y.values.astype(float))
+    if mode == 'hexbin':
+        artist = ax.hexbin(x_num.values[valid], y.values[valid], gridsize=gridsize, mincnt=1,
+                           cmap=cmap, linewidths=0)
+    else:
+        artist = ax.hist2d(x_num.values[valid], y.values[valid], bins=gridsize, cmin=1, cmap=cmap)[-1]
+    if is_date:
+        ax.xaxis_date()
+
+    return artist
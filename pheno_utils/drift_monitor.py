@@ -0,0 +1,278 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/14_drift_monitor.ipynb.
+
+# %% auto 0
+__all__ = ['DriftMonitor']
+
+# %% ../nbs/14_drift_monitor.ipynb 3
+import json
+import os
+from typing import List, Optional, Tuple, Union
+import warnings
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+# %% ../nbs/14_drift_monitor.ipynb 4
+from .config import *
+
+# %% ../nbs/14_drift_monitor.ipynb 6
+class DriftMonitor:
+    """
+    Class to incrementally monitor distribution drift of numeric fields over collection dates.
+
+    Args:
+
+        state_dir (str, optional): A directory where the state (bins and histograms) is persisted between runs.
+            Defaults to None (state is kept in memory only).
+        date_col (str, optional): The name of the date column. Defaults to 'collection_date'.
+        sampling_period (str, optional): The period of the histograms (a pandas period frequency). Defaults to 'W-MON'.
+        baseline_periods (int, optional): The number of first periods that make up the baseline. Defaults to 12.
+        window (int, optional): The number of periods in each rolling window compared to the baseline. Defaults to 4.
+        n_bins (int, optional): The number of quantile bins derived from the baseline. Defaults to 10.
+        psi_threshold (float, optional): The PSI above which a window is flagged. Defaults to 0.2.
+        ks_threshold (float, optional): The KS distance above which a window is flagged. Defaults to 0.1.
+        min_count (int, optional): The minimal number of values in a window (or baseline) to compute statistics. Defaults to 30.
+        fields (list, optional): The fields to monitor. Defaults to None (all numeric fields).
+        exclude_fields (tuple, optional): Numeric fields to skip. Defaults to ('age', 'sex').
+
+    Attributes:
+
+        edges (dict): The bin edges of each field. They are provisional until the baseline of the field is complete.
+        counts (pd.DataFrame): The histograms, with columns ['field', 'period', 'bin', 'count'].
+        last_period (pd.Timestamp): The start of the last period processed.
+        pending (pd.DataFrame): The values of the fields whose baseline is not complete yet, with columns
+            ['field', 'period', 'value']. Their histograms are recomputed from these values on every update.
+    """
+
+    def __init__(
+        self,
+        state_dir: Optional[str] = None,
+        date_col: str = 'collection_date',
+        sampling_period: str = 'W-MON',
+        baseline_periods: int = 12,
+        window: int = 4,
+        n_bins: int = 10,
+        psi_threshold: float = 0.2,
+        ks_threshold: float = 0.1,
+        min_count: int = 30,
+        fields: Optional[List[str]] = None,
+        exclude_fields: Tuple[str, ...] = ('age', 'sex'),
+    ) -> None:
+        self.state_dir = state_dir
+        self.date_col = date_col
+        self.sampling_period = sampling_period
+        self.baseline_periods = baseline_periods
+        self.window = window
+        self.n_bins = n_bins
+        self.psi_threshold = psi_threshold
+        self.ks_threshold = ks_threshold
+        self.min_count = min_count
+        self.fields = fields
+        self.exclude_fields = exclude_fields
+
+        self.edges = {}
+        self.counts = pd.DataFrame({'field': pd.Series(dtype=str), 'period': pd.Series(dtype='datetime64[ns]'),
+                                    'bin': pd.Series(dtype=int), 'count': pd.Series(dtype=int)})
+        self.last_period = None
+        self.pending = pd.DataFrame({'field': pd.Series(dtype=str), 'period': pd.Series(dtype='datetime64[ns]'),
+                                     'value': pd.Series(dtype=float)})
+        self.__load_state__()
+
+    def update(self, data) -> pd.DataFrame:
+        """
+        Aggregate new data into the histograms and compute drift statistics.
+
+        Only rows from the last processed period onwards are aggregated, and the histograms of these periods are
+        replaced, so the data passed on reruns may (and usually does) include previously seen rows.
+
+        Args:
+            data (DataLoader or pd.DataFrame): A DataLoader (all its tables with a date column are used) or a DataFrame.
+
+        Returns:
+            pd.DataFrame: Drift statistics per field and period, see `drift()`.
+        """
+        tables = data.dfs.values() if hasattr(data, 'dfs') else [data]
+        new_counts, new_pending = [], []
+        max_period = self.last_period
+        for df in tables:
+            if self.date_col in df.index.names:
+                df = df.reset_index(self.date_col)
+            if self.date_col not in df.columns:
+                continue
+            periods = self.__get_periods__(df[self.date_col])
+            new = periods.notnull()
+            if self.last_period is not None:
+                new &= periods >= self.last_period
+            if not new.any():
+                continue
+            periods = periods[new]
+            max_period = periods.max() if max_period is None else max(max_period, periods.max())
+
+            cols = df.select_dtypes(include='number').columns.difference(list(self.exclude_fields) + [self.date_col])
+            if self.fields is not None:
+                cols = cols.intersection(self.fields)
+            for col in cols:
+                values = df.loc[new, col].to_numpy(dtype=float)
+                if col in self.edges and not (self.pending['field'] == col).any():
+                    new_counts.append(self.__histogram__(values, periods, self.edges[col]).assign(field=col))
+                else:
+                    valid = np.isfinite(values)
+                    new_pending.append(pd.DataFrame({'field': col, 'period': periods.to_numpy()[valid],
+                                                     'value': values[valid]}))
+
+        old_counts, old_pending = self.counts, self.pending
+        if self.last_period is not None:
+            old_counts = old_counts.loc[old_counts['period'] < self.last_period]
+            old_pending = old_pending.loc[old_pending['period'] < self.last_period]
+        pending = pd.concat([old_pending] + new_pending, ignore_index=True)
+
+        # edges are frozen only once the baseline periods are complete, i.e., a later period has values, so that
+        # incremental updates bin the data like a single pass over all of it
+        complete = []
+        for field, p in pending.groupby('field'):
+            self.edges[field] = self.__baseline_edges__(p['value'].to_numpy(), p['period'])
+            new_counts.append(self.__histogram__(p['value'].to_numpy(), p['period'], self.edges[field]).assign(field=field))
+            if p['period'].nunique() > self.baseline_periods:
+                complete.append(field)
+        old_counts = old_counts.loc[~old_counts['field'].isin(pending['field'])]
+        self.pending = pending.loc[~pending['field'].isin(complete)].reset_index(drop=True)
+
+        if len(new_counts):
+            self.counts = pd.concat([old_counts] + new_counts, ignore_index=True)[['field', 'period', 'bin', 'count']]
+        self.last_period = max_period
+        self.__save_state__()
+
+        return self.drift()
+
+    def drift(self) -> pd.DataFrame:
+        """
+        Compute rolling-window drift statistics against the baseline from the stored histograms.
+
+        Returns:
+            pd.DataFrame: A DataFrame with columns ['field', 'period', 'n', 'psi', 'ks', 'ks_pvalue', 'baseline', 'drift'],
+                where n is the number of values in the window ending at the period, baseline marks baseline periods
+                and drift marks windows that exceed psi_threshold or ks_threshold.
+        """
+        res = []
+        for field, c in self.counts.groupby('field'):
+            n_bins = len(self.edges[field]) + 1
+            hist = c.pivot_table(index='period', columns='bin', values='count', aggfunc='sum', fill_value=0)\
+                .reindex(columns=range(n_bins), fill_value=0)
+            all_periods = pd.period_range(hist.index.min(), hist.index.max(), freq=self.sampling_period).start_time
+            hist = hist.reindex(all_periods, fill_value=0)
+
+            baseline = hist.iloc[:self.baseline_periods].to_numpy().sum(axis=0)
+            window = hist.rolling(self.window, min_periods=1).sum().to_numpy()
+            n_base = baseline.sum()
+            n = window.sum(axis=1)
+
+            # smoothed proportions for PSI, raw proportions for KS
+            eps = 0.5
+            p_base = (baseline + eps) / (n_base + eps * n_bins)
+            p_win = (window + eps) / (n[:, None] + eps * n_bins)
+            psi = ((p_win - p_base) * np.log(p_win / p_base)).sum(axis=1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                cdf_win = np.cumsum(window, axis=1) / n[:, None]
+                ks = np.abs(cdf_win - np.cumsum(baseline) / n_base).max(axis=1)
+                n_eff = n * n_base / (n + n_base)
+                ks_pvalue = stats.kstwobign.sf(ks * np.sqrt(n_eff))
+
+            too_few = (n < self.min_count) | (n_base < self.min_count)
+            psi[too_few] = np.nan
+            ks[too_few] = np.nan
+            ks_pvalue[too_few] = np.nan
+
+            res.append(pd.DataFrame({
+                'field': field, 'period': hist.index, 'n': n, 'psi': psi, 'ks': ks, 'ks_pvalue': ks_pvalue,
+                'baseline': np.arange(len(hist)) < self.baseline_periods}))
+
+        if not len(res):
+            return pd.DataFrame(columns=['field', 'period', 'n', 'psi', 'ks', 'ks_pvalue', 'baseline', 'drift'])
+        res = pd.concat(res, ignore_index=True)
+        res['drift'] = ~res['baseline'] & ((res['psi'] > self.psi_threshold) | (res['ks'] > self.ks_threshold))
+
+        return res
+
+    def flagged(self) -> pd.DataFrame:
+        """
+        Return the fields whose latest window is drifting.
+
+        Returns:
+            pd.DataFrame: The drift statistics of the last period of each drifting field, indexed by field.
+        """
+        res = self.drift()
+        latest = res.loc[res.groupby('field')['period'].idxmax()]
+        return latest.loc[latest['drift']].set_index('field')
+
+    def __get_periods__(self, dates: pd.Series) -> pd.Series:
+        """
+        Map dates to the start of their sampling period.
+        """
+        dates = pd.to_datetime(dates)
+        if dates.dt.tz is not None:
+            dates = dates.dt.tz_localize(None)
+        return dates.dt.to_period(self.sampling_period).dt.start_time
+
+    def __baseline_edges__(self, values: np.ndarray, periods: pd.Series) -> Union[np.ndarray, None]:
+        """
+        Compute quantile bin edges from the baseline periods.
+        """
+        valid = np.isfinite(values)
+        if not valid.any():
+            return None
+        baseline = np.sort(periods[valid].unique())[:self.baseline_periods]
+        baseline_values = values[valid & periods.isin(baseline).to_numpy()]
+        edges = np.unique(np.quantile(baseline_values, np.linspace(0, 1, self.n_bins + 1)[1:-1]))
+        return edges
+
+    def __histogram__(self, values: np.ndarray, periods: pd.Series, edges: np.ndarray) -> pd.DataFrame:
+        """
+        Count values per period and bin in one pass. Bin 0 and bin len(edges) are open-ended.
+        """
+        valid = np.isfinite(values)
+        codes, uniques = pd.factorize(periods[valid], sort=True)
+        n_bins = len(edges) + 1
+        bins = np.searchsorted(edges, values[valid], side='right')
+        counts = np.bincount(codes * n_bins + bins, minlength=len(uniques) * n_bins)
+        nz = np.flatnonzero(counts)
+        return pd.DataFrame({'period': uniques[nz // n_bins], 'bin': nz % n_bins, 'count': counts[nz]})
+
+    def __config__(self) -> dict:
+        return {'date_col': self.date_col, 'sampling_period': self.sampling_period,
+                'baseline_periods': self.baseline_periods, 'n_bins': self.n_bins}
+
+    def __load_state__(self) -> None:
+        """
+        Load the state from state_dir, if it exists and matches the current configuration.
+        """
+        if self.state_dir is None:
+            return
+        state_path = os.path.join(self.state_dir, 'state.json')
+        if not os.path.isfile(state_path):
+            return
+        with open(state_path, 'r') as f:
+            state = json.load(f)
+        if state['config'] != self.__config__():
+            warnings.warn(f'Drift state in {self.state_dir} was created with a different configuration, ignoring it')
+            return
+        self.edges = {k: np.array(v) for k, v in state['edges'].items()}
+        self.last_period = pd.Timestamp(state['last_period']) if state['last_period'] is not None else None
+        self.counts = pd.read_parquet(os.path.join(self.state_dir, 'counts.parquet'))
+        if os.path.isfile(os.path.join(self.state_dir, 'pending.parquet')):
+            self.pending = pd.read_parquet(os.path.join(self.state_dir, 'pending.parquet'))
+
+    def __save_state__(self) -> None:
+        """
+        Persist the state to state_dir.
+        """
+        if self.state_dir is None:
+            return
+        os.makedirs(self.state_dir, exist_ok=True)
+        self.counts.to_parquet(os.path.join(self.state_dir, 'counts.parquet'), index=False)
+        self.pending.to_parquet(os.path.join(self.state_dir, 'pending.parquet'), index=False)
+        state = {'config': self.__config__(),
+                 'last_period': None if self.last_period is None else str(self.last_period),
+                 'edges': {k: v.tolist() for k, v in self.edges.items()}}
+        with open(os.path.join(self.state_dir, 'state.json'), 'w') as f:
+            json.dump(state, f)
@@ -1,10 +1,16 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/09_ecg_analysis.ipynb.
 
 # %% auto 0
-__all__ = ['vis_ecg', 'get_hrv_df']
+__all__ = ['HRV_GROUPS', 'RPEAK_DETECTORS', 'ECG_CHECKPOINT_PREFIX', 'BEAT_QUALITY_WINDOW', 'vis_ecg', 'get_hrv_df', 'hrv_table',
+           'ecg_checkpoint_path', 'read_ecg_features', 'ecg_features_pipeline', 'detect_rpeaks', 'consensus_beats',
+           'beat_templates', 'save_ecg_plots']
 
 # %% ../nbs/09_ecg_analysis.ipynb 3
-from typing import Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import os
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+import warnings
 
 import numpy as np
 import pandas as pd
@@ -12,61 +18,649 @@ import seaborn as sns
 import matplotlib.pyplot as plt
 
 import neurokit2 as nk
+from scipy import signal as sps
+from scipy.ndimage import maximum_filter1d, uniform_filter1d
+
+from .config import *
+from .decimation import decimate_trace
+from .data_loader import _sample_paths
+from .remote_io import read_parquet
 
 # %% ../nbs/09_ecg_analysis.ipynb 4
-def vis_ecg(values_df: pd.DataFrame) -> None:
+def vis_ecg(
+    values_df: pd.DataFrame,
+    beats: Optional[pd.DataFrame] = None,
+    sr: int = 1000,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    time_data: Optional[np.ndarray] = None,
+    decimate: bool = True,
+    axs: Optional[np.ndarray] = None,
+    figsize: Tuple[float, float] = (40.7, 18.27),
+    save_path: Optional[str] = None,
+    dpi: Optional[int] = None,
+) -> None:
     """
     Visualize ECG data for 12 leads.
 
     Args:
         values_df (pd.DataFrame): A DataFrame containing ECG data with 12 columns, one for each lead.
+        beats (pd.DataFrame, optional): A beat table of the recording, from `consensus_beats`, whose beats are marked
+            on every lead. Defaults to None.
+        sr (int, optional): The sampling rate of the ECG data. Defaults to 1000.
+        start (float, optional): The start of the time window to plot, in seconds. Defaults to None, from the start.
+        end (float, optional): The end of the time window to plot, in seconds. Defaults to None, to the end.
+        time_data (np.ndarray, optional): The time of each sample in seconds, e.g., computed once for a batch of
+            recordings of the same length. Defaults to None, which computes it from sr.
+        decimate (bool, optional): Whether to reduce each lead to the minimum and maximum of each pixel column of its
+            axes. Defaults to True.
+        axs (np.ndarray, optional): A 3x4 array of axes to draw on, e.g., to create the figure of a batch of recordings
+            once. The traces of a previous call are replaced. Defaults to None, which creates a figure.
+        figsize (Tuple[float, float], optional): The size of a created figure. Defaults to (40.7, 18.27).
+        save_path (str, optional): A file to save the figure to. A created figure is closed after it is saved.
+            Defaults to None.
+        dpi (int, optional): The resolution of the saved figure. Defaults to None, matplotlib's default.
 
     Returns:
         None: Displays a 3x4 grid of ECG plots for the 12 leads.
     """
-    count = 0
-    frequency = 1000
-    time_data = np.arange(values_df.shape[0]) / frequency
-    sns.set(rc={'figure.figsize':(40.7,18.27)})
-    fig, axs = plt.subplots(3, 4)
-    
-    for y in range(0,4):    
-        for x in range(0,3):
-            col = values_df.columns[count]
-            axs[x, y].plot(time_data, values_df[col].values)
-            axs[x, y].set_title(col)
-            count += 1
-            plt.xlabel("time in seconds")
-            plt.ylabel("ECG in uV")
+    n = len(values_df)
+    if time_data is None:
+        time_data = np.arange(n) / sr
+    i0 = 0 if start is None else np.searchsorted(time_data, start)
+    i1 = n if end is None else np.searchsorted(time_data, end)
+    t = time_data[i0:i1]
+
+    created = axs is None
+    if created:
+        with sns.axes_style('darkgrid'):
+            fig, axs = plt.subplots(3, 4, figsize=figsize)
+    fig = axs.flat[0].figure
+    if beats is not None:
+        beat_idx = beats['sample'].to_numpy()
+        beat_idx = beat_idx[(i0 <= beat_idx) & (beat_idx < i1)]
+
+    for count, col in enumerate(values_df.columns[:12]):
+        ax = axs[count % 3, count // 3]
+        values = values_df[col].to_numpy()
+        x, y = decimate_trace(t, values[i0:i1], ax=ax) if decimate else (t, values[i0:i1])
+        if len(ax.lines):
+            # update the trace of a previous recording in place, which is much faster than drawing new axes
+            for line in ax.lines[1:]:
+                line.remove()
+            ax.lines[0].set_data(x, y)
+            ax.relim()
+            ax.autoscale_view()
+        else:
+            ax.plot(x, y)
+        if beats is not None:
+            ax.plot(time_data[beat_idx], values[beat_idx], 'rx')
+        ax.set_title(col)
+    for ax in axs[-1]:
+        ax.set_xlabel('time in seconds')
+    for ax in axs[:, 0]:
+        ax.set_ylabel('ECG in uV')
+
+    if save_path is not None:
+        fig.savefig(save_path, dpi=dpi)
+        if created:
+            plt.close(fig)
 
 
 # %% ../nbs/09_ecg_analysis.ipynb 5
-def get_hrv_df(ECG_df: pd.DataFrame, sr: int = 1000) -> pd.DataFrame:
+def get_hrv_df(ECG_df: pd.DataFrame, sr: int = 1000, n_jobs: int = 1, detector: str = 'neurokit') -> pd.DataFrame:
     """
     Compute the Heart Rate Variability (HRV) metrics for each ECG lead in the input DataFrame.
 
     Args:
         ECG_df (pd.DataFrame): A DataFrame containing ECG data with one column for each lead.
         sr (int, optional): The sampling rate of the ECG data. Defaults to 1000.
+        n_jobs (int, optional): The number of worker processes. Leads are split between workers. Defaults to 1.
+        detector (str, optional): The R-peak detector, one of RPEAK_DETECTORS. Defaults to 'neurokit'.
 
     Returns:
-        pd.DataFrame: A DataFrame containing HRV metrics for each ECG lead.
+        pd.DataFrame: A DataFrame containing HRV metrics for each ECG lead, or a single row 'consensus' with the
+            'consensus' detector.
     """
-    hrv_list = []
-    peaks_list = []
-    
-    for i in ECG_df.columns:
-        peaks, info = nk.ecg_peaks(ECG_df[i], sampling_rate=sr, correct_artifacts=True)
+    hrv_df = hrv_table(ECG_df, by=[], sr=sr, leads=list(ECG_df.columns), n_jobs=n_jobs, errors='raise',
+                       detector=detector)
+    hrv_df.index = ECG_df.columns if detector != 'consensus' else ['consensus']
+
+    return hrv_df
+
+
+# %% ../nbs/09_ecg_analysis.ipynb 7
+HRV_GROUPS = ['participant_id', 'research_stage']
+RPEAK_DETECTORS = ['neurokit', 'pantompkins', 'consensus']
+
+
+def _lead_hrv(signal: np.ndarray, sr: int, peak_features: bool = False,
+              peaks: Optional[np.ndarray] = None) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+    # the HRV of a single lead (and features of its R-peaks), or the error that prevented it
+    try:
+        if peaks is None:
+            _, info = nk.ecg_peaks(signal, sampling_rate=sr, correct_artifacts=True)
+            peaks = info['ECG_R_Peaks']
         hrv = nk.hrv_time(peaks, sampling_rate=sr, show=False)
-        hrv_list.append(hrv)
-        peaks_list.append(peaks)
+        if peak_features:
+            rate = 60 * sr / np.diff(peaks)
+            hrv.insert(0, 'ECG_Duration', len(signal) / sr)
+            hrv.insert(1, 'ECG_N_Peaks', len(peaks))
+            hrv.insert(2, 'ECG_Rate_Mean', rate.mean())
+            hrv.insert(3, 'ECG_Rate_SD', rate.std())
+        return hrv, None
+    except Exception as e:
+        return None, f'{type(e).__name__}: {e}'
+
 
-    hrv_df = pd.concat(hrv_list)
-    hrv_df.index = ECG_df.columns
-    hrv_df = hrv_df.dropna(axis=1, how='all')
-    
-    peaks_df = pd.concat(peaks_list, axis=1)
-    peaks_df.columns = ECG_df.columns
+def hrv_table(
+    ecg_df: pd.DataFrame,
+    by: Optional[List[str]] = None,
+    sr: int = 1000,
+    leads: Optional[List[str]] = None,
+    n_jobs: int = 1,
+    errors: str = ERROR_ACTION,
+    detector: str = 'neurokit',
+) -> pd.DataFrame:
+    """
+    Compute the HRV metrics of each lead of each recording in the input DataFrame.
+
+    Args:
+        ecg_df (pd.DataFrame): ECG data with one column for each lead, sorted by time within each recording.
+        by (List[str], optional): The columns (or index levels) that define a recording. Defaults to None, which uses
+            the columns of HRV_GROUPS available in ecg_df.
+        sr (int, optional): The sampling rate of the ECG data. Defaults to 1000.
+        leads (List[str], optional): The lead columns. Defaults to None, which uses all numeric columns.
+        n_jobs (int, optional): The number of worker processes. Defaults to 1.
+        errors (str, optional): Whether to raise an error, issue a warning or ignore leads whose HRV cannot be computed.
+            Possible values are 'raise', 'warn' and 'ignore'. Defaults to ERROR_ACTION.
+        detector (str, optional): The R-peak detector, one of RPEAK_DETECTORS. 'pantompkins' detects the peaks of all
+            the leads of a recording at once, before they are split between workers. 'consensus' detects the beats of
+            each recording once with `consensus_beats`, and computes a single HRV per recording, with lead 'consensus'.
+            Defaults to 'neurokit'.
+
+    Returns:
+        pd.DataFrame: The HRV metrics, indexed by the `by` columns and 'lead'. Failed leads have missing metrics.
+    """
+    if detector not in RPEAK_DETECTORS:
+        raise ValueError(f'detector must be one of {RPEAK_DETECTORS}, got {detector}')
+    names = [n for n in ecg_df.index.names if n is not None]
+    if by is None:
+        by = [c for c in HRV_GROUPS if c in ecg_df.columns or c in names]
+    if leads is None:
+        leads = [c for c in ecg_df.select_dtypes('number').columns if c not in by]
+
+    keys, signals, peaks = [], [], []
+    recordings = ecg_df.groupby(by, sort=True) if len(by) else [((), ecg_df)]
+    for key, rec in recordings:
+        key = key if isinstance(key, tuple) else (key,)
+        rec_signals = rec[leads].to_numpy(dtype=float)
+        if detector == 'consensus':
+            keys.append(key + ('consensus',))
+            signals.append(rec_signals[:, 0])
+            peaks.append(consensus_beats(rec, sr, leads)['sample'].to_numpy())
+            continue
+        rec_peaks = detect_rpeaks(rec_signals, sr) if detector == 'pantompkins' else [None] * len(leads)
+        for j, lead in enumerate(leads):
+            keys.append(key + (lead,))
+            signals.append(rec_signals[:, j])
+            peaks.append(rec_peaks[j])
+
+    if n_jobs == 1 or len(signals) < 2:
+        results = [_lead_hrv(s, sr, False, p) for s, p in zip(signals, peaks)]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            results = list(pool.map(_lead_hrv, signals, [sr] * len(signals), [False] * len(signals), peaks,
+                                    chunksize=max(1, len(signals) // (4 * n_jobs))))
+
+    for key, (_, err) in zip(keys, results):
+        if err is None:
+            continue
+        if errors == 'raise':
+            raise ValueError(f'HRV failed for {key}: {err}')
+        elif errors == 'warn':
+            warnings.warn(f'HRV failed for {key}: {err}')
+
+    index = pd.MultiIndex.from_tuples(keys, names=by + ['lead'])
+    hrv = [r for r, _ in results if r is not None]
+    hrv_df = pd.concat(hrv, ignore_index=True) if len(hrv) else pd.DataFrame(index=range(0))
+    hrv_df.index = index[[r is not None for r, _ in results]]
+    hrv_df = hrv_df.reindex(index).dropna(axis=1, how='all')
+    if not len(by):
+        hrv_df.index = hrv_df.index.get_level_values('lead')
 
     return hrv_df
 
+# %% ../nbs/09_ecg_analysis.ipynb 13
+ECG_CHECKPOINT_PREFIX = 'participant_'
+
+
+def _participant_ecg_features(
+    recordings: List[Tuple[tuple, str]],
+    names: List[str],
+    sr: int,
+    leads: Optional[List[str]],
+    load_func: Callable,
+    detector: str = 'neurokit',
+) -> Tuple[pd.DataFrame, List[str], List[str], float]:
+    # the features of the recordings of a participant, the errors of failed leads and recordings, and the time it took
+    start = time.time()
+    rows, keys, lead_errors, load_errors = [], [], [], []
+    for key, path in recordings:
+        try:
+            ecg = load_func(path)
+        except Exception as e:
+            load_errors.append(f'{key}: {type(e).__name__}: {e}')
+            continue
+        rec_leads = leads if leads is not None else \
+            [c for c in ecg.select_dtypes('number').columns if c not in names]
+        rec_signals = ecg[rec_leads].to_numpy(dtype=float)
+        if detector == 'consensus':
+            rec_peaks = [consensus_beats(ecg, sr, rec_leads)['sample'].to_numpy()]
+            rec_leads = ['consensus']
+        else:
+            rec_peaks = detect_rpeaks(rec_signals, sr) if detector == 'pantompkins' else [None] * len(rec_leads)
+        for j, lead in enumerate(rec_leads):
+            hrv, err = _lead_hrv(rec_signals[:, j], sr, peak_features=True, peaks=rec_peaks[j])
+            keys.append(key + (lead,))
+            rows.append(hrv if hrv is not None else pd.DataFrame(index=[0]))
+            if err is not None:
+                lead_errors.append(f'{key + (lead,)}: {err}')
+
+    index = pd.MultiIndex.from_tuples(keys, names=names + ['lead'])
+    features = pd.concat(rows, ignore_index=True) if len(rows) else pd.DataFrame(index=range(0))
+    features.index = index
+    return features, lead_errors, load_errors, time.time() - start
+
+
+def ecg_checkpoint_path(out_dir: str, participant_id) -> str:
+    """
+    The path of the features checkpoint of a participant.
+    """
+    return os.path.join(out_dir, f'{ECG_CHECKPOINT_PREFIX}{participant_id}.parquet')
+
+
+def read_ecg_features(out_dir: str) -> pd.DataFrame:
+    """
+    Read all the features checkpoints written by `ecg_features_pipeline` to a directory.
+    """
+    files = sorted(f for f in os.listdir(out_dir) if f.startswith(ECG_CHECKPOINT_PREFIX) and f.endswith('.parquet'))
+    if not len(files):
+        return pd.DataFrame()
+    return pd.concat([pd.read_parquet(os.path.join(out_dir, f)) for f in files]).sort_index()
+
+
+def ecg_features_pipeline(
+    dl,
+    field_name: str,
+    out_dir: str,
+    participant_id: Optional[List[int]] = None,
+    sr: int = 1000,
+    leads: Optional[List[str]] = None,
+    load_func: Callable = read_parquet,
+    n_jobs: Optional[int] = None,
+    force: bool = False,
+    errors: Optional[str] = None,
+    detector: str = 'neurokit',
+    verbose: bool = False,
+) -> pd.DataFrame:
+    """
+    Compute the HRV and R-peak features of every ECG recording of a dataset, checkpointed per participant.
+
+    Args:
+        dl (DataLoader): The data loader of the ECG dataset.
+        field_name (str): The field holding the relative path of each recording's bulk file.
+        out_dir (str): The directory of the checkpoints.
+        participant_id (List[int], optional): The participants to process. Defaults to None, which processes all.
+        sr (int, optional): The sampling rate of the ECG data. Defaults to 1000.
+        leads (List[str], optional): The lead columns. Defaults to None, which uses all numeric columns.
+        load_func (callable, optional): The function that loads a recording. Defaults to read_parquet, which reads
+            remote files through the shared RemoteIO instance (of each worker).
+        n_jobs (int, optional): The number of worker processes. 1 computes in the current process. Defaults to None (all CPUs).
+        force (bool, optional): Whether to recompute participants that already have a checkpoint. Defaults to False.
+        errors (str, optional): Whether to 'raise', 'warn' or 'ignore' errors. Defaults to None, which uses dl.errors.
+        detector (str, optional): The R-peak detector, one of RPEAK_DETECTORS. With 'consensus', each recording has a
+            single row of features, with lead 'consensus'. Defaults to 'neurokit'.
+        verbose (bool, optional): Whether to print the number of recordings processed and the throughput.
+            Defaults to False.
+
+    Returns:
+        pd.DataFrame: The status of each participant ('computed', 'skipped' or 'failed'), its number of recordings,
+            processing time and errors.
+    """
+    if errors is None:
+        errors = dl.errors
+    if detector not in RPEAK_DETECTORS:
+        raise ValueError(f'detector must be one of {RPEAK_DETECTORS}, got {detector}')
+    os.makedirs(out_dir, exist_ok=True)
+
+    index, paths = _sample_paths(dl, field_name, participant_id, None, None)
+    names = [n for n in index.names if n is not None]
+    paths = pd.Series(paths, index=index, dtype=object)
+
+    status = {}
+    tasks = {}
+    for pid, rows in paths.groupby(level='participant_id', sort=True):
+        recordings = [(k if isinstance(k, tuple) else (k,), p) for k, p in rows.items()]
+        if not force and os.path.isfile(ecg_checkpoint_path(out_dir, pid)):
+            status[pid] = {'status': 'skipped', 'n_recordings': len(recordings), 'seconds': 0., 'errors': ''}
+            continue
+        tasks[pid] = recordings
+
+    def collect(pid, result):
+        features, lead_errors, load_errors, seconds = result
+        for err in lead_errors + load_errors:
+            if errors == 'raise':
+                raise ValueError(f'ECG features failed for {err}')
+            elif errors == 'warn':
+                warnings.warn(f'ECG features failed for {err}')
+        if len(load_errors):
+            status[pid] = {'status': 'failed', 'n_recordings': len(tasks[pid]), 'seconds': seconds,
+                           'errors': '; '.join(load_errors + lead_errors)}
+            return
+        path = ecg_checkpoint_path(out_dir, pid)
+        features.to_parquet(f'{path}.tmp')
+        os.replace(f'{path}.tmp', path)
+        status[pid] = {'status': 'computed', 'n_recordings': len(tasks[pid]), 'seconds': seconds,
+                       'errors': '; '.join(lead_errors)}
+
+    def fail(pid, err):
+        if errors == 'raise':
+            raise err
+        elif errors == 'warn':
+            warnings.warn(f'ECG features failed for participant {pid}: {err}')
+        status[pid] = {'status': 'failed', 'n_recordings': len(tasks[pid]), 'seconds': np.nan, 'errors': str(err)}
+
+    start = time.time()
+    if n_jobs == 1:
+        for pid, recordings in tasks.items():
+            try:
+                result = _participant_ecg_features(recordings, names, sr, leads, load_func, detector)
+            except Exception as err:
+                fail(pid, err)
+                continue
+            collect(pid, result)
+    elif len(tasks):
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            futures = {pool.submit(_participant_ecg_features, recordings, names, sr, leads, load_func, detector): pid
+                       for pid, recordings in tasks.items()}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as err:
+                    fail(futures[future], err)
+                    continue
+                collect(futures[future], result)
+
+    status = pd.DataFrame.from_dict(status, orient='index', columns=['status', 'n_recordings', 'seconds', 'errors'])
+    status.index.name = 'participant_id'
+    elapsed = time.time() - start
+    computed = status.loc[status['status'] == 'computed', 'n_recordings'].sum()
+    if verbose:
+        print(f'Computed ECG features of {computed} recordings in {elapsed:.1f}s ({computed / max(elapsed, 1e-9):.2f} recordings/s), '
+              f'{(status["status"] == "skipped").sum()} participants unchanged, {(status["status"] == "failed").sum()} failed')
+
+    return status.sort_index()
+
+# %% ../nbs/09_ecg_analysis.ipynb 18
+def _qrs_energy(
+    x: np.ndarray,
+    sr: int,
+    band: Tuple[float, float],
+    window: float,
+    detection_sr: int,
+) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, int]]:
+    # the subsampled bandpass filtered signals, their slope and its moving integration, and the subsampling factor
+    q = max(int(sr // detection_sr), 1)
+    fs = sr / q
+    sos = sps.butter(3, band, btype='bandpass', fs=fs, output='sos')
+    if len(x[::q]) <= 3 * (2 * len(sos) + 1):
+        # too short to filter
+        return None
+    f = sps.sosfiltfilt(sos, x[::q], axis=0)
+    slope = np.gradient(f, axis=0)
+    mwi = uniform_filter1d(slope ** 2, max(int(window * fs), 1), axis=0)
+    return f, slope, mwi, q
+
+
+def _select_peaks(
+    f: np.ndarray,
+    slope: np.ndarray,
+    mwi: np.ndarray,
+    fs: float,
+    window: float,
+    refractory: float,
+    t_wave: float,
+    threshold: float,
+    search: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    # the peaks (at the subsampled rate) and their columns, sorted by column and time
+    n_leads = mwi.shape[1]
+
+    # local maxima above a fraction of the maximum of their block and the neighbouring blocks
+    local_max = maximum_filter1d(mwi, 2 * max(int(refractory * fs), 1) + 1, axis=0)
+    b = max(int(search * fs), 1)
+    n_blocks = -(-len(mwi) // b)
+    padded = np.r_[mwi, np.full((n_blocks * b - len(mwi), n_leads), -np.inf)]
+    block_max = padded.reshape(n_blocks, b, n_leads).max(axis=1)
+    block_max = np.maximum(block_max, np.maximum(np.r_[block_max[1:], block_max[-1:]], np.r_[block_max[:1], block_max[:-1]]))
+    level = np.repeat(block_max, b, axis=0)[:len(mwi)]
+    t, lead = np.nonzero((mwi == local_max) & (mwi > threshold * level))
+    order = np.lexsort((t, lead))
+    t, lead = t[order], lead[order]
+
+    # the largest deflection of the filtered signal in the integration window, and the slope of the QRS
+    w = max(int(window * fs), 1)
+    idx = np.clip(t[:, None] + np.arange(-w, 1), 0, len(f) - 1)
+    rows = np.arange(len(t))
+    r = idx[rows, np.abs(f[idx, lead[:, None]]).argmax(axis=1)]
+    qrs_slope = np.abs(slope[idx, lead[:, None]]).max(axis=1)
+    close = np.r_[False, (lead[1:] == lead[:-1]) & (np.diff(r) < t_wave * fs)]
+    t_like = close & (qrs_slope < 0.5 * np.r_[np.inf, qrs_slope[:-1]])
+    keep = ~t_like & (r > 0) & (r < len(f) - 1)
+    return r[keep], lead[keep]
+
+
+def detect_rpeaks(
+    signals: np.ndarray,
+    sr: int = 1000,
+    band: Tuple[float, float] = (8, 20),
+    window: float = 0.15,
+    refractory: float = 0.2,
+    t_wave: float = 0.36,
+    threshold: float = 0.3,
+    search: float = 1.,
+    detection_sr: int = 250,
+) -> List[np.ndarray]:
+    """
+    Detect the R-peaks of all leads of a recording at once, with bandpass filtering and derivative thresholds.
+
+    Args:
+        signals (np.ndarray): The ECG signals, as a 1D array or a 2D array with one column per lead.
+        sr (int, optional): The sampling rate of the signals. Defaults to 1000.
+        band (Tuple[float, float], optional): The passband in Hz. Defaults to (8, 20).
+        window (float, optional): The integration window in seconds. Defaults to 0.15.
+        refractory (float, optional): The minimal interval between peaks in seconds. Defaults to 0.2.
+        t_wave (float, optional): The interval after a peak in seconds in which weaker candidates are T waves. Defaults to 0.36.
+        threshold (float, optional): The fraction of the local maximum of the integrated signal a peak must exceed.
+            Defaults to 0.3.
+        search (float, optional): The width in seconds of the blocks the local maximum is taken over (with their
+            neighbouring blocks). Defaults to 1.
+        detection_sr (int, optional): The approximate sampling rate that peaks are detected at. Defaults to 250.
+
+    Returns:
+        List[np.ndarray]: The sorted sample indices of the R-peaks of each lead.
+    """
+    x = np.asarray(signals, dtype=float)
+    if x.ndim == 1:
+        x = x[:, None]
+    n, n_leads = x.shape
+    energy = _qrs_energy(x, sr, band, window, detection_sr)
+    if energy is None:
+        return [np.zeros(0, dtype=int) for _ in range(n_leads)]
+    f, slope, mwi, q = energy
+    r, lead = _select_peaks(f, slope, mwi, sr / q, window, refractory, t_wave, threshold, search)
+
+    # refine on the full-rate signal, keeping the polarity of the filtered peak
+    sign = np.sign(f[r, lead])
+    idx = np.clip(r[:, None] * q + np.arange(-2 * q, 2 * q + 1), 0, n - 1)
+    seg = x[idx, lead[:, None]]
+    r = idx[np.arange(len(r)), (sign[:, None] * (seg - seg.mean(axis=1, keepdims=True))).argmax(axis=1)]
+
+    return [np.unique(r[lead == j]) for j in range(n_leads)]
+
+# %% ../nbs/09_ecg_analysis.ipynb 23
+BEAT_QUALITY_WINDOW = (0.1, 0.1)
+
+
+def consensus_beats(
+    ecg_df: pd.DataFrame,
+    sr: int = 1000,
+    leads: Optional[List[str]] = None,
+    band: Tuple[float, float] = (8, 20),
+    window: float = 0.15,
+    refractory: float = 0.2,
+    t_wave: float = 0.36,
+    threshold: float = 0.3,
+    search: float = 1.,
+    detection_sr: int = 250,
+) -> pd.DataFrame:
+    """
+    Detect the heart beats of a multi-lead recording once, on the combined QRS energy of all its leads.
+
+    Args:
+        ecg_df (pd.DataFrame): The ECG data of a single recording, with one column for each lead.
+        sr (int, optional): The sampling rate of the ECG data. Defaults to 1000.
+        leads (List[str], optional): The lead columns. Defaults to None, which uses all numeric columns.
+        band, window, refractory, t_wave, threshold, search, detection_sr: The detection parameters, as in
+            `detect_rpeaks`.
+
+    Returns:
+        pd.DataFrame: The beat table, indexed by 'beat', with the sample index of each beat ('sample'), the interval
+            from the previous beat in ms ('RR'), and the correlation of the QRS complex of each lead with the median
+            QRS complex of the lead ('quality_<lead>'), summarized by their median over leads ('quality').
+    """
+    if leads is None:
+        leads = list(ecg_df.select_dtypes('number').columns)
+    x = ecg_df[leads].to_numpy(dtype=float)
+    n = len(x)
+    columns = ['sample', 'RR', 'quality'] + [f'quality_{lead}' for lead in leads]
+    energy = _qrs_energy(x, sr, band, window, detection_sr)
+    if energy is None:
+        return pd.DataFrame(columns=columns, index=pd.RangeIndex(0, name='beat')).astype({'sample': int})
+    f, slope, mwi, q = energy
+
+    # each lead contributes in units of its typical QRS energy, so that no lead dominates, and flat leads are ignored
+    scale = np.percentile(mwi, 99, axis=0)
+    weight = np.divide(1, scale, out=np.zeros_like(scale), where=scale > 0)
+    combined_mwi = mwi @ weight
+    combined_f = np.sqrt((f ** 2) @ weight)
+    combined_slope = np.sqrt((slope ** 2) @ weight)
+    r, _ = _select_peaks(combined_f[:, None], combined_slope[:, None], combined_mwi[:, None], sr / q,
+                         window, refractory, t_wave, threshold, search)
+
+    # refine on the full-rate signals, at the largest deflection of all the leads (in their QRS polarity) from the
+    # mean of the QRS window
+    offsets = np.arange(-int(BEAT_QUALITY_WINDOW[0] * sr), int(BEAT_QUALITY_WINDOW[1] * sr) + 1)
+    qrs = x[np.clip(r[:, None] * q + offsets, 0, n - 1)]
+    qrs = qrs - qrs.mean(axis=1, keepdims=True)
+    sign = np.sign(f[r])
+    amplitude = np.percentile(np.abs(x - np.median(x, axis=0)), 99, axis=0)
+    scaled = np.divide(sign, amplitude, out=np.zeros_like(sign), where=amplitude > 0)
+    deflection = (qrs * scaled[:, None, :]).sum(axis=2)
+    search_range = np.abs(offsets) <= 2 * q
+    sample = np.unique(r * q + offsets[search_range][deflection[:, search_range].argmax(axis=1)])
+
+    # the correlation of the QRS complex of each beat and lead with the median QRS complex of the lead
+    qrs = x[np.clip(sample[:, None] + offsets, 0, n - 1)]
+    qrs = qrs - qrs.mean(axis=1, keepdims=True)
+    template = np.median(qrs, axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        quality = (qrs * template).sum(axis=1) / np.sqrt((qrs ** 2).sum(axis=1) * (template ** 2).sum(axis=0))
+
+    beats = pd.DataFrame(quality, columns=[f'quality_{lead}' for lead in leads])
+    beats.insert(0, 'sample', sample)
+    beats.insert(1, 'RR', np.r_[np.nan, np.diff(sample) * 1000 / sr])
+    beats.insert(2, 'quality', np.nanmedian(quality, axis=1) if len(sample) else [])
+    beats.index.name = 'beat'
+    return beats
+
+
+def beat_templates(
+    ecg_df: pd.DataFrame,
+    beats: pd.DataFrame,
+    sr: int = 1000,
+    leads: Optional[List[str]] = None,
+    before: float = 0.25,
+    after: float = 0.45,
+    min_quality: float = 0.8,
+) -> pd.DataFrame:
+    """
+    The median beat of each lead of a recording, over the beats of its beat table.
+
+    Args:
+        ecg_df (pd.DataFrame): The ECG data of a single recording, with one column for each lead.
+        beats (pd.DataFrame): The beat table of the recording, from `consensus_beats`.
+        sr (int, optional): The sampling rate of the ECG data. Defaults to 1000.
+        leads (List[str], optional): The lead columns. Defaults to None, which uses all numeric columns.
+        before (float, optional): The time before each beat in seconds. Defaults to 0.25.
+        after (float, optional): The time after each beat in seconds. Defaults to 0.45.
+        min_quality (float, optional): The minimal quality of the beats that are used. Defaults to 0.8.
+
+    Returns:
+        pd.DataFrame: The median beats, indexed by the time from the beat in seconds ('time'), with one column per lead.
+    """
+    if leads is None:
+        leads = list(ecg_df.select_dtypes('number').columns)
+    x = ecg_df[leads].to_numpy(dtype=float)
+    offsets = np.arange(-int(before * sr), int(after * sr) + 1)
+    sample = beats.loc[beats['quality'] >= min_quality, 'sample'].to_numpy()
+    sample = sample[(sample + offsets[0] >= 0) & (sample + offsets[-1] < len(x))]
+    templates = np.median(x[sample[:, None] + offsets], axis=0) if len(sample) else \
+        np.full((len(offsets), len(leads)), np.nan)
+    return pd.DataFrame(templates, index=pd.Index(offsets / sr, name='time'), columns=leads)
+
+# %% ../nbs/09_ecg_analysis.ipynb 29
+def save_ecg_plots(
+    recordings: Union[Dict[str, pd.DataFrame], Iterable[Tuple[str, pd.DataFrame]]],
+    out_dir: str,
+    sr: int = 1000,
+    figsize: Tuple[float, float] = (20, 9),
+    dpi: int = 50,
+    fmt: str = 'png',
+    **kwargs,
+) -> List[str]:
+    """
+    Render the 12 leads of many ECG recordings to image files, reusing a single figure.
+
+    Args:
+        recordings (Union[Dict[str, pd.DataFrame], Iterable[Tuple[str, pd.DataFrame]]]): The recordings, by the name of
+            their image file. An iterable of pairs can be a generator that loads each recording.
+        out_dir (str): The directory of the image files.
+        sr (int, optional): The sampling rate of the ECG data. Defaults to 1000.
+        figsize (Tuple[float, float], optional): The size of the figure. Defaults to (20, 9).
+        dpi (int, optional): The resolution of the image files. Defaults to 50.
+        fmt (str, optional): The format of the image files. Defaults to 'png'.
+        **kwargs: Additional arguments to vis_ecg, e.g., start and end.
+
+    Returns:
+        List[str]: The paths of the image files.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    if isinstance(recordings, dict):
+        recordings = recordings.items()
+    with sns.axes_style('darkgrid'):
+        fig, axs = plt.subplots(3, 4, figsize=figsize, dpi=dpi)
+    time_data = {}
+    paths = []
+    try:
+        for name, ecg in recordings:
+            if len(ecg) not in time_data:
+                time_data[len(ecg)] = np.arange(len(ecg)) / sr
+            path = os.path.join(out_dir, f'{name}.{fmt}')
+            vis_ecg(ecg, sr=sr, time_data=time_data[len(ecg)], axs=axs, save_path=path, dpi=dpi, **kwargs)
+            paths.append(path)
+    finally:
+        plt.close(fig)
+
+    return paths
@@ -0,0 +1,296 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/18_image_loader.ipynb.
+
+# %% auto 0
+__all__ = ['THUMBNAIL_SIZE', 'THUMBNAIL_FORMATS', 'IMAGE_BATCH_MEMORY', 'load_image', 'ThumbnailCache', 'load_images',
+           'show_images', 'iter_image_batches']
+
+# %% ../nbs/18_image_loader.ipynb 3
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import os
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+import warnings
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from PIL import Image, ImageOps
+
+# %% ../nbs/18_image_loader.ipynb 4
+from .config import *
+from .data_loader import _sample_paths
+from .remote_io import get_io, is_remote
+
+# %% ../nbs/18_image_loader.ipynb 6
+THUMBNAIL_SIZE = 512
+THUMBNAIL_FORMATS = ['jpeg', 'png']
+
+
+def load_image(path: str, size: Optional[int] = None) -> Image.Image:
+    """
+    Load an image, downscaled while decoding so that its width and height are at most size.
+
+    Args:
+        path (str): The path or URL of the image.
+        size (int, optional): The maximal width and height of the image. Defaults to None, the full resolution.
+
+    Returns:
+        Image.Image: The loaded image.
+    """
+    with get_io().open(path) as f:
+        img = Image.open(f)
+        if size is not None and max(img.size) > size:
+            # JPEG images are decoded at the smallest scale larger than size, other formats are ignored
+            img.draft(img.mode, (size, size))
+            factor = max(img.size) // size
+            if factor > 1:
+                img = img.reduce(factor)
+            img.thumbnail((size, size))
+        img.load()
+    return img
+
+
+class ThumbnailCache:
+    """
+    A `load_func` for `DataLoader.load_sample_data` that loads images as thumbnails, keeping every thumbnail on disk.
+
+    Args:
+        cache_dir (str, optional): The cache directory. Defaults to None, which uses the 'thumbnails' directory in
+            CACHE_PATH.
+        size (int, optional): The maximal width and height of the thumbnails. Defaults to THUMBNAIL_SIZE.
+        fmt (str, optional): The format of the thumbnails, 'jpeg' (which is much faster to write, and stores images
+            with transparency or a palette as RGB) or 'png'. Defaults to 'jpeg'.
+    """
+    def __init__(self, cache_dir: str = None, size: int = THUMBNAIL_SIZE, fmt: str = 'jpeg'):
+        if fmt not in THUMBNAIL_FORMATS:
+            raise ValueError(f'fmt must be one of {THUMBNAIL_FORMATS}, got {fmt}')
+        self.cache_dir = os.path.expanduser(cache_dir if cache_dir is not None else os.path.join(CACHE_PATH, 'thumbnails'))
+        self.size = size
+        self.fmt = fmt
+
+    def cache_path(self, path: str) -> str:
+        """
+        The path of the thumbnail of an image, keyed by its path, version (its modification time, or the ETag of a
+        remote image) and the thumbnail size.
+        """
+        if is_remote(path):
+            remote_io = get_io()
+            remote_io.refresh(path)
+            key = json.dumps([path, remote_io.info(path)['version'], self.size])
+        else:
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                mtime = None
+            key = json.dumps([os.path.abspath(path), mtime, self.size])
+        digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f'{os.path.splitext(os.path.basename(path))[0]}_{digest}.{self.fmt}')
+
+    def __call__(self, path: str) -> Image.Image:
+        cached = self.cache_path(path)
+        if os.path.isfile(cached):
+            return load_image(cached)
+
+        img = load_image(path, self.size)
+        if self.fmt == 'jpeg' and img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f'{cached}.{os.getpid()}.tmp'
+        img.save(tmp_path, format=self.fmt, **({'quality': 90} if self.fmt == 'jpeg' else {}))
+        os.replace(tmp_path, cached)
+        return img
+
+
+def _load_or_error(load_func, path: str) -> Tuple[Optional[Image.Image], Optional[str]]:
+    try:
+        return load_func(path), None
+    except Exception as e:
+        return None, f'{type(e).__name__}: {e}'
+
+
+def load_images(
+    dl,
+    field_name: str,
+    participant_id: Union[None, int, List[int]] = None,
+    research_stage: Union[None, str, List[str]] = None,
+    array_index: Union[None, int, List[int]] = None,
+    size: Optional[int] = THUMBNAIL_SIZE,
+    cache: Union[bool, ThumbnailCache] = True,
+    n_jobs: int = 8,
+    errors: Optional[str] = None,
+) -> pd.Series:
+    """
+    Load the images of many samples of a dataset concurrently, downscaled while decoding.
+
+    Args:
+        dl (DataLoader): The data loader of the dataset.
+        field_name (str): The field holding the relative path of each sample's image.
+        participant_id (int or list, optional): The participants to load. Defaults to None, which loads all.
+        research_stage (str or list, optional): The research stages to load. Defaults to None, which loads all.
+        array_index (int or list, optional): The array indices to load. Defaults to None, which loads all.
+        size (int, optional): The maximal width and height of the images. Defaults to THUMBNAIL_SIZE. None loads the
+            full resolution, without caching.
+        cache (bool or ThumbnailCache, optional): Whether to keep the thumbnails in a ThumbnailCache of the given size
+            in the default directory, or the ThumbnailCache to use. Defaults to True.
+        n_jobs (int, optional): The number of threads that load images. Defaults to 8.
+        errors (str, optional): Whether to 'raise', 'warn' or 'ignore' images that cannot be loaded. Defaults to None,
+            which uses dl.errors.
+
+    Returns:
+        pd.Series: The images, indexed by the index of the samples. Images that cannot be loaded are None.
+    """
+    if errors is None:
+        errors = dl.errors
+    index, paths = _sample_paths(dl, field_name, participant_id, research_stage, array_index)
+
+    if isinstance(cache, ThumbnailCache):
+        load_func = cache
+    elif cache and size is not None:
+        load_func = ThumbnailCache(size=size)
+    else:
+        load_func = lambda path: load_image(path, size)
+    with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+        results = list(pool.map(lambda path: _load_or_error(load_func, path), paths))
+
+    for path, (_, err) in zip(paths, results):
+        if err is None:
+            continue
+        if errors == 'raise':
+            raise ValueError(f'Error loading {path}: {err}')
+        elif errors == 'warn':
+            warnings.warn(f'Error loading {path}: {err}')
+
+    return pd.Series([img for img, _ in results], index=index, name=field_name, dtype=object)
+
+
+def show_images(
+    images: pd.Series,
+    ncols: int = 6,
+    size: float = 3,
+    titles: bool = True,
+    save_path: Optional[str] = None,
+    dpi: Optional[int] = None,
+) -> None:
+    """
+    Display images in a grid.
+
+    Args:
+        images (pd.Series): The images, e.g., from `load_images`. Missing images are left blank.
+        ncols (int, optional): The number of columns of the grid. Defaults to 6.
+        size (float, optional): The width and height of each image in inches. Defaults to 3.
+        titles (bool, optional): Whether to title each image with its index. Defaults to True.
+        save_path (str, optional): A file to save the figure to, after which it is closed. Defaults to None.
+        dpi (int, optional): The resolution of the saved figure. Defaults to None, matplotlib's default.
+    """
+    images = pd.Series(images) if not isinstance(images, pd.Series) else images
+    nrows = max(-(-len(images) // ncols), 1)
+    fig, axs = plt.subplots(nrows, ncols, figsize=(ncols * size, nrows * size), squeeze=False)
+    for ax in axs.flat:
+        ax.axis('off')
+    for ax, (key, img) in zip(axs.flat, images.items()):
+        if img is not None:
+            ax.imshow(img, cmap='gray')
+        if titles:
+            ax.set_title(' '.join(map(str, key)) if isinstance(key, tuple) else str(key), fontsize=8)
+    fig.tight_layout()
+
+    if save_path is not None:
+        fig.savefig(save_path, dpi=dpi)
+        plt.close(fig)
+
+# %% ../nbs/18_image_loader.ipynb 14
+IMAGE_BATCH_MEMORY = 2**28
+
+
+def _load_array(load_func, path: str, mode: str, width: int, height: int) -> Tuple[Optional[np.ndarray], Optional[str]]:
+    # the image as a fixed-size uint8 array, or the error that prevented it
+    img, err = _load_or_error(load_func, path)
+    if img is None:
+        return None, err
+    return np.asarray(ImageOps.pad(img.convert(mode), (width, height))), None
+
+
+def iter_image_batches(
+    dl,
+    field_name: str,
+    batch_size: int = 32,
+    size: Union[int, Tuple[int, int]] = THUMBNAIL_SIZE,
+    mode: str = 'RGB',
+    participant_id: Union[None, int, List[int]] = None,
+    research_stage: Union[None, str, List[str]] = None,
+    array_index: Union[None, int, List[int]] = None,
+    load_func: Optional[Callable] = None,
+    n_jobs: int = 8,
+    max_memory: int = IMAGE_BATCH_MEMORY,
+    errors: Optional[str] = None,
+) -> Iterator[Tuple[pd.Index, np.ndarray]]:
+    """
+    Stream the images of a bulk field as batches of fixed-size uint8 arrays, prefetched by a pool of threads.
+
+    Args:
+        dl (DataLoader): The data loader of the dataset.
+        field_name (str): The field holding the relative path of each sample's image.
+        batch_size (int, optional): The number of images in a batch. Defaults to 32.
+        size (int or Tuple[int, int], optional): The width and height of the images. Defaults to THUMBNAIL_SIZE.
+        mode (str, optional): The PIL mode of the images, e.g., 'RGB' or 'L'. Defaults to 'RGB'.
+        participant_id (int or list, optional): The participants to load. Defaults to None, which loads all.
+        research_stage (str or list, optional): The research stages to load. Defaults to None, which loads all.
+        array_index (int or list, optional): The array indices to load. Defaults to None, which loads all.
+        load_func (callable, optional): The function that loads an image, e.g., a ThumbnailCache. Defaults to None,
+            which uses load_image at the requested size.
+        n_jobs (int, optional): The number of threads that load images. Defaults to 8.
+        max_memory (int, optional): The maximal number of bytes of the images in flight and in the batch being
+            assembled. Defaults to IMAGE_BATCH_MEMORY (256 MB).
+        errors (str, optional): Whether to 'raise', 'warn' or 'ignore' images that cannot be loaded. Defaults to None,
+            which uses dl.errors.
+
+    Yields:
+        Tuple[pd.Index, np.ndarray]: The index of the samples of a batch, and their images as an array of shape
+            (n, height, width) or (n, height, width, channels).
+    """
+    if errors is None:
+        errors = dl.errors
+    width, height = (size, size) if isinstance(size, int) else size
+    bands = Image.getmodebands(mode)
+    shape = (height, width) if bands == 1 else (height, width, bands)
+    image_bytes = int(np.prod(shape))
+    if max_memory < batch_size * image_bytes:
+        raise ValueError(f'max_memory ({max_memory} bytes) must hold at least a batch of {batch_size} images '
+                         f'({batch_size * image_bytes} bytes)')
+    n_prefetch = max(max_memory // image_bytes - batch_size, 1)
+    if load_func is None:
+        load_func = lambda path: load_image(path, max(width, height))
+    index, paths = _sample_paths(dl, field_name, participant_id, research_stage, array_index)
+
+    pool = ThreadPoolExecutor(max_workers=n_jobs)
+    pending = deque()
+    try:
+        for i in range(min(n_prefetch, len(paths))):
+            pending.append((i, pool.submit(_load_array, load_func, paths[i], mode, width, height)))
+        next_i = len(pending)
+        batch, keys = np.empty((batch_size,) + shape, dtype=np.uint8), []
+        while len(pending):
+            i, future = pending.popleft()
+            arr, err = future.result()
+            if next_i < len(paths):
+                pending.append((next_i, pool.submit(_load_array, load_func, paths[next_i], mode, width, height)))
+                next_i += 1
+            if err is not None:
+                if errors == 'raise':
+                    raise ValueError(f'Error loading {paths[i]}: {err}')
+                elif errors == 'warn':
+                    warnings.warn(f'Error loading {paths[i]}: {err}')
+                continue
+            batch[len(keys)] = arr
+            keys.append(i)
+            if len(keys) == batch_size:
+                yield index[keys], batch
+                batch, keys = np.empty((batch_size,) + shape, dtype=np.uint8), []
+        if len(keys):
+            yield index[keys], batch[:len(keys)]
+    finally:
+        for _, future in pending:
+            future.cancel()
+        pool.shutdown(wait=True)
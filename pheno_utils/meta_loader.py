@@ -11,11 +11,11 @@ import warnings
 
 import numpy as np
 import pandas as pd
-import dask.dataframe as dd
 
 # %% ../nbs/11_meta_loader.ipynb 4
 from .config import *
 from .data_loader import DataLoader as PhenoLoader
+from .remote_io import get_io
 
 # %% ../nbs/11_meta_loader.ipynb 5
 class MetaLoader:
@@ -172,8 +172,11 @@ class MetaLoader:
         """
         Load all dictionaries in the base_path.
         """
-        dicts = dd.read_csv(os.path.join(self.dataset_path, '*_dict*.csv'),
-                            include_path_column=True, dtype={'parent_dataframe': 'object'}).compute()
+        remote_io = get_io()
+        paths = remote_io.glob(os.path.join(self.dataset_path, '*_dict*.csv'))
+        dicts = pd.concat(remote_io.map(
+            lambda p: remote_io.read_csv(p, dtype={'parent_dataframe': 'object'}).assign(path=p), paths),
+            ignore_index=True)
         if self.cohort is None:
             dataset_ind = -2
         else:
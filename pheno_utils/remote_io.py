@@ -0,0 +1,492 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/19_remote_io.ipynb.
+
+# %% auto 0
+__all__ = ['IO_BLOCK_SIZE', 'IO_MAX_CONCURRENCY', 'IO_RETRIES', 'IO_BACKOFF', 'IO_MEMORY_BLOCKS', 'LOCAL_PROTOCOLS',
+           'NO_RETRY_ERRORS', 'NETWORK_FILESYSTEMS', 'is_remote', 'network_mounts', 'FileCache', 'RemoteIO',
+           'RemoteFile', 'get_io', 'set_io', 'read_parquet']
+
+# %% ../nbs/19_remote_io.ipynb 3
+from collections import OrderedDict
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from functools import lru_cache
+from glob import glob
+import hashlib
+import io
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+import fsspec
+
+# %% ../nbs/19_remote_io.ipynb 4
+from .config import *
+
+# %% ../nbs/19_remote_io.ipynb 6
+IO_BLOCK_SIZE = 2**22
+IO_MAX_CONCURRENCY = 16
+IO_RETRIES = 3
+IO_BACKOFF = 0.5
+IO_MEMORY_BLOCKS = 8
+LOCAL_PROTOCOLS = ['file', 'local']
+NO_RETRY_ERRORS = (FileNotFoundError, PermissionError, IsADirectoryError, NotADirectoryError, ValueError, TypeError)
+
+
+def is_remote(path: str) -> bool:
+    """
+    Whether a path is read through a remote filesystem (e.g., s3://), rather than from the local disk.
+    """
+    return '://' in str(path) and fsspec.utils.get_protocol(str(path)) not in LOCAL_PROTOCOLS
+
+
+NETWORK_FILESYSTEMS = ['nfs', 'nfs4', 'efs', 'cifs', 'smb3', 'lustre', 'fuse.s3fs', 'fuse.goofys', 'fuse.sshfs']
+
+
+@lru_cache()
+def network_mounts() -> List[str]:
+    """
+    The mount points of the network filesystems of the machine (read from /proc/mounts, so empty on other platforms).
+    """
+    try:
+        with open('/proc/mounts') as f:
+            mounts = [line.split() for line in f]
+    except OSError:
+        return []
+    return sorted(m[1] for m in mounts if len(m) > 2 and m[2] in NETWORK_FILESYSTEMS)
+
+
+def _evict_lru(cache_dir: str, max_size: int) -> int:
+    # remove the least recently used (i.e., modified) files of a directory until it fits in max_size bytes, and
+    # return the number of removed files
+    if not os.path.isdir(cache_dir):
+        return 0
+    entries = sorted((e.stat().st_mtime_ns, e.stat().st_size, e.path) for e in os.scandir(cache_dir)
+                     if e.is_file() and not e.name.endswith('.tmp'))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in entries:
+        if total <= max_size:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+class FileCache:
+    """
+    A local read-through cache of whole files, validated by the modification time and size of the original file,
+    with LRU eviction.
+
+    Args:
+        cache_dir (str, optional): The cache directory. Defaults to None, which uses the 'files' directory in CACHE_PATH.
+        max_size (int, optional): The maximal total size of the cached files in bytes. Defaults to None, which uses
+            LOCAL_CACHE_SIZE GB.
+        paths (List[str], optional): The directories whose files are cached. Defaults to None, which uses
+            LOCAL_CACHE_PATHS, or the network mounts of the machine if it is not set.
+
+    Attributes:
+        stats (dict): The number of hits, misses and evicted files.
+    """
+    def __init__(self, cache_dir: Optional[str] = None, max_size: Optional[int] = None, paths: Optional[List[str]] = None):
+        if cache_dir is None:
+            cache_dir = os.path.join(CACHE_PATH, 'files')
+        if max_size is None:
+            max_size = int(LOCAL_CACHE_SIZE * 2**30)
+        if paths is None:
+            paths = LOCAL_CACHE_PATHS if LOCAL_CACHE_PATHS is not None else network_mounts()
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.max_size = max_size
+        self.paths = [os.path.join(os.path.abspath(os.path.expanduser(p)), '') for p in paths]
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f'FileCache(cache_dir={self.cache_dir!r}, max_size={self.max_size}, paths={self.paths}, stats={self.stats})'
+
+    def is_cached(self, path: str) -> bool:
+        """
+        Whether a path is under one of the cached directories.
+        """
+        path = os.path.abspath(os.path.expanduser(path))
+        return self.max_size > 0 and any(path.startswith(p) for p in self.paths)
+
+    def get(self, path: str) -> str:
+        """
+        The path of the cached copy of a file, which is copied first if it is missing or stale. Files that are not
+        cached are returned as is.
+        """
+        if not self.is_cached(path) or not os.path.isfile(path):
+            return path
+        stat = os.stat(path)
+        if stat.st_size > self.max_size:
+            return path
+        digest = hashlib.sha1(os.path.abspath(os.path.expanduser(path)).encode()).hexdigest()[:16]
+        cached = os.path.join(self.cache_dir, f'{digest}_{stat.st_mtime_ns}_{stat.st_size}{os.path.splitext(path)[1]}')
+        if os.path.isfile(cached):
+            os.utime(cached)  # the modification time of a copy is its last use
+            with self._lock:
+                self.stats['hits'] += 1
+            return cached
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        for stale in glob(os.path.join(self.cache_dir, f'{digest}_*')):
+            if not stale.endswith('.tmp'):
+                os.remove(stale)
+        tmp_path = f'{cached}.{os.getpid()}.{threading.get_ident()}.tmp'
+        shutil.copyfile(path, tmp_path)
+        os.replace(tmp_path, cached)
+        with self._lock:
+            self.stats['misses'] += 1
+            self.evict()
+        return cached
+
+    def size(self) -> int:
+        """
+        The total size of the cached files in bytes.
+        """
+        if not os.path.isdir(self.cache_dir):
+            return 0
+        return sum(e.stat().st_size for e in os.scandir(self.cache_dir) if e.is_file())
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used files until the cache fits in max_size.
+        """
+        self.stats['evictions'] += _evict_lru(self.cache_dir, self.max_size)
+
+    def clear(self) -> None:
+        """
+        Remove all cached files.
+        """
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+
+class RemoteIO:
+    """
+    A shared I/O layer for remote paths, with pooled connections, concurrent and retried range reads, and a local
+    read-through block cache with LRU eviction. Local paths are read directly.
+
+    Args:
+        cache_dir (str, optional): The directory of the block cache. Defaults to None, which uses the 'blocks'
+            directory in CACHE_PATH. False disables the cache.
+        cache_size (int, optional): The maximal total size of the block cache in bytes. Defaults to None, which uses
+            LOCAL_CACHE_SIZE GB. 0 disables the cache.
+        block_size (int, optional): The size in bytes of the blocks that are read and cached. Defaults to IO_BLOCK_SIZE.
+        max_concurrency (int, optional): The maximal number of concurrent requests. Defaults to IO_MAX_CONCURRENCY.
+        retries (int, optional): The number of times a failed request is retried. Defaults to IO_RETRIES.
+        backoff (float, optional): The wait in seconds before the first retry, doubled for each retry.
+            Defaults to IO_BACKOFF.
+        storage_options (dict, optional): Options of the fsspec filesystems, e.g., credentials or an endpoint.
+            Defaults to None.
+        file_cache (FileCache, optional): The local cache of files on network filesystems. Defaults to None, which
+            creates one with the default settings. False disables it.
+
+    Attributes:
+        stats (dict): The number of requests, retries, bytes fetched, blocks read from the cache, and evicted blocks.
+    """
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        cache_size: Optional[int] = None,
+        block_size: int = IO_BLOCK_SIZE,
+        max_concurrency: int = IO_MAX_CONCURRENCY,
+        retries: int = IO_RETRIES,
+        backoff: float = IO_BACKOFF,
+        storage_options: Optional[Dict[str, Any]] = None,
+        file_cache: Optional['FileCache'] = None,
+    ):
+        if cache_dir is None:
+            cache_dir = os.path.join(CACHE_PATH, 'blocks')
+        if cache_size is None:
+            cache_size = int(LOCAL_CACHE_SIZE * 2**30)
+        self.cache_dir = os.path.expanduser(cache_dir) if cache_dir and cache_size > 0 else None
+        self.cache_size = cache_size
+        self.block_size = block_size
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.storage_options = storage_options or {}
+        self.file_cache = FileCache() if file_cache is None else file_cache or None
+        self.stats = {'requests': 0, 'retries': 0, 'bytes_fetched': 0, 'cache_hits': 0, 'evictions': 0}
+        self._filesystems = {}
+        self._info = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    def __repr__(self) -> str:
+        return f'RemoteIO(cache_dir={self.cache_dir!r}, block_size={self.block_size}, ' \
+               f'max_concurrency={self.max_concurrency}, stats={self.stats})'
+
+    def filesystem(self, path: str) -> Tuple[fsspec.AbstractFileSystem, str]:
+        """
+        The shared filesystem of a path, and the path within it.
+        """
+        protocol = fsspec.utils.get_protocol(path)
+        with self._lock:
+            if protocol not in self._filesystems:
+                options = dict(self.storage_options)
+                if protocol in ('s3', 's3a'):
+                    config = dict(options.get('config_kwargs', {}))
+                    config.setdefault('max_pool_connections', self.max_concurrency)
+                    options['config_kwargs'] = config
+                self._filesystems[protocol] = fsspec.filesystem(protocol, **options)
+        fs = self._filesystems[protocol]
+        return fs, fs._strip_protocol(path)
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += n
+
+    def retry(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Call a function, and retry it with exponential backoff if it fails with an error that may be transient.
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                return func(*args, **kwargs)
+            except NO_RETRY_ERRORS:
+                raise
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                self._count('retries')
+                time.sleep(self.backoff * 2 ** attempt)
+
+    def info(self, path: str) -> Dict[str, Any]:
+        """
+        The size and version of a remote file, as of the last time it was opened (or first requested).
+        """
+        if path not in self._info:
+            fs, fs_path = self.filesystem(path)
+            info = self.retry(fs.info, fs_path)
+            version = next((info[k] for k in ['ETag', 'etag', 'mtime', 'LastModified', 'created'] if k in info), None)
+            self._info[path] = {'size': info['size'], 'version': str(version)}
+        return self._info[path]
+
+    def refresh(self, path: Optional[str] = None) -> None:
+        """
+        Forget the size and version of a file (or of all files), so that changes to it are read.
+        """
+        if path is None:
+            self._info.clear()
+        else:
+            self._info.pop(path, None)
+
+    def _block_path(self, path: str, i: int) -> str:
+        info = self.info(path)
+        key = json.dumps([path, info['version'], info['size'], self.block_size])
+        return os.path.join(self.cache_dir, f'{hashlib.sha1(key.encode()).hexdigest()[:16]}_{i}')
+
+    def read_block(self, path: str, i: int) -> bytes:
+        """
+        Read the i-th block of a remote file, from the cache or with a range request.
+        """
+        cached = self._block_path(path, i) if self.cache_dir else None
+        if cached is not None and os.path.isfile(cached):
+            try:
+                os.utime(cached)  # the modification time of a block is its last use
+                with open(cached, 'rb') as f:
+                    data = f.read()
+                self._count('cache_hits')
+                return data
+            except FileNotFoundError:
+                pass  # evicted meanwhile
+
+        fs, fs_path = self.filesystem(path)
+        start = i * self.block_size
+        end = min(start + self.block_size, self.info(path)['size'])
+        data = self.retry(fs.cat_file, fs_path, start=start, end=end)
+        self._count('requests')
+        self._count('bytes_fetched', len(data))
+        if cached is not None and len(data) <= self.cache_size:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f'{cached}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, cached)
+            with self._lock:
+                self.stats['evictions'] += _evict_lru(self.cache_dir, self.cache_size)
+        return data
+
+    def read_blocks(self, path: str, blocks: Iterable[int]) -> List[bytes]:
+        """
+        Read blocks of a remote file concurrently.
+        """
+        blocks = list(blocks)
+        if len(blocks) == 1:
+            return [self.read_block(path, blocks[0])]
+        return list(self._pool.map(lambda i: self.read_block(path, i), blocks))
+
+    def local_path(self, path: str) -> str:
+        """
+        The path to read a local file from: its cached copy if it is on a network filesystem, or the path itself.
+        """
+        path = path.split('://')[-1]
+        return self.file_cache.get(path) if self.file_cache is not None else path
+
+    def open(self, path: str) -> io.BufferedIOBase:
+        """
+        Open a file for binary reading. Remote files are read in blocks, and local files on network filesystems are
+        read from the file cache.
+        """
+        if not is_remote(path):
+            return open(self.local_path(path), 'rb')
+        # revalidate the size and version, so that a file that was overwritten is read again rather than its cached
+        # blocks
+        self.refresh(path)
+        return io.BufferedReader(RemoteFile(self, path), buffer_size=2**16)
+
+    def read_parquet(self, path: str, columns: Optional[List[str]] = None, **kwargs) -> pd.DataFrame:
+        """
+        Read a parquet file. Only the footer and the column chunks of the selected columns of a remote file are read.
+        """
+        if not is_remote(path):
+            return pd.read_parquet(self.local_path(path), columns=columns, **kwargs)
+        with self.open(path) as f:
+            return pd.read_parquet(f, columns=columns, **kwargs)
+
+    def read_csv(self, path: str, **kwargs) -> pd.DataFrame:
+        """
+        Read a csv file.
+        """
+        if not is_remote(path):
+            return pd.read_csv(self.local_path(path), **kwargs)
+        with self.open(path) as f:
+            return pd.read_csv(f, **kwargs)
+
+    def glob(self, pattern: str) -> List[str]:
+        """
+        The sorted paths that match a glob pattern.
+        """
+        if not is_remote(pattern):
+            return sorted(glob(pattern))
+        fs, fs_pattern = self.filesystem(pattern)
+        return sorted(fs.unstrip_protocol(p) for p in self.retry(fs.glob, fs_pattern))
+
+    def exists(self, path: str) -> bool:
+        """
+        Whether a path exists.
+        """
+        if not is_remote(path):
+            return os.path.exists(path)
+        fs, fs_path = self.filesystem(path)
+        return self.retry(fs.exists, fs_path)
+
+    def map(self, func: Callable, items: Iterable, n_jobs: Optional[int] = None) -> List[Any]:
+        """
+        Apply a function to every item (e.g., a path) with a pool of threads, keeping the order of the items.
+
+        Args:
+            func (callable): The function.
+            items (iterable): The items.
+            n_jobs (int, optional): The number of threads. Defaults to None, which uses max_concurrency.
+
+        Returns:
+            List[Any]: The results.
+
+        Raises:
+            Exception: The first exception raised by func, as soon as it is raised. The items that were not started
+                yet are cancelled.
+        """
+        items = list(items)
+        n_jobs = self.max_concurrency if n_jobs is None else n_jobs
+        if n_jobs == 1 or len(items) < 2:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(n_jobs, len(items))) as pool:
+            futures = [pool.submit(func, item) for item in items]
+            done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+            failed = [f for f in futures if f in done and f.exception() is not None]
+            if failed:
+                for f in pending:
+                    f.cancel()
+                raise failed[0].exception()
+            return [f.result() for f in futures]
+
+
+class RemoteFile(io.RawIOBase):
+    """
+    A seekable binary file over the blocks of a remote file, which keeps the last IO_MEMORY_BLOCKS blocks in memory.
+    """
+    def __init__(self, remote_io: RemoteIO, path: str):
+        self.remote_io = remote_io
+        self.path = path
+        self.size = remote_io.info(path)['size']
+        self.pos = 0
+        self._blocks = OrderedDict()
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self.pos = offset
+        elif whence == io.SEEK_CUR:
+            self.pos += offset
+        elif whence == io.SEEK_END:
+            self.pos = self.size + offset
+        else:
+            raise ValueError(f'invalid whence: {whence}')
+        return self.pos
+
+    def readinto(self, b) -> int:
+        start, end = self.pos, min(self.pos + len(b), self.size)
+        if start >= end:
+            return 0
+        bs = self.remote_io.block_size
+        blocks = range(start // bs, (end - 1) // bs + 1)
+        missing = [i for i in blocks if i not in self._blocks]
+        for i, data in zip(missing, self.remote_io.read_blocks(self.path, missing)):
+            self._blocks[i] = data
+        data = b''.join(self._blocks[i] for i in blocks)
+        for i in blocks:
+            self._blocks.move_to_end(i)
+        while len(self._blocks) > max(IO_MEMORY_BLOCKS, len(blocks)):
+            self._blocks.popitem(last=False)
+
+        n = end - start
+        offset = start - blocks[0] * bs
+        b[:n] = data[offset:offset + n]
+        self.pos = end
+        return n
+
+
+_shared_io = None
+
+
+def get_io() -> RemoteIO:
+    """
+    The shared RemoteIO instance that the loaders read files through.
+    """
+    global _shared_io
+    if _shared_io is None:
+        _shared_io = RemoteIO()
+    return _shared_io
+
+
+def set_io(remote_io: RemoteIO) -> None:
+    """
+    Replace the shared RemoteIO instance, e.g., to change its concurrency, cache or storage options.
+    """
+    global _shared_io
+    _shared_io = remote_io
+
+
+def read_parquet(path: str, **kwargs) -> pd.DataFrame:
+    """
+    Read a parquet file through the shared RemoteIO instance. The default `load_func` of `DataLoader.load_sample_data`.
+    """
+    return get_io().read_parquet(path, **kwargs)
@@ -0,0 +1,495 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/17_sleep_analysis.ipynb.
+
+# %% auto 0
+__all__ = ['SLEEP_GROUPS', 'SLEEP_STAGES', 'RESPIRATORY_EVENTS', 'CHANNEL_RANGES', 'CHANNEL_STORE_META', 'CHANNEL_STORE_CHUNK',
+           'merge_intervals', 'in_intervals', 'sleep_metrics', 'resample_channels', 'stack_channels', 'write_channels',
+           'ChannelStore']
+
+# %% ../nbs/17_sleep_analysis.ipynb 3
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# %% ../nbs/17_sleep_analysis.ipynb 4
+from .config import *
+from .cgm_analysis import group_mean, group_std
+
+# %% ../nbs/17_sleep_analysis.ipynb 6
+SLEEP_GROUPS = ['participant_id', 'cohort', 'research_stage', 'array_index']
+SLEEP_STAGES = {'wake': ['Wake'], 'rem': ['REM'], 'light': ['Light Sleep'], 'deep': ['Deep Sleep']}
+RESPIRATORY_EVENTS = {
+    'apnea': ['Apnea', 'Central Apnea', 'Obstructive Apnea', 'Mixed Apnea'],
+    'hypopnea': ['Hypopnea'],
+    'rera': ['RERA'],
+    'desaturation': ['Desaturation'],
+    }
+CHANNEL_RANGES = {'spo2': (50, 100), 'heart_rate': (20, 250)}
+
+
+def merge_intervals(start: np.ndarray, end: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Merge overlapping intervals [start, end) into sorted disjoint intervals.
+    """
+    if not len(start):
+        return start, end
+    order = np.argsort(start, kind='stable')
+    start, end = start[order], end[order]
+    reach = np.maximum.accumulate(end)
+    new = np.r_[True, start[1:] > reach[:-1]]
+    first = np.flatnonzero(new)
+    return start[first], np.maximum.reduceat(end, first)
+
+
+def in_intervals(t: np.ndarray, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """
+    Whether each time falls within one of the sorted disjoint intervals [start, end).
+    """
+    i = np.searchsorted(start, t, 'right') - 1
+    return (i >= 0) & (t < end[np.maximum(i, 0)])
+
+
+def _group_reduce(ufunc: np.ufunc, x: np.ndarray, codes: np.ndarray, n_groups: int) -> np.ndarray:
+    # reduce x per group, for x sorted by group code
+    res = np.full(n_groups, np.nan)
+    if len(x):
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        res[codes[starts]] = ufunc.reduceat(x, starts)
+    return res
+
+
+def _sleep_metrics(events: pd.DataFrame, channels: Optional[pd.DataFrame], n_nights: int,
+                   stages: Dict[str, List[str]], respiratory: Dict[str, List[str]],
+                   max_sample_gap: float) -> pd.DataFrame:
+    # events and channels are flat tables with a 'night' code and times in ms ('start', 'end' / 't')
+    tmin = min([events['start'].min()] + ([channels['t'].min()] if channels is not None and len(channels) else []))
+    tmax = max([events['end'].max()] + ([channels['t'].max()] if channels is not None and len(channels) else []))
+    span = np.int64(tmax - tmin + 1)
+
+    def key(codes, t):
+        return codes.astype(np.int64) * span + (t - tmin)
+
+    night = events['night'].to_numpy()
+    ks, ke = key(night, events['start'].to_numpy()), key(night, events['end'].to_numpy())
+    res = {}
+
+    # sleep architecture
+    stage_of = {name: stage for stage, names in stages.items() for name in names}
+    stage = events['event'].map(stage_of).to_numpy()
+    is_stage = pd.notna(stage)
+    tib_start = _group_reduce(np.minimum, *_sorted(ks[is_stage], night[is_stage]), n_nights)
+    tib_end = _group_reduce(np.maximum, *_sorted(ke[is_stage], night[is_stage]), n_nights)
+    res['tib'] = (tib_end - tib_start) / 60000
+
+    sleep = is_stage & (stage != 'wake')
+    sleep_start, sleep_end = merge_intervals(ks[sleep], ke[sleep])
+    sleep_night = sleep_start // span
+    res['tst'] = np.bincount(sleep_night, weights=sleep_end - sleep_start, minlength=n_nights) / 60000
+    res['tst'][np.isnan(res['tib'])] = np.nan
+    with np.errstate(invalid='ignore', divide='ignore'):
+        res['sleep_efficiency'] = 100 * res['tst'] / res['tib']
+    first_sleep = _group_reduce(np.minimum, *_sorted(ks[sleep], night[sleep]), n_nights)
+    res['sleep_latency'] = (first_sleep - tib_start) / 60000
+    for s in stages:
+        mask = stage == s
+        res[f'{s}_min'] = np.bincount(night[mask], weights=(ke - ks)[mask], minlength=n_nights) / 60000
+        res[f'{s}_min'][np.isnan(res['tib'])] = np.nan
+    for s in stages:
+        if s != 'wake':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                res[f'{s}_pct'] = 100 * res[f'{s}_min'] / res['tst']
+
+    # respiratory events during sleep
+    during_sleep = in_intervals(ks, sleep_start, sleep_end)
+    tst_hours = res['tst'] / 60
+    for name, names in respiratory.items():
+        mask = events['event'].isin(names).to_numpy() & during_sleep
+        res[f'n_{name}'] = np.bincount(night[mask], minlength=n_nights)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        res['ahi'] = (res['n_apnea'] + res['n_hypopnea']) / tst_hours
+        res['rdi'] = (res['n_apnea'] + res['n_hypopnea'] + res['n_rera']) / tst_hours
+        res['odi'] = res['n_desaturation'] / tst_hours
+
+    # channels during sleep
+    for source, prefix in [('spo2', 'spo2'), ('heart_rate', 'hr')]:
+        if channels is None:
+            break
+        d = channels.loc[channels['source'] == source]
+        v = d['values'].to_numpy(dtype=float)
+        kt = key(d['night'].to_numpy(), d['t'].to_numpy())
+        lo, hi = CHANNEL_RANGES.get(source, (-np.inf, np.inf))
+        valid = np.isfinite(v) & (lo < v) & (v <= hi) & in_intervals(kt, sleep_start, sleep_end)
+        kt, v = kt[valid], v[valid]
+        order = np.argsort(kt, kind='stable')
+        kt, v = kt[order], v[order]
+        codes = (kt // span).astype(int)
+        # the duration of each sample is the time to the next one, up to max_sample_gap
+        dt = np.r_[np.diff(kt), 0].astype(float)
+        dt[np.r_[codes[1:] != codes[:-1], True] | (dt > max_sample_gap)] = 0
+
+        res[f'{prefix}_mean'] = group_mean(v, codes, n_nights)
+        res[f'{prefix}_min'] = _group_reduce(np.minimum, v, codes, n_nights)
+        if source == 'spo2':
+            below = v < 90
+            res['spo2_t90'] = np.bincount(codes[below], weights=dt[below], minlength=n_nights) / 60000
+            res['spo2_t90'][np.isnan(res['spo2_mean'])] = np.nan
+            with np.errstate(invalid='ignore', divide='ignore'):
+                res['spo2_t90_pct'] = 100 * res['spo2_t90'] / res['tst']
+                res['spo2_burden'] = np.bincount(codes, weights=np.clip(90 - v, 0, None) * dt,
+                                                 minlength=n_nights) / 60000 / tst_hours
+            res['spo2_burden'][np.isnan(res['spo2_mean'])] = np.nan
+        else:
+            res['hr_std'] = group_std(v, codes, n_nights)
+            res['hr_max'] = _group_reduce(np.maximum, v, codes, n_nights)
+
+    return pd.DataFrame(res)
+
+
+def _sorted(x: np.ndarray, codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    order = np.argsort(codes, kind='stable')
+    return x[order], codes[order]
+
+
+def _flatten(df: pd.DataFrame, time_cols: List[str]) -> pd.DataFrame:
+    df = df.reset_index()
+    for c in time_cols:
+        df[c] = pd.DatetimeIndex(df[c]).asi8 // 10**6
+    return df
+
+
+def sleep_metrics(
+    events: pd.DataFrame,
+    channels: Optional[Union[pd.DataFrame, 'ChannelStore', List['ChannelStore']]] = None,
+    by: Optional[List[str]] = None,
+    start_col: str = 'collection_timestamp',
+    end_col: str = 'event_end',
+    time_col: str = 'collection_timestamp',
+    stages: Dict[str, List[str]] = SLEEP_STAGES,
+    respiratory: Dict[str, List[str]] = RESPIRATORY_EVENTS,
+    max_sample_gap: float = 30,
+    n_jobs: int = 1,
+) -> pd.DataFrame:
+    """
+    Compute per-night sleep metrics from the sleep events (and channels) of any number of nights.
+
+    Args:
+        events (pd.DataFrame): The sleep events, with start and end times and 'event' names.
+        channels (pd.DataFrame, optional): The raw channels, with 'source', time and 'values' columns (or index levels),
+            or one or more ChannelStore nights, or the time x source output of `resample_channels` if events contains
+            a single night. Defaults to None, which skips the SpO2 and heart rate metrics.
+        by (List[str], optional): The columns that define a night. Defaults to None, which uses the columns of
+            SLEEP_GROUPS available in events, so that the result can be joined with DataLoader data.
+        start_col (str, optional): The event start column. Defaults to 'collection_timestamp'.
+        end_col (str, optional): The event end column. Defaults to 'event_end'.
+        time_col (str, optional): The time column of channels. Defaults to 'collection_timestamp'.
+        stages (Dict[str, List[str]], optional): The event names of each sleep stage. Must include 'wake'.
+            Defaults to SLEEP_STAGES.
+        respiratory (Dict[str, List[str]], optional): The event names of 'apnea', 'hypopnea', 'rera' and
+            'desaturation'. Defaults to RESPIRATORY_EVENTS.
+        max_sample_gap (float, optional): The longest duration in seconds attributed to a single channel sample.
+            Defaults to 30.
+        n_jobs (int, optional): The number of worker processes. Nights are split between workers. Defaults to 1.
+
+    Returns:
+        pd.DataFrame: The metrics of each night, indexed by the `by` columns.
+    """
+    ev = _flatten(events, [start_col, end_col]).rename(columns={start_col: 'start', end_col: 'end'})
+    if by is None:
+        by = [c for c in SLEEP_GROUPS if c in ev.columns]
+    nights = pd.MultiIndex.from_frame(ev[by].drop_duplicates()).sort_values()
+    ev['night'] = nights.get_indexer(pd.MultiIndex.from_frame(ev[by]))
+    ev = ev[['night', 'start', 'end', 'event']]
+
+    ch = None
+    if isinstance(channels, pd.DataFrame) and isinstance(channels.index, pd.DatetimeIndex) \
+            and 'values' not in channels.columns:
+        # resampled channels, which have no keys
+        if len(nights) != 1:
+            raise ValueError('Resampled channels can only be used with the events of a single night, '
+                             'use stack_channels to add the keys of their night')
+        channels = stack_channels(channels, dict(zip(by, nights[0])), time_col)
+    if channels is not None and not isinstance(channels, pd.DataFrame):
+        stores = channels if isinstance(channels, list) else [channels]
+        channels = pd.concat([s.to_frame(['spo2', 'heart_rate']) for s in stores])
+    if channels is not None:
+        ch = _flatten(channels, [time_col]).rename(columns={time_col: 't'})
+        ch = ch.loc[ch['source'].isin(['spo2', 'heart_rate'])]
+        ch = ch.assign(night=nights.get_indexer(pd.MultiIndex.from_frame(ch[by])))
+        ch = ch.loc[ch['night'] >= 0, ['night', 'source', 't', 'values']]
+
+    args = (stages, respiratory, 1000 * max_sample_gap)
+    if n_jobs == 1 or len(nights) < 2 * n_jobs:
+        res = _sleep_metrics(ev, ch, len(nights), *args)
+    else:
+        chunks = np.array_split(np.arange(len(nights)), n_jobs * 4)
+        parts = []
+        for c in chunks:
+            sub_ev = ev.loc[ev['night'].between(c[0], c[-1])].assign(night=lambda x: x['night'] - c[0])
+            sub_ch = None if ch is None else \
+                ch.loc[ch['night'].between(c[0], c[-1])].assign(night=lambda x: x['night'] - c[0])
+            parts.append((sub_ev, sub_ch, len(c)))
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            futures = [pool.submit(_sleep_metrics, *p, *args) for p in parts]
+            res = pd.concat([f.result() for f in futures], ignore_index=True)
+
+    res.index = nights if len(by) > 1 else nights.get_level_values(0)
+    return res
+
+# %% ../nbs/17_sleep_analysis.ipynb 11
+def resample_channels(
+    channels: pd.DataFrame,
+    freq: str = '1s',
+    time_col: str = 'collection_timestamp',
+    sources: Optional[List[str]] = None,
+    array_index: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Resample all channels of a recording to the mean of regular time bins, as a time x source table.
+
+    Args:
+        channels (pd.DataFrame): The raw channels, with 'source', time and 'values' columns (or index levels).
+        freq (str, optional): The width of the time bins, as in `pd.Timedelta`. Defaults to '1s'.
+        time_col (str, optional): The time column. Defaults to 'collection_timestamp'.
+        sources (List[str], optional): The sources to include. Defaults to None, which includes all sources.
+        array_index (int, optional): The night to include, if channels contains several. Defaults to None.
+
+    Returns:
+        pd.DataFrame: The mean value of each source (columns) in each time bin (DatetimeIndex, in the timezone of
+            the input). Bins without samples are missing.
+    """
+    names = [n for n in channels.index.names if n in ['source', time_col, 'array_index']]
+    data = channels.reset_index(names) if len(names) else channels
+    if array_index is not None and 'array_index' in data.columns:
+        data = data.loc[data['array_index'] == array_index]
+    if sources is not None:
+        data = data.loc[data['source'].isin(sources)]
+
+    src_codes, src_names = pd.factorize(data['source'], sort=True)
+    times = pd.DatetimeIndex(data[time_col])
+    step = pd.Timedelta(freq).value
+    bins = times.asi8 // step
+    first = bins.min() if len(bins) else 0
+    n_bins = (bins.max() - first + 1) if len(bins) else 0
+
+    values = data['values'].to_numpy(dtype=float)
+    valid = np.isfinite(values)
+    cell = ((bins - first) * len(src_names) + src_codes)[valid]
+    size = n_bins * len(src_names)
+    sums = np.bincount(cell, weights=values[valid], minlength=size)
+    counts = np.bincount(cell, minlength=size)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = (sums / counts).reshape(n_bins, len(src_names))
+
+    index = pd.to_datetime((first + np.arange(n_bins)) * step, utc=times.tz is not None)
+    if times.tz is not None:
+        index = index.tz_convert(times.tz)
+    return pd.DataFrame(means, index=index.rename(time_col), columns=pd.Index(src_names, name='source'))
+
+
+def stack_channels(
+    resampled: pd.DataFrame,
+    keys: Optional[Dict[str, Any]] = None,
+    time_col: str = 'collection_timestamp',
+) -> pd.DataFrame:
+    """
+    Convert the time x source output of `resample_channels` to the long format of the raw channels, e.g., to compute
+    `sleep_metrics` from the resampled grid.
+
+    Args:
+        resampled (pd.DataFrame): The resampled channels, with a DatetimeIndex and one column per source.
+        keys (Dict[str, Any], optional): The keys of the night (e.g., participant_id and array_index). Defaults to None.
+        time_col (str, optional): The time column. Defaults to 'collection_timestamp'.
+
+    Returns:
+        pd.DataFrame: The 'source', time and 'values' of every non-empty bin, indexed by the keys and 'source'.
+    """
+    keys = {} if keys is None else keys
+    df = resampled.rename_axis(index=time_col, columns='source').stack().rename('values').reset_index()
+    for k, v in keys.items():
+        df[k] = v
+    return df.set_index(list(keys) + ['source'])[[time_col, 'values']]
+
+# %% ../nbs/17_sleep_analysis.ipynb 15
+CHANNEL_STORE_META = 'channels.json'
+CHANNEL_STORE_CHUNK = 2**22
+
+
+def write_channels(
+    channels: pd.DataFrame,
+    path: str,
+    time_col: str = 'collection_timestamp',
+    rates: Optional[Dict[str, float]] = None,
+    tolerance: float = 0.1,
+) -> 'ChannelStore':
+    """
+    Store the raw channels of one night as a start time, a sampling rate and a float32 array per source.
+
+    Args:
+        channels (pd.DataFrame): The raw channels of a single night, with 'source', time and 'values' columns
+            (or index levels).
+        path (str): The directory to write to. Existing arrays of the same sources are overwritten.
+        time_col (str, optional): The time column. Defaults to 'collection_timestamp'.
+        rates (Dict[str, float], optional): The sampling rate (Hz) of each source. Defaults to None, which infers
+            the rate of each source from the median interval between its samples.
+        tolerance (float, optional): The largest distance of a sample from the grid of its source, as a fraction of
+            the sampling interval. Sources with irregular timestamps, duplicate samples or a different rate raise a
+            ValueError, and should be resampled first (e.g., with `resample_channels`). Defaults to 0.1.
+
+    Returns:
+        ChannelStore: The store that was written. Gaps in the recording are stored as NaN.
+    """
+    data = channels.reset_index([n for n in channels.index.names if n is not None])
+    keys = {}
+    for c in SLEEP_GROUPS:
+        if c in data.columns:
+            if data[c].nunique() > 1:
+                raise ValueError(f'channels must contain a single night, found several values of {c}')
+            keys[c] = data[c].iloc[0]
+    times = pd.DatetimeIndex(data[time_col])
+    rates = rates or {}
+
+    os.makedirs(path, exist_ok=True)
+    meta = {'time_col': time_col, 'tz': None if times.tz is None else str(times.tz), 'keys': keys, 'sources': {}}
+    src_codes, src_names = pd.factorize(data['source'], sort=True)
+    t_all, v_all = times.asi8, data['values'].to_numpy(dtype=np.float32)
+    for i, source in enumerate(src_names):
+        mask = src_codes == i
+        order = np.argsort(t_all[mask], kind='stable')
+        t, v = t_all[mask][order], v_all[mask][order]
+        rate = rates.get(source)
+        if rate is None:
+            rate = 1e9 / np.median(np.diff(t)) if len(t) > 1 else 1.
+        exact = (t - t[0]) * rate / 1e9
+        pos = np.rint(exact).astype(np.int64)
+        if np.any(np.abs(exact - pos) > tolerance):
+            raise ValueError(f'The samples of {source} are not on a grid of {rate:g} Hz, resample them first')
+        if np.any(np.diff(pos) <= 0):
+            raise ValueError(f'{source} has several samples at the same position of its {rate:g} Hz grid')
+        arr = np.full(pos[-1] + 1, np.nan, dtype=np.float32)
+        arr[pos] = v
+        np.save(os.path.join(path, f'{source}.npy'), arr)
+        meta['sources'][source] = {'start': int(t[0]), 'rate': float(rate), 'length': len(arr)}
+
+    with open(os.path.join(path, CHANNEL_STORE_META), 'w') as f:
+        json.dump(meta, f, indent=2, default=lambda x: x.item())
+    return ChannelStore(path)
+
+
+class ChannelStore:
+    """
+    The raw channels of one night, as memory-mapped float32 arrays with a start time and a sampling rate per source.
+
+    Args:
+        path (str): A directory written by `write_channels`.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, CHANNEL_STORE_META)) as f:
+            meta = json.load(f)
+        self.time_col = meta['time_col']
+        self.tz = meta['tz']
+        self.keys = meta['keys']
+        self.info = meta['sources']
+        self.sources = list(self.info)
+        self._arrays = {}
+
+    def __repr__(self) -> str:
+        return f'ChannelStore({self.path!r}, keys={self.keys}, sources={self.sources})'
+
+    def array(self, source: str) -> np.ndarray:
+        """
+        The memory-mapped samples of a source.
+        """
+        if source not in self._arrays:
+            self._arrays[source] = np.load(os.path.join(self.path, f'{source}.npy'), mmap_mode='r')
+        return self._arrays[source]
+
+    def _timestamp(self, t) -> int:
+        t = pd.Timestamp(t)
+        if t.tz is None and self.tz is not None:
+            t = t.tz_localize(self.tz)
+        return t.value
+
+    def _window(self, source: str, start=None, end=None) -> Tuple[int, int]:
+        # the samples of source in [start, end)
+        info = self.info[source]
+        i0, i1 = 0, info['length']
+        if start is not None:
+            i0 = int(np.ceil((self._timestamp(start) - info['start']) * info['rate'] / 1e9))
+        if end is not None:
+            i1 = int(np.ceil((self._timestamp(end) - info['start']) * info['rate'] / 1e9))
+        return min(max(i0, 0), info['length']), min(max(i1, 0), info['length'])
+
+    def _times(self, source: str, i0: int, i1: int) -> np.ndarray:
+        info = self.info[source]
+        return info['start'] + np.rint(np.arange(i0, i1) * (1e9 / info['rate'])).astype(np.int64)
+
+    def _index(self, t: np.ndarray) -> pd.DatetimeIndex:
+        index = pd.to_datetime(t, utc=self.tz is not None)
+        if self.tz is not None:
+            index = index.tz_convert(self.tz)
+        return index.rename(self.time_col)
+
+    def read(self, source: str, start=None, end=None) -> pd.Series:
+        """
+        Read the samples of a source in a time window.
+
+        Args:
+            source (str): The source to read.
+            start (optional): The start of the window (inclusive), as a timestamp. Defaults to None, from the first sample.
+            end (optional): The end of the window (exclusive), as a timestamp. Defaults to None, to the last sample.
+
+        Returns:
+            pd.Series: The float32 values, indexed by time. Gaps in the recording are dropped.
+        """
+        i0, i1 = self._window(source, start, end)
+        v = np.asarray(self.array(source)[i0:i1])
+        valid = np.isfinite(v)
+        return pd.Series(v[valid], index=self._index(self._times(source, i0, i1)[valid]), name=source)
+
+    def to_frame(self, sources: Optional[List[str]] = None, start=None, end=None) -> pd.DataFrame:
+        """
+        Read a time window in the long format of the raw channels, indexed by the keys of the night and 'source'.
+        """
+        sources = self.sources if sources is None else [s for s in sources if s in self.info]
+        parts = [self.read(s, start, end).rename('values').reset_index().assign(source=s) for s in sources]
+        df = pd.concat(parts, ignore_index=True) if len(parts) else \
+            pd.DataFrame({self.time_col: self._index(np.zeros(0, dtype=np.int64)), 'values': [], 'source': []})
+        for k, v in self.keys.items():
+            df[k] = v
+        return df.set_index(list(self.keys) + ['source'])[[self.time_col, 'values']]
+
+    def resample(self, freq: str = '1s', sources: Optional[List[str]] = None, start=None, end=None) -> pd.DataFrame:
+        """
+        Resample a time window to the mean of regular time bins, as in `resample_channels`, reading the arrays
+        in chunks of CHANNEL_STORE_CHUNK samples.
+        """
+        sources = self.sources if sources is None else [s for s in sources if s in self.info]
+        step = pd.Timedelta(freq).value
+        windows = {s: self._window(s, start, end) for s in sources}
+        nonempty = [s for s in sources if windows[s][1] > windows[s][0]]
+        if not len(nonempty):
+            return pd.DataFrame(columns=pd.Index(sources, name='source'), index=self._index(np.zeros(0, dtype=np.int64)),
+                                dtype=float)
+        first = min(self._times(s, windows[s][0], windows[s][0] + 1)[0] for s in nonempty) // step
+        last = max(self._times(s, windows[s][1] - 1, windows[s][1])[0] for s in nonempty) // step
+        n_bins = last - first + 1
+
+        means = np.full((n_bins, len(sources)), np.nan)
+        for j, s in enumerate(sources):
+            sums, counts = np.zeros(n_bins), np.zeros(n_bins)
+            for c0 in range(windows[s][0], windows[s][1], CHANNEL_STORE_CHUNK):
+                c1 = min(c0 + CHANNEL_STORE_CHUNK, windows[s][1])
+                v = np.asarray(self.array(s)[c0:c1], dtype=float)
+                valid = np.isfinite(v)
+                bins = self._times(s, c0, c1)[valid] // step - first
+                sums += np.bincount(bins, weights=v[valid], minlength=n_bins)
+                counts += np.bincount(bins, minlength=n_bins)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                means[:, j] = sums / counts
+
+        index = self._index((first + np.arange(n_bins)) * step)
+        return pd.DataFrame(means, index=index, columns=pd.Index(sources, name='source'))
@@ -13,6 +13,12 @@ import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+from matplotlib.collections import PathCollection
+from matplotlib.path import Path
+from matplotlib.patches import Patch
+
+from .decimation import decimate_trace, decimate_envelope
+from .sleep_analysis import resample_channels
 
 # %% ../nbs/06_sleep_plots.ipynb 4
 CHANNELS = {
@@ -63,7 +69,7 @@ def plot_sleep(events: pd.DataFrame, channels: pd.DataFrame,
     Args:
 
         events (pd.DataFrame): A pandas dataframe containing sleep events data.
-        channels (pd.DataFrame): A pandas dataframe containing raw channels data.
+        channels (pd.DataFrame): A pandas dataframe containing raw channels data, or a ChannelStore of the night.
         array_index (int, optional): The index of the array. Defaults to None.
         trim_to_events (bool, optional): Whether to trim the plot to the start and end of the events. Defaults to True.
         add_events (pd.DataFrame, optional): Additional events data to include in the plot. Defaults to None.
@@ -81,7 +87,11 @@ def plot_sleep(events: pd.DataFrame, channels: pd.DataFrame,
 
         None
     """
-    nC = min([len(channel_filter), channels.index.get_level_values('source').nunique()])
+    if not isinstance(channels, pd.DataFrame):
+        n_sources = len(channels.sources)
+    else:
+        n_sources = channels.index.get_level_values('source').nunique()
+    nC = min([len(channel_filter), n_sources])
     if xlim is not None:
         trim_to_events = True
 
@@ -133,9 +143,9 @@ def plot_events(events: pd.DataFrame, array_index: Optional[int]=None,
 
     # filter events
     if y_include is not None:
-        plot_df = plot_df.query(f'{y} in {y_include}')
+        plot_df = plot_df.loc[plot_df[y].isin(y_include)]
     if y_exclude is not None:
-        plot_df = plot_df.query(f'{y} not in {y_exclude}')
+        plot_df = plot_df.loc[~plot_df[y].isin(y_exclude)]
     # additional user-provided events (application logging, etc.)
     if add_events is not None:
         tlim = plot_df[x_start].min(), plot_df[x_end].max()
@@ -167,30 +177,29 @@ def plot_events(events: pd.DataFrame, array_index: Optional[int]=None,
     if ax is None:
         fig, ax = plt.subplots(figsize=figsize)
 
-    # set colors
-    colors = sorted(plot_df[color].unique())
-    colors = pd.DataFrame({color: colors, 'color': sns.color_palette(cmap, len(colors))})\
-        .set_index(color)['color']
-
-    # plot events
-    plot_df = plot_df.assign(diff=lambda x: x[x_end] - x[x_start]).sort_values([color, y])
-    labels = []
-    legend = []
-    for i, (y_label, y) in enumerate(plot_df.groupby(y, sort=False)):
-        if len(y) == 0:
-            continue
-        labels.append(y_label)
-        for c, r in y.groupby(color):
-            data = r[[x_start, 'diff']]
-            if not len(data):
-                continue
-            h = ax.broken_barh(data.values, (i-0.4,0.8), color=colors[c], alpha=0.7)
-            legend.append({'label': c, 'handle': h})
+    # encode colors and rows (rows ordered by color, then by name)
+    plot_df = plot_df.sort_values([color, y])
+    color_codes, color_labels = pd.factorize(plot_df[color], sort=True)
+    y_codes, labels = pd.factorize(plot_df[y])
+    palette = np.array(sns.color_palette(cmap, len(color_labels)))
+
+    # plot all events as a single collection, with one compound path of rectangles per color
+    x0 = mdates.date2num(plot_df[x_start].values)
+    x1 = mdates.date2num(plot_df[x_end].values)
+    verts = np.stack([
+        np.column_stack([x0, y_codes - 0.4]), np.column_stack([x0, y_codes + 0.4]),
+        np.column_stack([x1, y_codes + 0.4]), np.column_stack([x1, y_codes - 0.4]),
+        np.column_stack([x0, y_codes - 0.4])], axis=1)
+    rect_codes = [Path.MOVETO, Path.LINETO, Path.LINETO, Path.LINETO, Path.CLOSEPOLY]
+    paths = [Path(verts[color_codes == i].reshape(-1, 2), np.tile(rect_codes, (color_codes == i).sum()))
+             for i in range(len(color_labels))]
+    ax.add_collection(PathCollection(paths, facecolors=palette, edgecolors=palette, alpha=0.7))
+    ax.xaxis_date()
+    ax.autoscale_view()
 
     # format plot
-    legend = pd.DataFrame.from_dict(legend).drop_duplicates(subset='label')
-    ax.legend(legend['handle'], legend['label'],
-              bbox_to_anchor=(1.05, 1), loc='upper left', borderaxespad=0.)
+    legend = [Patch(color=palette[i], alpha=0.7, label=c) for i, c in enumerate(color_labels)]
+    ax.legend(handles=legend, bbox_to_anchor=(1.05, 1), loc='upper left', borderaxespad=0.)
 
     str_title = ''
     if 'participant_id' in events.index.names:
@@ -212,50 +221,77 @@ def plot_channels(channels: pd.DataFrame, array_index: Optional[int]=None,
              y_filter: Optional[Iterable[str]]=None, ax: plt.Axes=None,
              discrete_events: Optional[Iterable[str]]=['sleep_stage', 'body_position'],
              time_col='collection_timestamp', height=1.5, resample='1s', cmap='muted',
-             rename_channels=CHANNELS, **kwargs):
-    """ plot channels data for a given participant and array_index """
+             rename_channels=CHANNELS, decimate=True, resampled: Optional[pd.DataFrame]=None, **kwargs):
+    """ plot channels data for a given participant and array_index, decimated to the axes width unless decimate=False.
+        all sources are resampled at once, or taken from a precomputed `resample_channels` table (resampled).
+        channels may also be a ChannelStore, which is resampled from its memory-mapped arrays """
     # set colors
     colors = get_legend_colors(cmap).explode('source')
     colors['source'] = pd.Categorical(colors['source'])
     colors = colors.set_index('source')
 
-    # filter data
-    if (array_index is not None) and (('array_index' in channels.columns) or ('array_index' in channels.index.names)):
-        data = channels.query('array_index == @array_index').copy()
+    if not isinstance(channels, pd.DataFrame):
+        # a single night, read from the memory-mapped arrays
+        if resampled is None and resample is not None:
+            resampled = channels.resample(resample)
+        elif resampled is None:
+            series = {source: channels.read(source).tz_localize(None) for source in channels.sources}
     else:
-        data = channels.copy()
-    # extract time and channel name
-    if time_col in channels.index.names:
-        data = data.reset_index(time_col)
-    if 'source' not in data.index.names:
-        data = data.set_index('source')
-    data[time_col] = data[time_col].dt.tz_localize(None)
+        # filter data
+        if (array_index is not None) and (('array_index' in channels.columns) or ('array_index' in channels.index.names)):
+            data = channels.query('array_index == @array_index').copy()
+        else:
+            data = channels.copy()
+        # extract time and channel name
+        if time_col in channels.index.names:
+            data = data.reset_index(time_col)
+        if 'source' not in data.index.names:
+            data = data.set_index('source')
+        data[time_col] = data[time_col].dt.tz_localize(None)
+
+        # resample all sources in a single pass
+        if resampled is None and resample is not None:
+            resampled = resample_channels(data, freq=resample, time_col=time_col)
+        elif resampled is None:
+            series = {source: d.set_index(time_col)['values'].sort_index() for source, d in data.groupby('source')}
+    if resampled is not None:
+        if resampled.index.tz is not None:
+            resampled = resampled.tz_localize(None)
+        series = {source: resampled[source].dropna() for source in resampled.columns}
 
     # grouping and coloring sources by event "channels"
-    data = data.join(colors[['channel']])\
-        .sort_values(['channel', time_col], ascending=[False, True])
+    order = pd.DataFrame({'first': [v.index.min() for v in series.values()]}, index=pd.Index(series.keys(), name='source'))\
+        .join(colors[['channel']]).reset_index()\
+        .sort_values(['channel', 'first', 'source'], ascending=[False, True, True])
 
     if ax is None:
-        n = data.index.unique().size
+        n = len(order)
         fig, ax = plt.subplots(nrows=n, figsize=(10, n*height), sharex=True, squeeze=False)
 
     # plot data
     ax_shift = 0
-    for i, (source, d) in enumerate(data.groupby('source', sort=False)):
+    for i, source in enumerate(order['source']):
         if (source not in CHANNELS) or (y_filter is not None and source not in y_filter):
             print(f'plot_channels: skipping {source}')
             ax_shift += 1
             continue
         iax = i - ax_shift
-        if resample is not None:
-            d = d.resample(resample, on=time_col).mean(numeric_only=True).reset_index()
+        d = series[source].rename('values').rename_axis(time_col).reset_index()
         if source in colors.index:
             c = colors.loc[source, 'color']
         else:
             c = 'grey'
         if source in CHANNEL_LIMS:
             d = d.loc[(CHANNEL_LIMS[source][0] <= d['values']) & (d['values'] <= CHANNEL_LIMS[source][1])]
-        ax[iax, 0].scatter(d[time_col].dt.tz_localize(None).values, d['values'].values, s=0.1, color=c)
+        x, y = d[time_col], d['values']
+        if decimate and source in discrete_events:
+            x, y = decimate_trace(x, y, ax=ax[iax, 0], method='distinct')
+        elif decimate:
+            # draw the range of each pixel as a bar, and its extremes as points
+            x_bar, y_min, y_max = decimate_envelope(x, y, ax=ax[iax, 0])
+            ax[iax, 0].vlines(x_bar.values, y_min, y_max, color=c, lw=0.5)
+            x, y = decimate_trace(x, y, ax=ax[iax, 0])
+        ax[iax, 0].scatter(x.dt.tz_localize(None).values, y.values, s=0.1, color=c)
         if source not in CHANNEL_LIMS:
             ylim = d['values'].quantile([0.001, 0.999]).tolist()
             ylim[0] = 0.95*ylim[0] if ylim[0] >= 0 else 1.1*ylim[0]
@@ -283,7 +319,7 @@ def plot_channels(channels: pd.DataFrame, array_index: Optional[int]=None,
     if ax is None:
         print('entered')
         ax[-1,0].set_xlabel('Time')
-        ax[-1,0].set_xlim(data[time_col].min(), data[time_col].max())
+        ax[-1,0].set_xlim(min(v.index.min() for v in series.values()), max(v.index.max() for v in series.values()))
         format_xticks(ax[-1,0])
     plt.tight_layout()
 